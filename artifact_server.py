@@ -0,0 +1,260 @@
+"""
+Servidor HTTP local de artefatos (backend de upload alternativo aos hosts públicos)
+Serve áudios e imagens direto da pasta temporária com URLs assinadas (HMAC) e expiráveis,
+sem copiar os arquivos para serviços de terceiros
+"""
+import hmac
+import time
+import shutil
+import hashlib
+import secrets
+import threading
+import mimetypes
+from pathlib import Path
+from typing import Optional
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, quote, unquote
+from config import Config
+from utils import get_logger, file_sha256
+
+logger = get_logger(__name__)
+
+
+class ArtifactServer:
+    """Servidor HTTP que entrega arquivos de root mediante URL assinada"""
+
+    URL_PREFIX = '/artifacts/'
+
+    def __init__(
+        self,
+        root: Path,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        secret: str = None,
+        public_url: str = None
+    ):
+        """
+        Inicializa o servidor (não inicia a escuta; ver start)
+
+        Args:
+            root: Diretório raiz servido (nada fora dele é acessível)
+            host: Interface de escuta
+            port: Porta de escuta (0 = porta livre escolhida pelo sistema)
+            secret: Chave HMAC para assinar URLs (padrão: aleatória por processo)
+            public_url: URL base pela qual a WaveSpeed alcança este servidor
+                        (padrão: http://host:porta)
+        """
+        self.root = Path(root).resolve()
+        self.host = host
+        self.port = port
+        self.secret = (secret or secrets.token_hex(32)).encode('utf-8')
+        self.public_url = public_url.rstrip('/') if public_url else None
+
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        """URL base usada nas URLs assinadas"""
+        if self.public_url:
+            return self.public_url
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> 'ArtifactServer':
+        """Inicia o servidor em uma thread daemon"""
+        if self._httpd is not None:
+            return self
+
+        server = self
+
+        class Handler(_ArtifactRequestHandler):
+            artifact_server = server
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='artifact-server', daemon=True)
+        self._thread.start()
+
+        logger.info(f"Servidor de artefatos escutando em {self.host}:{self.port} (raiz: {self.root})")
+
+        return self
+
+    def stop(self):
+        """Encerra o servidor"""
+        if self._httpd is None:
+            return
+
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._httpd = None
+        self._thread = None
+
+    def sign_url(self, file_path: Path, ttl: float = None) -> str:
+        """
+        Gera uma URL assinada e expirável para um arquivo dentro de root
+
+        Args:
+            file_path: Caminho do arquivo (deve estar dentro de root)
+            ttl: Validade em segundos (padrão: Config.ARTIFACT_URL_TTL)
+
+        Returns:
+            URL pública assinada
+
+        Raises:
+            ValueError: Se o arquivo estiver fora de root
+        """
+        if ttl is None:
+            ttl = Config.ARTIFACT_URL_TTL
+
+        relative = Path(file_path).resolve().relative_to(self.root).as_posix()
+        expires = int(time.time() + ttl)
+        signature = self._signature(relative, expires)
+
+        return f"{self.base_url}{self.URL_PREFIX}{quote(relative)}?expires={expires}&sig={signature}"
+
+    def verify(self, relative: str, expires: str, signature: str) -> Optional[Path]:
+        """
+        Valida uma requisição assinada
+
+        Args:
+            relative: Caminho relativo a root
+            expires: Timestamp de expiração (string da query)
+            signature: Assinatura HMAC (string da query)
+
+        Returns:
+            Path do arquivo se a assinatura for válida e não expirada, senão None
+        """
+        try:
+            expires_at = int(expires)
+        except (TypeError, ValueError):
+            return None
+
+        if expires_at < time.time():
+            return None
+
+        if not signature or not hmac.compare_digest(self._signature(relative, expires_at), signature):
+            return None
+
+        file_path = (self.root / relative).resolve()
+        if self.root not in file_path.parents or not file_path.is_file():
+            return None
+
+        return file_path
+
+    def _signature(self, relative: str, expires: int) -> str:
+        """HMAC-SHA256 de caminho + expiração"""
+        message = f"{relative}\n{expires}".encode('utf-8')
+        return hmac.new(self.secret, message, hashlib.sha256).hexdigest()
+
+
+class _ArtifactRequestHandler(BaseHTTPRequestHandler):
+    """Handler GET/HEAD do ArtifactServer"""
+
+    artifact_server: ArtifactServer = None
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _serve(self, send_body: bool):
+        parsed = urlparse(self.path)
+
+        if not parsed.path.startswith(ArtifactServer.URL_PREFIX):
+            self.send_error(404)
+            return
+
+        relative = unquote(parsed.path[len(ArtifactServer.URL_PREFIX):])
+        query = parse_qs(parsed.query)
+
+        file_path = self.artifact_server.verify(
+            relative,
+            query.get('expires', [None])[0],
+            query.get('sig', [None])[0]
+        )
+
+        if file_path is None:
+            self.send_error(403, "URL inválida ou expirada")
+            return
+
+        content_type = mimetypes.guess_type(file_path.name)[0] or 'application/octet-stream'
+        size = file_path.stat().st_size
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(size))
+        self.end_headers()
+
+        if not send_body:
+            return
+
+        with open(file_path, 'rb') as f:
+            try:
+                # Zero-copy quando o SO suporta sendfile
+                self.wfile.flush()
+                self.connection.sendfile(f)
+            except (AttributeError, OSError):
+                f.seek(0)
+                shutil.copyfileobj(f, self.wfile)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+class LocalArtifactUploader:
+    """Backend de upload 'local': publica arquivos pelo ArtifactServer do processo"""
+
+    _server = None
+    _server_lock = threading.Lock()
+
+    @classmethod
+    def server(cls) -> ArtifactServer:
+        """Retorna o servidor de artefatos global (iniciado sob demanda a partir da Config)"""
+        with cls._server_lock:
+            if cls._server is None:
+                cls._server = ArtifactServer(
+                    root=Config.TEMP_FOLDER,
+                    host=Config.ARTIFACT_SERVER_HOST,
+                    port=Config.ARTIFACT_SERVER_PORT,
+                    secret=Config.ARTIFACT_URL_SECRET,
+                    public_url=Config.ARTIFACT_PUBLIC_URL
+                ).start()
+
+                if not Config.ARTIFACT_PUBLIC_URL:
+                    logger.warning(
+                        "ARTIFACT_PUBLIC_URL não configurada: as URLs usam o endereço local "
+                        f"({cls._server.base_url}) e só serão acessíveis pela WaveSpeed via túnel/proxy"
+                    )
+            return cls._server
+
+    @classmethod
+    def upload(cls, file_path: Path) -> str:
+        """
+        Retorna uma URL assinada para o arquivo (sem transferir nada)
+
+        Arquivos fora da pasta temporária são copiados uma vez para
+        TEMP_FOLDER/artifacts, nomeados pelo SHA-256 do conteúdo.
+
+        Args:
+            file_path: Caminho do arquivo
+
+        Returns:
+            URL pública assinada
+        """
+        server = cls.server()
+        file_path = Path(file_path).resolve()
+
+        if server.root not in file_path.parents:
+            staged = server.root / 'artifacts' / f"{file_sha256(file_path)}{file_path.suffix}"
+            if not staged.exists():
+                staged.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(file_path, staged)
+            file_path = staged
+
+        url = server.sign_url(file_path)
+        logger.info(f"📤 Artefato publicado localmente: {file_path.name}")
+
+        return url
@@ -2,12 +2,18 @@
 Módulo de geração de áudio usando ElevenLabs ou MiniMax API
 """
 from elevenlabs import ElevenLabs
+import re
+import unicodedata
+from datetime import datetime
+from email.utils import parsedate_to_datetime
 import requests
 from pathlib import Path
 from typing import List, Dict, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from config import Config
 from utils import get_logger, retry_with_backoff
+from content_store import ContentStore
+from provider_limits import provider_limit
 
 logger = get_logger(__name__)
 
@@ -47,7 +53,6 @@ class MiniMaxClient:
             {'voice_id': 'presenter_female', 'name': 'Presenter Female', 'language': 'en'},
         ]
 
-    @retry_with_backoff(max_retries=3, base_delay=2.0)
     def generate_audio(
         self,
         text: str,
@@ -162,6 +167,13 @@ class AudioGenerator:
         self.provider = provider.lower()
         self.available_voices = None
 
+        # Áudios já sintetizados, por (texto normalizado, voz, modelo, provedor)
+        self.audio_cache = ContentStore(
+            Config.CACHE_FOLDER / 'tts',
+            suffix='.mp3',
+            max_bytes=Config.TTS_CACHE_MAX_MB * 1024 * 1024
+        ) if Config.TTS_CACHE_ENABLED else None
+
         # Inicializa o cliente apropriado
         if self.provider == 'elevenlabs':
             if not Config.ELEVENLABS_API_KEY:
@@ -178,6 +190,10 @@ class AudioGenerator:
         else:
             raise ValueError(f"Provedor de áudio inválido: {provider}. Use 'elevenlabs' ou 'minimax'")
 
+        # Concorrência e RPM do provedor, compartilhados por todos os jobs do processo
+        api_key = Config.ELEVENLABS_API_KEY if self.provider == 'elevenlabs' else Config.MINIMAX_API_KEY
+        self.limits = provider_limit(self.provider, api_key)
+
     def get_available_voices(self) -> List[Dict[str, str]]:
         """
         Obtém lista de vozes disponíveis (ElevenLabs ou MiniMax)
@@ -242,7 +258,9 @@ class AudioGenerator:
         logger.error("Nenhuma voz disponível")
         return 'default'
 
-    @retry_with_backoff(max_retries=3, base_delay=2.0)
+    # Só erros transitórios são repetidos aqui; 429 sobe direto para generate_audio_with_retry,
+    # que ajusta o limite do provedor (AIMD) e respeita o Retry-After
+    @retry_with_backoff(max_retries=3, base_delay=2.0, should_retry=lambda e: not AudioGenerator.is_rate_limit_error(e))
     def generate_audio(
         self,
         text: str,
@@ -305,6 +323,181 @@ class AudioGenerator:
             logger.error(f"Erro ao gerar áudio para {output_path.name}: {e}")
             raise
 
+    def default_max_workers(self, num_texts: int) -> int:
+        """
+        Número padrão de workers paralelos para o provedor atual
+
+        Args:
+            num_texts: Quantidade de textos a sintetizar
+
+        Returns:
+            Número de workers (pelo menos 1)
+        """
+        if self.provider == 'elevenlabs':
+            # ElevenLabs tem limite de 5 requisições simultâneas, usamos 3 para segurança
+            return max(1, min(Config.ELEVENLABS_MAX_CONCURRENT, num_texts))
+        return max(1, min(Config.MAX_CONCURRENT_REQUESTS, num_texts))
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """
+        Normaliza o texto para a chave do cache (Unicode NFC, espaços colapsados)
+
+        Args:
+            text: Texto formatado do batch
+
+        Returns:
+            Texto normalizado
+        """
+        return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text)).strip()
+
+    def _audio_key(self, text: str, voice_id: str, model_id: str) -> str:
+        """Chave do cache de áudios: texto normalizado + voz + modelo + provedor"""
+        return ContentStore.make_key(self.normalize_text(text), voice_id, model_id, self.provider)
+
+    @staticmethod
+    def is_rate_limit_error(error: Exception) -> bool:
+        """
+        Indica se o erro é um rate limit (HTTP 429) do provedor
+
+        Args:
+            error: Exceção da chamada de TTS
+
+        Returns:
+            True se for rate limit
+        """
+        response = getattr(error, 'response', None)
+        status_code = getattr(error, 'status_code', None) or getattr(response, 'status_code', None)
+        if status_code is not None:
+            return status_code == 429
+
+        # Sem status HTTP (ex: MiniMax responde 200 com base_resp "rate limit exceeded")
+        error_str = str(error).lower()
+        return any(marker in error_str for marker in ('429', 'too_many_requests', 'too many requests', 'rate limit', 'rate_limit'))
+
+    @staticmethod
+    def retry_after(error: Exception) -> Optional[float]:
+        """
+        Lê o header Retry-After do erro, se disponível
+
+        Args:
+            error: Exceção da chamada de TTS (ApiError do ElevenLabs ou HTTPError)
+
+        Returns:
+            Segundos de espera ou None
+        """
+        headers = getattr(error, 'headers', None)
+        if headers is None:
+            headers = getattr(getattr(error, 'response', None), 'headers', None)
+        if not headers:
+            return None
+
+        value = headers.get('retry-after') or headers.get('Retry-After')
+        if not value:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        # Formato HTTP-date
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, (retry_at - datetime.now(retry_at.tzinfo)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def generate_audio_with_retry(
+        self,
+        text_data: Dict,
+        voice_id: str,
+        audio_dir: Path,
+        model_id: str = "eleven_multilingual_v2",
+        max_retries: int = 5
+    ) -> Dict:
+        """
+        Gera o áudio de um batch formatado, com retry para erros 429
+
+        Um 429 reduz a concorrência efetiva do provedor (AIMD, ver ProviderLimit)
+        e pausa todos os workers pelo Retry-After; sucessos a aumentam de volta.
+
+        Se o mesmo texto já foi sintetizado com a mesma voz, modelo e provedor,
+        o áudio é copiado do cache sem chamar a API.
+
+        Args:
+            text_data: Dict de texto formatado ({'batch_number': 1, 'formatted_text': '...'})
+            voice_id: ID da voz a usar
+            audio_dir: Diretório onde salvar audio_N.mp3
+            model_id: Modelo a usar (relevante apenas para ElevenLabs)
+            max_retries: Número máximo de tentativas em caso de rate limit
+
+        Returns:
+            Dict no mesmo formato dos itens retornados por generate_audios_batch
+
+        Raises:
+            Exception: Se todas as tentativas falharem
+        """
+        audio_number = text_data['batch_number']
+        text = text_data['formatted_text']
+        audio_path = audio_dir / f'audio_{audio_number}.mp3'
+
+        cache_key = None
+        if self.audio_cache is not None:
+            cache_key = self._audio_key(text, voice_id, model_id)
+            if self.audio_cache.fetch(cache_key, audio_path):
+                logger.info(f"♻️  Áudio {audio_number} reaproveitado do cache de TTS (sem custo de API)")
+                return {
+                    'audio_number': audio_number,
+                    'text': text,
+                    'audio_path': audio_path,
+                    'duration': None
+                }
+
+            # Um audio_N.mp3 antigo pode ser hardlink do cache: não sobrescreve no lugar
+            audio_path.unlink(missing_ok=True)
+
+        last_error = None
+        for attempt in range(max_retries):
+            try:
+                with self.limits:
+                    generated_path = self.generate_audio(
+                        text=text,
+                        voice_id=voice_id,
+                        output_path=audio_path,
+                        model_id=model_id
+                    )
+
+                self.limits.on_success()
+
+                if cache_key is not None:
+                    self.audio_cache.put(cache_key, generated_path)
+
+                return {
+                    'audio_number': audio_number,
+                    'text': text,
+                    'audio_path': generated_path,
+                    'duration': None
+                }
+
+            except Exception as e:
+                last_error = e
+
+                # Se for erro 429 (rate limit), reduz a concorrência do provedor e tenta novamente;
+                # a pausa (Retry-After) vale para todos os workers, aplicada no próximo acquire
+                if self.is_rate_limit_error(e):
+                    wait_time = self.limits.on_rate_limited(self.retry_after(e))
+                    logger.warning(
+                        f"Rate limit atingido para áudio {audio_number}. Nova tentativa em ~{wait_time:.0f}s "
+                        f"({attempt + 1}/{max_retries}, concorrência efetiva: {self.limits.effective_concurrency})"
+                    )
+                else:
+                    # Para outros erros, não faz retry
+                    break
+
+        # Se chegou aqui, todas as tentativas falharam
+        raise last_error
+
     def generate_audios_batch(
         self,
         texts: List[Dict],
@@ -338,8 +531,6 @@ class AudioGenerator:
                 ...
             ]
         """
-        import time
-
         logger.info(f"Iniciando geração de {len(texts)} áudios")
 
         # Cria diretório de áudios
@@ -348,57 +539,18 @@ class AudioGenerator:
 
         # Determina número de workers baseado no provider
         if max_workers is None:
-            if self.provider == 'elevenlabs':
-                # ElevenLabs tem limite de 5 requisições simultâneas, usamos 3 para segurança
-                max_workers = min(Config.ELEVENLABS_MAX_CONCURRENT, len(texts))
-            else:
-                max_workers = min(Config.MAX_CONCURRENT_REQUESTS, len(texts))
+            max_workers = self.default_max_workers(len(texts))
 
         logger.info(f"Usando {max_workers} workers paralelos para {self.provider}")
 
         results = []
 
-        def generate_single_audio_with_retry(text_data: Dict, max_retries: int = 3) -> Dict:
+        def generate_single_audio_with_retry(text_data: Dict) -> Dict:
             """Gera um único áudio com retry para erros 429"""
-            audio_number = text_data['batch_number']
-            text = text_data['formatted_text']
-            audio_path = audio_dir / f'audio_{audio_number}.mp3'
-
             if progress_callback:
-                progress_callback(f"Gerando áudio {audio_number}/{len(texts)}...")
+                progress_callback(f"Gerando áudio {text_data['batch_number']}/{len(texts)}...")
 
-            last_error = None
-            for attempt in range(max_retries):
-                try:
-                    generated_path = self.generate_audio(
-                        text=text,
-                        voice_id=voice_id,
-                        output_path=audio_path,
-                        model_id=model_id
-                    )
-
-                    return {
-                        'audio_number': audio_number,
-                        'text': text,
-                        'audio_path': generated_path,
-                        'duration': None
-                    }
-
-                except Exception as e:
-                    last_error = e
-                    error_str = str(e).lower()
-
-                    # Se for erro 429 (rate limit), espera e tenta novamente
-                    if '429' in error_str or 'too_many' in error_str or 'rate' in error_str:
-                        wait_time = (attempt + 1) * 5  # 5s, 10s, 15s
-                        logger.warning(f"Rate limit atingido para áudio {audio_number}. Aguardando {wait_time}s antes de retry {attempt + 1}/{max_retries}")
-                        time.sleep(wait_time)
-                    else:
-                        # Para outros erros, não faz retry
-                        break
-
-            # Se chegou aqui, todas as tentativas falharam
-            raise last_error
+            return self.generate_audio_with_retry(text_data, voice_id, audio_dir, model_id)
 
         # Processa em paralelo com controle de concorrência
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
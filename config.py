@@ -23,16 +23,51 @@ class Config:
     # Configurações Gerais
     MAX_CONCURRENT_REQUESTS = int(os.getenv('MAX_CONCURRENT_REQUESTS', 10))
     ELEVENLABS_MAX_CONCURRENT = int(os.getenv('ELEVENLABS_MAX_CONCURRENT', 3))  # ElevenLabs permite 5, usamos 3 para margem de segurança
+    ELEVENLABS_RPM = float(os.getenv('ELEVENLABS_RPM', 0))  # Requisições por minuto ao ElevenLabs (0 = sem limite)
+    MINIMAX_RPM = float(os.getenv('MINIMAX_RPM', 0))  # Requisições por minuto ao MiniMax (0 = sem limite)
+    WAVESPEED_RPM = float(os.getenv('WAVESPEED_RPM', 0))  # Requisições HTTP por minuto ao WaveSpeed (submit + polling; 0 = sem limite)
     TEMP_FOLDER = Path(os.getenv('TEMP_FOLDER', './temp'))
+    CACHE_FOLDER = Path(os.getenv('CACHE_FOLDER', str(TEMP_FOLDER / 'cache')))
 
     # Configurações de Processamento
     BATCH_SIZE = int(os.getenv('BATCH_SIZE', 3))
     POLL_INTERVAL = float(os.getenv('POLL_INTERVAL', 10.0))  # 10 segundos entre polls
     POLL_TIMEOUT = float(os.getenv('POLL_TIMEOUT', 900.0))   # 15 minutos timeout total
+    POLL_INITIAL_DELAY = float(os.getenv('POLL_INITIAL_DELAY', 15.0))  # Espera antes do primeiro poll de cada tarefa
+    POLL_MAX_CONCURRENT = int(os.getenv('POLL_MAX_CONCURRENT', 8))  # Consultas de status simultâneas no poller compartilhado
+    WAVESPEED_SUBMIT_ALL = os.getenv('WAVESPEED_SUBMIT_ALL', 'false').lower() == 'true'  # Submete todos os segmentos e coleta conforme terminam
+    WAVESPEED_MAX_INFLIGHT = int(os.getenv('WAVESPEED_MAX_INFLIGHT', 20))  # Cota de tarefas simultâneas na fila do WaveSpeed
+    UPLOAD_CACHE_MIN_REMAINING = float(os.getenv('UPLOAD_CACHE_MIN_REMAINING', 1800.0))  # Validade mínima (s) para reutilizar uma URL já enviada
+    GEMINI_MAX_CONCURRENT = int(os.getenv('GEMINI_MAX_CONCURRENT', 4))  # Batches formatados em paralelo
+    GEMINI_RPM = float(os.getenv('GEMINI_RPM', 60))  # Requisições por minuto por API key do Gemini (0 = sem limite)
+    GEMINI_CACHE_ENABLED = os.getenv('GEMINI_CACHE_ENABLED', 'true').lower() == 'true'  # Reutiliza batches já formatados pelo Gemini
+    GEMINI_DETERMINISTIC = os.getenv('GEMINI_DETERMINISTIC', 'false').lower() == 'true'  # Temperatura 0 na formatação (saída estável entre execuções)
+    TTS_CACHE_ENABLED = os.getenv('TTS_CACHE_ENABLED', 'true').lower() == 'true'  # Reutiliza áudios já sintetizados com o mesmo texto/voz
+    TTS_CACHE_MAX_MB = int(os.getenv('TTS_CACHE_MAX_MB', '1024'))  # Tamanho máximo do cache de áudios (remove os menos usados)
+    RENDER_CACHE_ENABLED = os.getenv('RENDER_CACHE_ENABLED', 'true').lower() == 'true'  # Reutiliza vídeos já renderizados com as mesmas entradas
+    DATABASE_BACKEND = os.getenv('DATABASE_BACKEND', 'sqlite')  # 'sqlite' (WAL, indexado) ou 'json' (arquivos em data/)
+    DATABASE_FLUSH_INTERVAL = float(os.getenv('DATABASE_FLUSH_INTERVAL', 2.0))  # Backend json: intervalo (s) entre gravações em disco
+    MAX_CONCURRENT_JOBS = int(os.getenv('MAX_CONCURRENT_JOBS', 2))  # Jobs processados em paralelo pelo servidor web
+    BATCH_MAX_PARALLEL_SCRIPTS = int(os.getenv('BATCH_MAX_PARALLEL_SCRIPTS', 4))  # Roteiros de um lote processados em paralelo
+    PIPELINE_MODE = os.getenv('PIPELINE_MODE', 'false').lower() == 'true'  # Texto → áudio → vídeo por segmento, sem barreiras entre etapas
+    SEGMENT_MAX_RETRIES = int(os.getenv('SEGMENT_MAX_RETRIES', 2))  # Novas tentativas de cada segmento que falhar (0 = falha o job na hora)
+    SEGMENT_RETRY_DELAY = float(os.getenv('SEGMENT_RETRY_DELAY', 15.0))  # Espera (s) antes da 1ª nova tentativa de um segmento; dobra a cada tentativa
+
+    # Backend de upload para a WaveSpeed (public = 0x0.st/tmpfiles.org, local = servidor de artefatos próprio)
+    UPLOAD_BACKEND = os.getenv('UPLOAD_BACKEND', 'public')
+    ARTIFACT_SERVER_HOST = os.getenv('ARTIFACT_SERVER_HOST', '0.0.0.0')
+    ARTIFACT_SERVER_PORT = int(os.getenv('ARTIFACT_SERVER_PORT', 8765))
+    ARTIFACT_PUBLIC_URL = os.getenv('ARTIFACT_PUBLIC_URL')  # URL pela qual a WaveSpeed alcança o servidor (ex: túnel/proxy)
+    ARTIFACT_URL_SECRET = os.getenv('ARTIFACT_URL_SECRET')  # Chave HMAC das URLs (padrão: aleatória por processo)
+    ARTIFACT_URL_TTL = float(os.getenv('ARTIFACT_URL_TTL', 3600.0))  # Validade das URLs assinadas (s)
+    USE_X_SENDFILE = os.getenv('USE_X_SENDFILE', 'false').lower() == 'true'  # Entrega vídeos via X-Sendfile (só atrás de nginx/Apache configurado para isso)
 
     # Configurações de Vídeo
     DEFAULT_RESOLUTION = os.getenv('DEFAULT_RESOLUTION', '480p')
-    VIDEO_QUALITY = os.getenv('VIDEO_QUALITY', 'high')
+    VIDEO_QUALITY = os.getenv('VIDEO_QUALITY', 'high')  # Qualidade quando o vídeo final precisa ser re-encodado (low, medium, high)
+    VIDEO_TRANSITION_DURATION = float(os.getenv('VIDEO_TRANSITION_DURATION', 0))  # Crossfade (s) entre segmentos no vídeo final (0 = sem transições)
+    INCREMENTAL_CONCAT = os.getenv('INCREMENTAL_CONCAT', 'true').lower() == 'true'  # Monta o vídeo final conforme os segmentos ficam prontos (sem transições)
+    PREVIEW_TARGET_DURATION = int(os.getenv('PREVIEW_TARGET_DURATION', 120))  # Duração máxima (s) de um segmento na playlist HLS de preview
 
     # Formatos suportados
     SUPPORTED_IMAGE_FORMATS = {'.png', '.jpg', '.jpeg'}
@@ -0,0 +1,219 @@
+"""
+Armazenamento endereçado por conteúdo para artefatos já gerados
+Guarda arquivos sob a chave SHA-256 das suas entradas, para que re-execuções
+com as mesmas entradas reutilizem o resultado sem chamar as APIs de novo
+"""
+import os
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from utils import get_logger, cached_file_sha256
+
+logger = get_logger(__name__)
+
+
+class ContentStore:
+    """Diretório de arquivos indexados por uma chave derivada das entradas"""
+
+    # Bytes ocupados por diretório (compartilhado entre instâncias do mesmo root),
+    # atualizado a cada put para não varrer o diretório em toda escrita
+    _usage: Dict[Path, int] = {}
+    _usage_lock = threading.Lock()
+
+    # Ao estourar max_bytes, remove até esta fração do limite (evita varrer a cada put)
+    EVICT_TARGET = 0.9
+
+    def __init__(self, root: Path, suffix: str = '', max_bytes: Optional[int] = None):
+        """
+        Inicializa o armazenamento
+
+        Args:
+            root: Diretório do armazenamento
+            suffix: Extensão dos arquivos armazenados (ex: '.mp4')
+            max_bytes: Tamanho máximo do armazenamento; acima disso os arquivos
+                       menos usados recentemente são removidos (None = sem limite)
+        """
+        self.root = Path(root)
+        self.suffix = suffix
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._usage_key = self.root.resolve()
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """
+        Gera a chave a partir das partes que identificam o artefato
+
+        Args:
+            *parts: Strings (hashes, parâmetros) que definem o resultado
+
+        Returns:
+            Chave hexadecimal SHA-256
+        """
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(str(part).encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def file_digest(self, file_path: Path) -> str:
+        """SHA-256 do conteúdo de um arquivo (ver utils.cached_file_sha256)"""
+        return cached_file_sha256(file_path)
+
+    def path_for(self, key: str) -> Path:
+        """Caminho do arquivo de uma chave dentro do armazenamento"""
+        return self.root / key[:2] / f"{key}{self.suffix}"
+
+    def get(self, key: str) -> Optional[Path]:
+        """
+        Retorna o arquivo armazenado para a chave, se existir
+
+        Args:
+            key: Chave gerada por make_key
+
+        Returns:
+            Path do arquivo armazenado ou None
+        """
+        path = self.path_for(key)
+        if not path.exists():
+            return None
+
+        # Marca como usado agora (ordem LRU da remoção)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return path
+
+    def put(self, key: str, source: Path) -> Path:
+        """
+        Armazena uma cópia de source sob a chave
+
+        Args:
+            key: Chave gerada por make_key
+            source: Arquivo a armazenar
+
+        Returns:
+            Path do arquivo armazenado
+        """
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Escreve em arquivo temporário e renomeia, para nunca expor arquivo parcial
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        link_or_copy(Path(source), tmp_path)
+        self._replace(tmp_path, path)
+
+        return path
+
+    def put_bytes(self, key: str, data: bytes) -> Path:
+        """
+        Armazena um conteúdo em memória sob a chave
+
+        Args:
+            key: Chave gerada por make_key
+            data: Conteúdo a armazenar
+
+        Returns:
+            Path do arquivo armazenado
+        """
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        self._replace(tmp_path, path)
+
+        return path
+
+    def fetch(self, key: str, destination: Path) -> Optional[Path]:
+        """
+        Copia o arquivo armazenado para destination, se existir
+
+        Args:
+            key: Chave gerada por make_key
+            destination: Caminho de destino
+
+        Returns:
+            destination em caso de acerto, None caso contrário
+        """
+        path = self.get(key)
+        if path is None:
+            return None
+
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        destination.unlink(missing_ok=True)
+        link_or_copy(path, destination)
+
+        return destination
+
+    def _replace(self, tmp_path: Path, path: Path):
+        """Move o arquivo temporário para path, atualiza o total ocupado e remove excessos"""
+        try:
+            previous_size = path.stat().st_size
+        except FileNotFoundError:
+            previous_size = 0
+        added = tmp_path.stat().st_size - previous_size
+
+        os.replace(tmp_path, path)
+
+        if self.max_bytes is None:
+            return
+
+        with self._usage_lock:
+            total = self._usage.get(self._usage_key)
+            if total is not None:
+                total += added
+                self._usage[self._usage_key] = total
+
+        # Primeira escrita (total desconhecido) ou limite estourado: varre o diretório
+        if total is None or total > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Remove os arquivos menos usados recentemente até caber em max_bytes (varre o diretório)"""
+        with self._usage_lock:
+            entries = []
+            for path in self.root.glob(f"*/*{self.suffix}"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+
+            if total > self.max_bytes:
+                target = self.max_bytes * self.EVICT_TARGET
+                entries.sort()
+                for _, size, path in entries:
+                    if total <= target:
+                        break
+                    path.unlink(missing_ok=True)
+                    total -= size
+                    removed += 1
+
+            self._usage[self._usage_key] = total
+
+        if not removed:
+            return
+
+        logger.info(f"🧹 {removed} arquivos removidos de {self.root.name} (limite de {self.max_bytes / 1024 / 1024:.0f} MB)")
+
+
+def link_or_copy(source: Path, destination: Path):
+    """
+    Cria destination como hardlink de source (ou cópia, se não for possível)
+
+    Args:
+        source: Arquivo de origem
+        destination: Caminho de destino (não deve existir)
+    """
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
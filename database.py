@@ -2,24 +2,43 @@
 Database Layer - JSON-based storage for projects, avatars, and jobs
 Simple, lightweight, and sufficient for the application needs
 """
+import os
+import copy
 import json
+import atexit
+import bisect
+import threading
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from datetime import datetime
 import uuid
 
+from pagination import encode_cursor, decode_cursor, normalize_time_range
+
 class Database:
-    """Simple JSON-based database"""
+    """
+    Simple JSON-based database
+
+    All tables live in memory (dicts keyed by id) behind a lock. Mutations only
+    mark their table dirty; a background thread flushes dirty tables every
+    flush_interval seconds with write-temp-then-rename, and once more at exit.
+    Jobs and videos also keep a sorted (timestamp, id) index so history pages
+    are read with a bisect instead of sorting the whole table.
+    """
     
-    def __init__(self, data_dir: str = "./data"):
+    def __init__(self, data_dir: str = "./data", flush_interval: float = None):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         
+        # Serializes access to the in-memory tables (jobs are updated from worker threads)
+        self._lock = threading.RLock()
+        
         # Database files
         self.projects_file = self.data_dir / "projects.json"
         self.avatars_file = self.data_dir / "avatars.json"
         self.jobs_file = self.data_dir / "jobs.json"
         self.tags_file = self.data_dir / "tags.json"
+        self.videos_file = self.data_dir / "videos.json"
         
         # Avatar storage directories
         self.avatars_dir = self.data_dir / "avatars"
@@ -28,6 +47,30 @@ class Database:
         
         # Initialize files if they don't exist
         self._initialize_files()
+        
+        # In-memory tables: file -> {id: record}
+        self._tables: Dict[Path, Dict[str, Dict]] = {
+            file_path: {item['id']: item for item in self._load_json(file_path)}
+            for file_path in (self.projects_file, self.avatars_file, self.jobs_file, self.tags_file, self.videos_file)
+        }
+        self._dirty = set()
+        self._flush_lock = threading.Lock()
+        
+        # Sorted (timestamp, id) indexes for keyset pagination
+        self._indexes: Dict[Path, List[Tuple[str, str]]] = {
+            self.jobs_file: sorted((j.get('started_at') or '', j['id']) for j in self._tables[self.jobs_file].values()),
+            self.videos_file: sorted((v.get('created_at') or '', v['id']) for v in self._tables[self.videos_file].values()),
+        }
+        
+        # Write-behind flusher
+        if flush_interval is None:
+            from config import Config
+            flush_interval = Config.DATABASE_FLUSH_INTERVAL
+        self.flush_interval = flush_interval
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name='db-flush', daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
     
     def _initialize_files(self):
         """Create database files if they don't exist"""
@@ -40,6 +83,9 @@ class Database:
         if not self.jobs_file.exists():
             self._save_json(self.jobs_file, [])
         
+        if not self.videos_file.exists():
+            self._save_json(self.videos_file, [])
+        
         if not self.tags_file.exists():
             # Create default tags
             default_tags = [
@@ -59,9 +105,98 @@ class Database:
             return [] if file_path.suffix == '.json' else {}
     
     def _save_json(self, file_path: Path, data: Any):
-        """Save JSON file"""
-        with open(file_path, 'w', encoding='utf-8') as f:
+        """Save JSON file (write to a temp file, then atomically rename over the old one)"""
+        tmp_file = file_path.with_suffix('.json.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, file_path)
+    
+    def _table(self, file_path: Path) -> Dict[str, Dict]:
+        """In-memory table for a database file (call with the lock held)"""
+        return self._tables[file_path]
+    
+    def _index_add(self, file_path: Path, sort_value: str, record_id: str):
+        """Insert a record into a sorted index (call with the lock held)"""
+        bisect.insort(self._indexes[file_path], (sort_value or '', record_id))
+    
+    def _index_remove(self, file_path: Path, sort_value: str, record_id: str):
+        """Remove a record from a sorted index (call with the lock held)"""
+        index = self._indexes[file_path]
+        key = (sort_value or '', record_id)
+        position = bisect.bisect_left(index, key)
+        if position < len(index) and index[position] == key:
+            del index[position]
+    
+    def _page(self, file_path: Path, predicate: Callable[[Dict], bool], since: str = None,
+              until: str = None, cursor: str = None, limit: int = 50) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Walk a sorted index newest-first and return one page of matching records
+        
+        since/until bound the timestamp range with a bisect; the cursor resumes
+        right after the last item of the previous page.
+        """
+        since, until = normalize_time_range(since, until)
+        index = self._indexes[file_path]
+        table = self._table(file_path)
+        
+        end = len(index)
+        if until:
+            end = bisect.bisect_right(index, (until, '\uffff'))
+        
+        position = decode_cursor(cursor)
+        if position:
+            end = min(end, bisect.bisect_left(index, position))
+        
+        items = []
+        i = end - 1
+        while i >= 0 and len(items) < limit:
+            sort_value, record_id = index[i]
+            if since and sort_value < since:
+                break
+            record = table.get(record_id)
+            if record is not None and predicate(record):
+                items.append(record)
+            i -= 1
+        
+        next_cursor = None
+        if len(items) == limit and i >= 0 and not (since and index[i][0] < since):
+            next_cursor = encode_cursor(*index[i + 1])
+        
+        return copy.deepcopy(items), next_cursor
+    
+    def _mark_dirty(self, file_path: Path):
+        """Schedule a table for the next flush (call with the lock held)"""
+        self._dirty.add(file_path)
+    
+    def flush(self):
+        """Write all dirty tables to disk now"""
+        # One flush at a time (flusher thread vs close()): writers share the temp
+        # file name, and a newer snapshot must never be overwritten by an older one
+        with self._flush_lock:
+            with self._lock:
+                snapshots = {
+                    file_path: copy.deepcopy(list(self._tables[file_path].values()))
+                    for file_path in self._dirty
+                }
+                self._dirty.clear()
+            
+            for file_path, rows in snapshots.items():
+                try:
+                    self._save_json(file_path, rows)
+                except Exception as e:
+                    print(f"Error saving {file_path}: {e}")
+                    with self._lock:
+                        self._dirty.add(file_path)
+    
+    def close(self):
+        """Stop the flusher and write pending changes"""
+        self._stop.set()
+        self.flush()
+    
+    def _flush_loop(self):
+        """Background thread: coalesce mutations into one write per table per interval"""
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
     
     # ========================================================================
     # PROJECTS
@@ -69,8 +204,6 @@ class Database:
     
     def create_project(self, name: str, description: str = "", tags: List[str] = None) -> Dict:
         """Create a new project"""
-        projects = self._load_json(self.projects_file)
-        
         project = {
             "id": f"proj_{uuid.uuid4().hex[:8]}",
             "name": name,
@@ -81,81 +214,72 @@ class Database:
             "updated_at": datetime.now().isoformat()
         }
         
-        projects.append(project)
-        self._save_json(self.projects_file, projects)
-        
-        return project
+        with self._lock:
+            self._table(self.projects_file)[project['id']] = project
+            self._mark_dirty(self.projects_file)
+            return copy.deepcopy(project)
     
     def get_projects(self, tag_filter: str = None) -> List[Dict]:
         """Get all projects, optionally filtered by tag"""
-        projects = self._load_json(self.projects_file)
-        
-        if tag_filter:
-            projects = [p for p in projects if tag_filter in p.get('tags', [])]
-        
-        # Sort by updated_at descending
-        projects.sort(key=lambda x: x.get('updated_at', ''), reverse=True)
-        
-        return projects
+        with self._lock:
+            projects = list(self._table(self.projects_file).values())
+            
+            if tag_filter:
+                projects = [p for p in projects if tag_filter in p.get('tags', [])]
+            
+            # Sort by updated_at descending
+            projects.sort(key=lambda x: x.get('updated_at', ''), reverse=True)
+            
+            return copy.deepcopy(projects)
     
     def get_project(self, project_id: str) -> Optional[Dict]:
         """Get a specific project"""
-        projects = self._load_json(self.projects_file)
-        
-        for project in projects:
-            if project['id'] == project_id:
-                return project
-        
-        return None
+        with self._lock:
+            return copy.deepcopy(self._table(self.projects_file).get(project_id))
     
     def update_project(self, project_id: str, updates: Dict) -> Optional[Dict]:
         """Update a project"""
-        projects = self._load_json(self.projects_file)
-        
-        for i, project in enumerate(projects):
-            if project['id'] == project_id:
-                project.update(updates)
-                project['updated_at'] = datetime.now().isoformat()
-                projects[i] = project
-                self._save_json(self.projects_file, projects)
-                return project
-        
-        return None
+        with self._lock:
+            project = self._table(self.projects_file).get(project_id)
+            if project is None:
+                return None
+            
+            project.update(copy.deepcopy(updates))
+            project['updated_at'] = datetime.now().isoformat()
+            self._mark_dirty(self.projects_file)
+            return copy.deepcopy(project)
     
     def delete_project(self, project_id: str) -> bool:
         """Delete a project"""
-        projects = self._load_json(self.projects_file)
-        
-        projects = [p for p in projects if p['id'] != project_id]
-        self._save_json(self.projects_file, projects)
+        with self._lock:
+            self._table(self.projects_file).pop(project_id, None)
+            self._mark_dirty(self.projects_file)
         
         return True
     
     def add_video_to_project(self, project_id: str, video_data: Dict) -> bool:
         """Add a video to a project"""
-        projects = self._load_json(self.projects_file)
-        
-        for i, project in enumerate(projects):
-            if project['id'] == project_id:
-                if 'videos' not in project:
-                    project['videos'] = []
-                
-                video_entry = {
-                    "id": f"vid_{uuid.uuid4().hex[:8]}",
-                    "path": video_data.get('path'),
-                    "name": video_data.get('name', 'Untitled'),
-                    "duration": video_data.get('duration', 0),
-                    "created_at": datetime.now().isoformat()
-                }
-                
-                project['videos'].append(video_entry)
-                project['updated_at'] = datetime.now().isoformat()
-                projects[i] = project
-                self._save_json(self.projects_file, projects)
-                
-                return True
-        
-        return False
+        with self._lock:
+            project = self._table(self.projects_file).get(project_id)
+            if project is None:
+                return False
+            
+            if 'videos' not in project:
+                project['videos'] = []
+            
+            video_entry = {
+                "id": f"vid_{uuid.uuid4().hex[:8]}",
+                "path": video_data.get('path'),
+                "name": video_data.get('name', 'Untitled'),
+                "duration": video_data.get('duration', 0),
+                "created_at": datetime.now().isoformat()
+            }
+            
+            project['videos'].append(video_entry)
+            project['updated_at'] = datetime.now().isoformat()
+            self._mark_dirty(self.projects_file)
+            
+            return True
     
     # ========================================================================
     # AVATARS
@@ -163,8 +287,6 @@ class Database:
     
     def create_avatar(self, name: str, image_path: str, thumbnail_path: str = None) -> Dict:
         """Create a new avatar entry"""
-        avatars = self._load_json(self.avatars_file)
-        
         avatar = {
             "id": f"avatar_{uuid.uuid4().hex[:8]}",
             "name": name,
@@ -173,43 +295,37 @@ class Database:
             "created_at": datetime.now().isoformat()
         }
         
-        avatars.append(avatar)
-        self._save_json(self.avatars_file, avatars)
-        
-        return avatar
+        with self._lock:
+            self._table(self.avatars_file)[avatar['id']] = avatar
+            self._mark_dirty(self.avatars_file)
+            return copy.deepcopy(avatar)
     
     def get_avatars(self) -> List[Dict]:
         """Get all avatars"""
-        avatars = self._load_json(self.avatars_file)
-        avatars.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-        return avatars
+        with self._lock:
+            avatars = list(self._table(self.avatars_file).values())
+            avatars.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+            return copy.deepcopy(avatars)
     
     def get_avatar(self, avatar_id: str) -> Optional[Dict]:
         """Get a specific avatar"""
-        avatars = self._load_json(self.avatars_file)
-        
-        for avatar in avatars:
-            if avatar['id'] == avatar_id:
-                return avatar
-        
-        return None
+        with self._lock:
+            return copy.deepcopy(self._table(self.avatars_file).get(avatar_id))
     
     def delete_avatar(self, avatar_id: str) -> bool:
         """Delete an avatar"""
-        avatars = self._load_json(self.avatars_file)
+        with self._lock:
+            avatar = self._table(self.avatars_file).pop(avatar_id, None)
+            self._mark_dirty(self.avatars_file)
         
         # Find and delete avatar files
-        for avatar in avatars:
-            if avatar['id'] == avatar_id:
-                try:
-                    Path(avatar['image_path']).unlink(missing_ok=True)
-                    if avatar.get('thumbnail_path'):
-                        Path(avatar['thumbnail_path']).unlink(missing_ok=True)
-                except Exception as e:
-                    print(f"Error deleting avatar files: {e}")
-        
-        avatars = [a for a in avatars if a['id'] != avatar_id]
-        self._save_json(self.avatars_file, avatars)
+        if avatar:
+            try:
+                Path(avatar['image_path']).unlink(missing_ok=True)
+                if avatar.get('thumbnail_path'):
+                    Path(avatar['thumbnail_path']).unlink(missing_ok=True)
+            except Exception as e:
+                print(f"Error deleting avatar files: {e}")
         
         return True
     
@@ -219,71 +335,132 @@ class Database:
     
     def create_job(self, job_data: Dict) -> Dict:
         """Create a job entry"""
-        jobs = self._load_json(self.jobs_file)
-        
         job = {
             "id": job_data.get('id', f"job_{uuid.uuid4().hex[:8]}"),
             "type": job_data.get('type', 'video_generation'),
-            "status": "processing",  # processing, completed, failed
+            "status": job_data.get('status', 'processing'),  # queued, processing, completed, failed
             "progress": 0,
             "estimated_time": job_data.get('estimated_time', 0),
             "started_at": datetime.now().isoformat(),
             "completed_at": None,
             "video_path": None,
             "project_id": job_data.get('project_id'),
-            "metadata": job_data.get('metadata', {})
+            "metadata": copy.deepcopy(job_data.get('metadata', {}))
         }
         
-        jobs.append(job)
-        self._save_json(self.jobs_file, jobs)
-        
-        return job
+        with self._lock:
+            previous = self._table(self.jobs_file).get(job['id'])
+            if previous is not None:
+                self._index_remove(self.jobs_file, previous.get('started_at'), previous['id'])
+            self._table(self.jobs_file)[job['id']] = job
+            self._index_add(self.jobs_file, job['started_at'], job['id'])
+            self._mark_dirty(self.jobs_file)
+            return copy.deepcopy(job)
     
     def update_job(self, job_id: str, updates: Dict) -> Optional[Dict]:
         """Update a job"""
-        jobs = self._load_json(self.jobs_file)
-        
-        for i, job in enumerate(jobs):
-            if job['id'] == job_id:
-                job.update(updates)
-                
-                if updates.get('status') == 'completed':
-                    job['completed_at'] = datetime.now().isoformat()
-                    job['progress'] = 100
-                
-                jobs[i] = job
-                self._save_json(self.jobs_file, jobs)
-                return job
-        
-        return None
+        with self._lock:
+            job = self._table(self.jobs_file).get(job_id)
+            if job is None:
+                return None
+            
+            if 'started_at' in updates:
+                self._index_remove(self.jobs_file, job.get('started_at'), job_id)
+                self._index_add(self.jobs_file, updates['started_at'], job_id)
+            
+            job.update(copy.deepcopy(updates))
+            
+            if updates.get('status') == 'completed':
+                job['completed_at'] = datetime.now().isoformat()
+                job['progress'] = 100
+            
+            self._mark_dirty(self.jobs_file)
+            return copy.deepcopy(job)
     
     def get_jobs(self, status: str = None, limit: int = 50) -> List[Dict]:
         """Get jobs, optionally filtered by status"""
-        jobs = self._load_json(self.jobs_file)
-        
-        if status:
-            jobs = [j for j in jobs if j.get('status') == status]
-        
-        # Sort by started_at descending
-        jobs.sort(key=lambda x: x.get('started_at', ''), reverse=True)
-        
-        return jobs[:limit]
+        return self.list_jobs(status=status, limit=limit)[0]
+    
+    def list_jobs(self, status: str = None, project_id: str = None, since: str = None, until: str = None,
+                  cursor: str = None, limit: int = 50) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Get one page of jobs, newest first
+        
+        since/until are inclusive ISO dates or timestamps compared against started_at
+        (a date-only until covers the whole day). Pass the
+        returned next_cursor back to get the following page (None = last page).
+        """
+        def matches(job: Dict) -> bool:
+            if status and job.get('status') != status:
+                return False
+            return not project_id or job.get('project_id') == project_id
+        
+        with self._lock:
+            return self._page(self.jobs_file, matches, since, until, cursor, limit)
     
     def get_job(self, job_id: str) -> Optional[Dict]:
         """Get a specific job"""
-        jobs = self._load_json(self.jobs_file)
-        
-        for job in jobs:
-            if job['id'] == job_id:
-                return job
-        
-        return None
+        with self._lock:
+            return copy.deepcopy(self._table(self.jobs_file).get(job_id))
     
     def delete_job(self, job_id: str) -> bool:
         """Delete a job"""
-        jobs = self._load_json(self.jobs_file)
-        jobs = [j for j in jobs if j['id'] != job_id]
-        self._save_json(self.jobs_file, jobs)
+        with self._lock:
+            job = self._table(self.jobs_file).pop(job_id, None)
+            if job is not None:
+                self._index_remove(self.jobs_file, job.get('started_at'), job_id)
+            self._mark_dirty(self.jobs_file)
+        return True
+    
+    # ========================================================================
+    # VIDEOS (catalogue of generated outputs)
+    # ========================================================================
+    
+    def add_video(self, video_data: Dict) -> Dict:
+        """Register an output video in the catalogue (re-registering a path updates it)"""
+        with self._lock:
+            table = self._table(self.videos_file)
+            existing = next((v for v in table.values() if v.get('path') == video_data.get('path')), None)
+            
+            video = {
+                "id": existing['id'] if existing else f"vid_{uuid.uuid4().hex[:8]}",
+                "path": video_data.get('path'),
+                "name": video_data.get('name') or Path(video_data.get('path') or 'Untitled').name,
+                "size": video_data.get('size', 0),
+                "duration": video_data.get('duration', 0),
+                "job_id": video_data.get('job_id'),
+                "project_id": video_data.get('project_id'),
+                "created_at": video_data.get('created_at') or datetime.now().isoformat()
+            }
+            
+            if existing:
+                self._index_remove(self.videos_file, existing.get('created_at'), existing['id'])
+            table[video['id']] = video
+            self._index_add(self.videos_file, video['created_at'], video['id'])
+            self._mark_dirty(self.videos_file)
+            return copy.deepcopy(video)
+    
+    def list_videos(self, project_id: str = None, since: str = None, until: str = None,
+                    cursor: str = None, limit: int = 50) -> Tuple[List[Dict], Optional[str]]:
+        """Get one page of catalogued videos, newest first (same cursor contract as list_jobs)"""
+        def matches(video: Dict) -> bool:
+            return not project_id or video.get('project_id') == project_id
+        
+        with self._lock:
+            return self._page(self.videos_file, matches, since, until, cursor, limit)
+    
+    def count_videos(self) -> int:
+        """Number of catalogued videos"""
+        with self._lock:
+            return len(self._table(self.videos_file))
+    
+    def delete_video(self, video_id: str) -> bool:
+        """Remove a video from the catalogue (the file itself is left alone)"""
+        with self._lock:
+            video = self._table(self.videos_file).pop(video_id, None)
+            if video is not None:
+                self._index_remove(self.videos_file, video.get('created_at'), video_id)
+            self._mark_dirty(self.videos_file)
         return True
     
     # ========================================================================
@@ -292,32 +469,60 @@ class Database:
     
     def create_tag(self, name: str, color: str = "#667eea") -> Dict:
         """Create a new tag"""
-        tags = self._load_json(self.tags_file)
-        
         tag = {
             "id": f"tag_{uuid.uuid4().hex[:8]}",
             "name": name,
             "color": color
         }
         
-        tags.append(tag)
-        self._save_json(self.tags_file, tags)
-        
-        return tag
+        with self._lock:
+            self._table(self.tags_file)[tag['id']] = tag
+            self._mark_dirty(self.tags_file)
+            return copy.deepcopy(tag)
     
     def get_tags(self) -> List[Dict]:
         """Get all tags"""
-        tags = self._load_json(self.tags_file)
-        tags.sort(key=lambda x: x.get('name', ''))
-        return tags
+        with self._lock:
+            tags = list(self._table(self.tags_file).values())
+            tags.sort(key=lambda x: x.get('name', ''))
+            return copy.deepcopy(tags)
     
     def delete_tag(self, tag_id: str) -> bool:
         """Delete a tag"""
-        tags = self._load_json(self.tags_file)
-        tags = [t for t in tags if t['id'] != tag_id]
-        self._save_json(self.tags_file, tags)
+        with self._lock:
+            self._table(self.tags_file).pop(tag_id, None)
+            self._mark_dirty(self.tags_file)
         return True
 
 
+def create_database(backend: str = None, data_dir: str = "./data"):
+    """
+    Create the database for the configured backend (Config.DATABASE_BACKEND)
+
+    The first time the SQLite backend is used, existing data/*.json files are
+    imported into it automatically.
+    """
+    from config import Config
+
+    backend = (backend or Config.DATABASE_BACKEND).lower()
+
+    if backend == 'sqlite':
+        from sqlite_database import SQLiteDatabase
+
+        is_new = not (Path(data_dir) / "app.db").exists()
+        database = SQLiteDatabase(data_dir)
+
+        if is_new and any((Path(data_dir) / f"{name}.json").exists() for name in ('projects', 'avatars', 'jobs', 'tags', 'videos')):
+            counts = database.import_json()
+            print(f"Migrated JSON database into {database.db_path}: {counts}")
+
+        return database
+
+    if backend == 'json':
+        return Database(data_dir)
+
+    raise ValueError(f"Invalid DATABASE_BACKEND: {backend}. Use 'sqlite' or 'json'")
+
+
 # Global database instance
-db = Database()
+db = create_database()
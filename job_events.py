@@ -0,0 +1,82 @@
+"""
+Barramento de eventos de progresso dos jobs
+Entrega em tempo real (ex: para o endpoint SSE) cada atualização publicada por
+Job.update_progress, sem que os clientes precisem reler o banco em polling
+"""
+import queue
+import threading
+from typing import Dict, List
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Tipos de evento que encerram o stream de um job
+TERMINAL_EVENTS = ('completed', 'failed')
+
+
+class JobEventBus:
+    """Publica eventos por job_id para todos os assinantes daquele job"""
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls) -> 'JobEventBus':
+        """Retorna o barramento global do processo (criado sob demanda)"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self):
+        """Inicializa o barramento"""
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[queue.Queue]] = {}
+
+    def publish(self, job_id: str, event: Dict):
+        """
+        Publica um evento para os assinantes do job
+
+        Args:
+            job_id: ID do job
+            event: Dict do evento (deve conter 'type')
+        """
+        event = dict(event, job_id=job_id)
+
+        with self._lock:
+            subscribers = list(self._subscribers.get(job_id, []))
+
+        for subscriber in subscribers:
+            subscriber.put(event)
+
+    def subscribe(self, job_id: str) -> queue.Queue:
+        """
+        Assina os eventos de um job
+
+        Args:
+            job_id: ID do job
+
+        Returns:
+            Fila que recebe os eventos publicados a partir de agora
+        """
+        subscriber = queue.Queue()
+
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append(subscriber)
+
+        return subscriber
+
+    def unsubscribe(self, job_id: str, subscriber: queue.Queue):
+        """
+        Cancela uma assinatura
+
+        Args:
+            job_id: ID do job
+            subscriber: Fila retornada por subscribe
+        """
+        with self._lock:
+            subscribers = self._subscribers.get(job_id, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
@@ -1,19 +1,24 @@
 """
 Gerenciador de Jobs - Orquestra todo o pipeline de geração de vídeos
 """
+import os
 import json
+import time
 import uuid
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Callable, Optional
 from enum import Enum
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 
 from config import Config
-from utils import get_logger, validate_text, validate_images, estimate_cost, estimate_time
+from utils import get_logger, validate_text, validate_images, estimate_cost, estimate_time, chain_future
 from text_processor import TextProcessor
 from audio_generator import AudioGenerator
 from video_generator import VideoGenerator
-from video_concatenator import VideoConcatenator
+from video_concatenator import VideoConcatenator, IncrementalConcatenator
+from job_events import JobEventBus
 
 logger = get_logger(__name__)
 
@@ -27,10 +32,20 @@ class JobStatus(Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+# Ordem das etapas, usada pelo modo pipeline para avançar o status do job
+_STAGE_ORDER = [
+    JobStatus.CREATED,
+    JobStatus.PROCESSING_TEXT,
+    JobStatus.GENERATING_AUDIO,
+    JobStatus.GENERATING_VIDEO,
+    JobStatus.CONCATENATING,
+]
+
 class Job:
     """Representa um job de geração de vídeo"""
 
-    def __init__(self, job_id: str, input_text: str, voice_name: str, image_paths: List[str], model_id: str = "eleven_multilingual_v3"):
+    def __init__(self, job_id: str, input_text: str, voice_name: str, image_paths: List[str], model_id: str = "eleven_multilingual_v3",
+                 audio_provider: str = None):
         """
         Inicializa um novo job
 
@@ -40,11 +55,13 @@ class Job:
             voice_name: Nome da voz ElevenLabs
             image_paths: Lista de caminhos das imagens
             model_id: Modelo ElevenLabs a usar
+            audio_provider: Provedor de TTS usado (gravado no estado para retomar o job)
         """
         self.job_id = job_id
         self.input_text = input_text
         self.voice_name = voice_name
         self.model_id = model_id
+        self.audio_provider = audio_provider
         self.image_paths = [Path(p) for p in image_paths]
 
         self.status = JobStatus.CREATED
@@ -62,33 +79,192 @@ class Job:
         self.videos = []
         self.final_video_path = None
 
+        # Checkpoints por segmento (batch_number -> artefatos já produzidos), gravados
+        # em state.json para que resume_job continue de onde o job parou:
+        # {'formatted_path', 'audio_path', 'image_path', 'audio_url', 'image_url', 'request_id', 'video_path'}
+        # Segmentos que falharam também guardam 'error' e 'attempts' (ver failure_report)
+        self.segments: Dict[int, Dict] = {}
+        self._state_lock = threading.RLock()
+
         # Progresso
         self.progress_message = "Job criado"
         self.progress_percent = 0
 
+        # Último status publicado no barramento de eventos (para detectar troca de etapa)
+        self._published_status = self.status
+
+        # Se True, mark_completed/mark_failed não publicam o evento final: quem roda o job
+        # (ex: web_server) publica depois de persistir o resultado, para que um cliente
+        # que receba 'completed' já encontre o job concluído no banco
+        self.defer_terminal_event = False
+
         logger.info(f"Job {job_id} criado")
 
-    def save_state(self):
-        """Salva estado atual do job em JSON"""
-        state_file = self.job_dir / 'state.json'
+    def publish_event(self, event_type: str):
+        """
+        Publica o estado atual do job no barramento de eventos (SSE)
+
+        Args:
+            event_type: 'progress', 'stage', 'completed' ou 'failed'
+        """
+        self._published_status = self.status
 
-        state = {
-            'job_id': self.job_id,
+        JobEventBus.instance().publish(self.job_id, {
+            'type': event_type,
             'status': self.status.value,
-            'created_at': self.created_at.isoformat(),
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'message': self.progress_message,
+            'progress': self.progress_percent,
             'error': self.error,
-            'voice_name': self.voice_name,
-            'progress_message': self.progress_message,
-            'progress_percent': self.progress_percent,
-            'final_video_path': str(self.final_video_path) if self.final_video_path else None
-        }
+            'video_path': str(self.final_video_path) if self.final_video_path else None,
+            'duration': (self.completed_at - self.created_at).total_seconds() if self.completed_at else None
+        })
+
+    def save_state(self):
+        """Salva estado atual do job em JSON (inclui os checkpoints dos segmentos)"""
+        state_file = self.job_dir / 'state.json'
+
+        with self._state_lock:
+            state = {
+                'job_id': self.job_id,
+                'status': self.status.value,
+                'created_at': self.created_at.isoformat(),
+                'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+                'error': self.error,
+                'input_text': self.input_text,
+                'voice_name': self.voice_name,
+                'model_id': self.model_id,
+                'audio_provider': self.audio_provider,
+                'image_paths': [str(p) for p in self.image_paths],
+                'progress_message': self.progress_message,
+                'progress_percent': self.progress_percent,
+                'final_video_path': str(self.final_video_path) if self.final_video_path else None,
+                'segments': {str(n): dict(segment) for n, segment in sorted(self.segments.items())}
+            }
 
-        with open(state_file, 'w') as f:
-            json.dump(state, f, indent=2)
+            # Grava em arquivo temporário e renomeia: um crash no meio não corrompe o estado
+            tmp_file = state_file.with_suffix('.json.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_file, state_file)
+
+        if self.status != self._published_status and self.status not in (JobStatus.COMPLETED, JobStatus.FAILED):
+            self.publish_event('stage')
 
         logger.debug(f"Estado do job {self.job_id} salvo")
 
+    def checkpoint(self, batch_number: int, **artifacts):
+        """
+        Registra artefatos de um segmento e grava o estado
+
+        Args:
+            batch_number: Número do segmento
+            **artifacts: Campos do checkpoint (None remove o campo)
+        """
+        with self._state_lock:
+            segment = self.segments.setdefault(batch_number, {})
+            for name, value in artifacts.items():
+                if value is None:
+                    segment.pop(name, None)
+                else:
+                    segment[name] = str(value) if isinstance(value, Path) else value
+            self.save_state()
+
+    def segment(self, batch_number: int) -> Dict:
+        """Cópia do checkpoint de um segmento ({} se ainda não houver)"""
+        with self._state_lock:
+            return dict(self.segments.get(batch_number, {}))
+
+    def artifact(self, batch_number: int, name: str) -> Optional[Path]:
+        """
+        Arquivo registrado no checkpoint de um segmento, se ainda existir em disco
+
+        Args:
+            batch_number: Número do segmento
+            name: 'formatted_path', 'audio_path' ou 'video_path'
+
+        Returns:
+            Path do arquivo ou None
+        """
+        value = self.segment(batch_number).get(name)
+        if value and Path(value).exists():
+            return Path(value)
+        return None
+
+    def failure_report(self) -> List[Dict]:
+        """
+        Segmentos que continuam com falha
+
+        Returns:
+            Lista ordenada por segmento:
+            [{'segment': 3, 'stage': 'video', 'error': '...', 'attempts': 3}, ...]
+        """
+        with self._state_lock:
+            report = []
+            for batch_number, segment in sorted(self.segments.items()):
+                if not segment.get('error'):
+                    continue
+
+                if not segment.get('formatted_path'):
+                    stage = 'text'
+                elif not segment.get('audio_path'):
+                    stage = 'audio'
+                else:
+                    stage = 'video'
+
+                report.append({
+                    'segment': batch_number,
+                    'stage': stage,
+                    'error': segment['error'],
+                    'attempts': segment.get('attempts', 1)
+                })
+
+            return report
+
+    @classmethod
+    def load(cls, job_id: str) -> 'Job':
+        """
+        Recria um job a partir do state.json gravado em disco
+
+        Args:
+            job_id: ID do job
+
+        Returns:
+            Job com status, progresso e checkpoints restaurados
+
+        Raises:
+            Exception: Se o estado não existir ou não tiver os dados para retomar
+        """
+        state_file = Config.TEMP_FOLDER / f'job_{job_id}' / 'state.json'
+        if not state_file.exists():
+            raise FileNotFoundError(f"Estado do job {job_id} não encontrado")
+
+        with open(state_file, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+
+        if not state.get('input_text') or not state.get('image_paths'):
+            raise Exception(f"Estado do job {job_id} não tem os dados necessários para retomar")
+
+        job = cls(
+            job_id,
+            state['input_text'],
+            state['voice_name'],
+            state['image_paths'],
+            state.get('model_id') or "eleven_multilingual_v3",
+            state.get('audio_provider')
+        )
+
+        job.status = JobStatus(state['status'])
+        job.created_at = datetime.fromisoformat(state['created_at'])
+        job.completed_at = datetime.fromisoformat(state['completed_at']) if state.get('completed_at') else None
+        job.error = state.get('error')
+        job.progress_message = state.get('progress_message', job.progress_message)
+        job.progress_percent = state.get('progress_percent', 0)
+        job.final_video_path = Path(state['final_video_path']) if state.get('final_video_path') else None
+        job.segments = {int(n): segment for n, segment in state.get('segments', {}).items()}
+        job._published_status = job.status
+
+        return job
+
     def update_progress(self, message: str, percent: int):
         """
         Atualiza progresso do job
@@ -100,6 +276,7 @@ class Job:
         self.progress_message = message
         self.progress_percent = min(100, max(0, percent))
         self.save_state()
+        self.publish_event('progress')
         logger.info(f"Job {self.job_id}: {message} ({percent}%)")
 
     def mark_completed(self, final_video_path: Path):
@@ -112,7 +289,11 @@ class Job:
         self.status = JobStatus.COMPLETED
         self.completed_at = datetime.now()
         self.final_video_path = final_video_path
-        self.update_progress("Concluído com sucesso!", 100)
+        self.progress_message = "Concluído com sucesso!"
+        self.progress_percent = 100
+        self.save_state()
+        if not self.defer_terminal_event:
+            self.publish_event('completed')
         logger.info(f"Job {self.job_id} concluído: {final_video_path}")
 
     def mark_failed(self, error: str):
@@ -126,11 +307,49 @@ class Job:
         self.completed_at = datetime.now()
         self.error = error
         self.save_state()
+        if not self.defer_terminal_event:
+            self.publish_event('failed')
         logger.error(f"Job {self.job_id} falhou: {error}")
 
 class JobManager:
     """Gerencia a execução de jobs de geração de vídeo"""
 
+    # Jobs enfileirados ou em execução neste processo (compartilhado entre instâncias)
+    _active_jobs = set()
+    _active_lock = threading.Lock()
+
+    @classmethod
+    def claim_job(cls, job_id: str) -> bool:
+        """
+        Reserva um job para execução (impede duas execuções simultâneas do mesmo job)
+
+        Args:
+            job_id: ID do job
+
+        Returns:
+            True se reservado, False se o job já está enfileirado ou rodando
+        """
+        with cls._active_lock:
+            if job_id in cls._active_jobs:
+                return False
+            cls._active_jobs.add(job_id)
+            return True
+
+    @classmethod
+    def release_job(cls, job_id: str):
+        """Libera a reserva feita com claim_job"""
+        with cls._active_lock:
+            cls._active_jobs.discard(job_id)
+
+    @staticmethod
+    def incremental_enabled() -> bool:
+        """
+        Indica se os jobs montam o vídeo final de forma incremental (com preview HLS)
+
+        Transições exigem todos os segmentos em um único encode, então desativam o modo.
+        """
+        return Config.INCREMENTAL_CONCAT and Config.VIDEO_TRANSITION_DURATION <= 0
+
     def __init__(self, audio_provider: str = None):
         """
         Inicializa o gerenciador de jobs
@@ -176,7 +395,7 @@ class JobManager:
 
         # Cria job
         job_id = str(uuid.uuid4())
-        job = Job(job_id, input_text, voice_name, image_paths, model_id)
+        job = Job(job_id, input_text, voice_name, image_paths, model_id, self.audio_generator.provider)
 
         logger.info(f"Job criado: {job_id}")
 
@@ -186,7 +405,8 @@ class JobManager:
         self,
         job: Job,
         progress_callback: Optional[Callable[[str, int], None]] = None,
-        max_workers_video: int = 3
+        max_workers_video: int = 3,
+        pipeline: Optional[bool] = None
     ) -> Path:
         """
         Processa um job completo
@@ -195,6 +415,8 @@ class JobManager:
             job: Job a processar
             progress_callback: Função de callback para progresso (message, percent)
             max_workers_video: Número máximo de vídeos processados simultaneamente no WaveSpeed (padrão: 3)
+            pipeline: Se True, processa cada segmento texto → áudio → vídeo sem barreiras
+                      entre etapas (padrão: Config.PIPELINE_MODE)
 
         Returns:
             Path do vídeo final gerado
@@ -202,6 +424,8 @@ class JobManager:
         Raises:
             Exception: Se o processamento falhar
         """
+        incremental = None
+
         try:
             def update_progress(message: str, percent: int):
                 """Helper para atualizar progresso"""
@@ -211,60 +435,118 @@ class JobManager:
 
             logger.info(f"Iniciando processamento do job {job.job_id}")
 
-            # ETAPA 1: Processar texto com Gemini
-            update_progress("Formatando texto com IA...", 5)
-            job.status = JobStatus.PROCESSING_TEXT
-            job.save_state()
-
-            job.formatted_texts = self.text_processor.process_text(
-                full_text=job.input_text,
-                output_dir=job.job_dir,
-                progress_callback=lambda msg: update_progress(msg, 10)
-            )
-
-            update_progress(f"Texto formatado em {len(job.formatted_texts)} batches", 20)
-
-            # ETAPA 2: Gerar áudios com ElevenLabs
-            update_progress("Gerando áudios com síntese de voz...", 25)
-            job.status = JobStatus.GENERATING_AUDIO
-            job.save_state()
-
-            voice_id = self.audio_generator.get_voice_id_by_name(job.voice_name)
-
-            job.audios = self.audio_generator.generate_audios_batch(
-                texts=job.formatted_texts,
-                voice_id=voice_id,
-                output_dir=job.job_dir,
-                model_id=job.model_id,
-                progress_callback=lambda msg: update_progress(msg, 30)
-            )
-
-            # Verifica se todos os áudios foram gerados
-            failed_audios = [a for a in job.audios if a.get('error')]
-            if failed_audios:
-                raise Exception(f"{len(failed_audios)} áudios falharam ao gerar")
-
-            update_progress(f"{len(job.audios)} áudios gerados com sucesso", 50)
-
-            # ETAPA 3: Gerar vídeos com lip-sync (WaveSpeed)
-            update_progress(f"Gerando {len(job.audios)} vídeos com lip-sync em paralelo...", 55)
-            job.status = JobStatus.GENERATING_VIDEO
-            job.save_state()
-
-            job.videos = self.video_generator.generate_videos_batch(
-                audios=job.audios,
-                image_paths=job.image_paths,
-                output_dir=job.job_dir,
-                progress_callback=lambda msg: update_progress(msg, 60),
-                max_workers=max_workers_video
-            )
-
-            # Verifica se todos os vídeos foram gerados
-            failed_videos = [v for v in job.videos if v.get('error')]
-            if failed_videos:
-                raise Exception(f"{len(failed_videos)} vídeos falharam ao gerar")
-
-            update_progress(f"{len(job.videos)} vídeos gerados com sucesso", 85)
+            if pipeline is None:
+                pipeline = Config.PIPELINE_MODE
+
+            # Vídeo final montado conforme os segmentos ficam prontos
+            if self.incremental_enabled():
+                incremental = IncrementalConcatenator(self.video_concatenator, job.job_dir / 'progressive')
+
+            def on_video(video_data: Dict):
+                """Entrega cada vídeo pronto ao concatenador incremental"""
+                if incremental is not None and video_data.get('video_path'):
+                    incremental.add(video_data['video_number'], video_data['video_path'])
+
+            if pipeline:
+                self._run_pipeline(job, update_progress, max_workers_video, on_video)
+            else:
+                # ETAPA 1: Processar texto com Gemini
+                update_progress("Formatando texto com IA...", 5)
+                job.status = JobStatus.PROCESSING_TEXT
+                job.save_state()
+
+                job.formatted_texts = self.text_processor.process_text(
+                    full_text=job.input_text,
+                    output_dir=job.job_dir,
+                    progress_callback=lambda msg: update_progress(msg, 10)
+                )
+
+                for text_data in job.formatted_texts:
+                    job.checkpoint(text_data['batch_number'], formatted_path=text_data['file_path'])
+
+                update_progress(f"Texto formatado em {len(job.formatted_texts)} batches", 20)
+
+                # ETAPA 2: Gerar áudios com ElevenLabs
+                update_progress("Gerando áudios com síntese de voz...", 25)
+                job.status = JobStatus.GENERATING_AUDIO
+                job.save_state()
+
+                voice_id = self.audio_generator.get_voice_id_by_name(job.voice_name)
+
+                job.audios = self.audio_generator.generate_audios_batch(
+                    texts=job.formatted_texts,
+                    voice_id=voice_id,
+                    output_dir=job.job_dir,
+                    model_id=job.model_id,
+                    progress_callback=lambda msg: update_progress(msg, 30)
+                )
+
+                for audio_data in job.audios:
+                    if not audio_data.get('error'):
+                        job.checkpoint(audio_data['audio_number'], audio_path=audio_data['audio_path'])
+
+                # Repete só os áudios que falharam
+                failures = {a['audio_number']: a['error'] for a in job.audios if a.get('error')}
+                if failures:
+                    texts_by_number = {t['batch_number']: t for t in job.formatted_texts}
+
+                    def retry_audio(audio_number: int) -> Dict:
+                        audio_data = self.audio_generator.generate_audio_with_retry(
+                            texts_by_number[audio_number], voice_id, job.job_dir / 'audios', job.model_id
+                        )
+                        job.checkpoint(audio_number, audio_path=audio_data['audio_path'])
+                        return audio_data
+
+                    recovered = self._retry_segments(job, failures, retry_audio, update_progress)
+                    job.audios = self._merge_results(job.audios, recovered, 'audio_number')
+
+                    if failures:
+                        raise Exception(self._failure_message(failures, 'áudios falharam ao gerar'))
+
+                update_progress(f"{len(job.audios)} áudios gerados com sucesso", 50)
+
+                # ETAPA 3: Gerar vídeos com lip-sync (WaveSpeed)
+                update_progress(f"Gerando {len(job.audios)} vídeos com lip-sync em paralelo...", 55)
+                job.status = JobStatus.GENERATING_VIDEO
+                job.save_state()
+
+                job.videos = self.video_generator.generate_videos_batch(
+                    audios=job.audios,
+                    image_paths=job.image_paths,
+                    output_dir=job.job_dir,
+                    progress_callback=lambda msg: update_progress(msg, 60),
+                    max_workers=max_workers_video,
+                    on_submitted=lambda submission: self._checkpoint_submission(job, submission),
+                    on_completed=on_video
+                )
+
+                for video_data in job.videos:
+                    if video_data.get('video_path'):
+                        job.checkpoint(video_data['video_number'], video_path=video_data['video_path'])
+
+                # Repete só os vídeos que falharam
+                failures = {v['video_number']: v['error'] for v in job.videos if v.get('error')}
+                if failures:
+                    audios_by_number = {a['audio_number']: a for a in job.audios}
+                    image_pool = self.video_generator.prepare_image_pool(job.image_paths, job.job_dir)
+                    used_images = [v['image_path'] for v in job.videos if v.get('image_path')]
+
+                    def retry_video(video_number: int) -> Dict:
+                        video_data = self.video_generator.generate_single_video(
+                            audios_by_number[video_number], image_pool, used_images, job.job_dir / 'videos',
+                            on_submitted=lambda submission: self._checkpoint_submission(job, submission)
+                        )
+                        job.checkpoint(video_number, video_path=video_data['video_path'])
+                        on_video(video_data)
+                        return video_data
+
+                    recovered = self._retry_segments(job, failures, retry_video, update_progress)
+                    job.videos = self._merge_results(job.videos, recovered, 'video_number')
+
+                    if failures:
+                        raise Exception(self._failure_message(failures, 'vídeos falharam ao gerar'))
+
+                update_progress(f"{len(job.videos)} vídeos gerados com sucesso", 85)
 
             # ETAPA 4: Concatenar vídeos
             update_progress("Concatenando vídeos finais...", 90)
@@ -275,12 +557,17 @@ class JobManager:
 
             final_video_path = job.job_dir / 'final_output.mp4'
 
-            final_video_path = self.video_concatenator.concatenate_videos(
-                video_paths=video_paths,
-                output_path=final_video_path,
-                add_transitions=False,  # Pode ativar se desejar transições
-                progress_callback=lambda msg: update_progress(msg, 95)
-            )
+            # Com o vídeo progressivo completo, falta só remuxar para MP4
+            if incremental is not None and incremental.finalize(final_video_path, len(video_paths)):
+                update_progress("Vídeo final montado durante a geração dos segmentos", 95)
+            else:
+                final_video_path = self.video_concatenator.concatenate_videos(
+                    video_paths=video_paths,
+                    output_path=final_video_path,
+                    add_transitions=Config.VIDEO_TRANSITION_DURATION > 0,
+                    transition_duration=Config.VIDEO_TRANSITION_DURATION,
+                    progress_callback=lambda msg: update_progress(msg, 95)
+                )
 
             # Marca job como concluído
             job.mark_completed(final_video_path)
@@ -295,6 +582,381 @@ class JobManager:
             logger.error(f"Job {job.job_id} falhou: {error_msg}")
             raise
 
+        finally:
+            if incremental is not None:
+                incremental.close()
+
+    def _run_pipeline(
+        self,
+        job: Job,
+        update_progress: Callable[[str, int], None],
+        max_workers_video: int,
+        on_video: Optional[Callable[[Dict], None]] = None
+    ):
+        """
+        Executa texto → áudio → vídeo por segmento, sem barreiras entre etapas
+
+        O áudio do batch N começa assim que seu texto formatado fica pronto e o vídeo
+        é submetido assim que o áudio termina, então a cauda longa do WaveSpeed se
+        sobrepõe às etapas de Gemini e TTS. Preenche job.formatted_texts, job.audios
+        e job.videos no mesmo formato do modo em etapas.
+
+        Cada etapa consulta o checkpoint do segmento antes de rodar: artefatos já
+        produzidos são reaproveitados e tarefas já submetidas ao WaveSpeed voltam a
+        ser acompanhadas pelo request_id, então um job retomado continua de onde parou.
+        Pelo mesmo motivo, um segmento que falhou é repetido sozinho (ver _retry_segments)
+        a partir da etapa em que parou.
+
+        Args:
+            job: Job a processar
+            update_progress: Helper de progresso do process_job
+            max_workers_video: Número máximo de vídeos simultâneos no WaveSpeed
+            on_video: Chamado com cada vídeo pronto (ex: concatenação incremental)
+
+        Raises:
+            Exception: Se algum segmento continuar falhando após as novas tentativas
+        """
+        update_progress("Iniciando pipeline por segmento (texto → áudio → vídeo)...", 5)
+        job.status = JobStatus.PROCESSING_TEXT
+        job.save_state()
+
+        batches = self.text_processor.split_batches(job.input_text)
+        total = len(batches)
+
+        if total == 0:
+            raise Exception("Nenhum batch de texto para processar")
+
+        formatted_dir = job.job_dir / 'formatted_text'
+        audio_dir = job.job_dir / 'audios'
+        video_dir = job.job_dir / 'videos'
+        for directory in (formatted_dir, audio_dir, video_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+
+        voice_id = self.audio_generator.get_voice_id_by_name(job.voice_name)
+        image_pool = self.video_generator.prepare_image_pool(job.image_paths, job.job_dir)
+        used_images = []
+
+        lock = threading.Lock()
+        completed_steps = [0]
+
+        def advance_status(status: JobStatus):
+            """Avança o status do job para a etapa mais adiantada em andamento"""
+            with lock:
+                if _STAGE_ORDER.index(status) > _STAGE_ORDER.index(job.status):
+                    job.status = status
+                    job.save_state()
+
+        def record(results: List[Dict], item: Dict, number_key: str, message: str):
+            """Registra o resultado de uma etapa e atualiza o progresso (5% → 85%)"""
+            with lock:
+                # Um segmento repetido registra de novo as etapas que reaproveitou
+                for idx, existing in enumerate(results):
+                    if existing[number_key] == item[number_key]:
+                        results[idx] = item
+                        return
+
+                results.append(item)
+                completed_steps[0] += 1
+                update_progress(message, 5 + int(80 * completed_steps[0] / (3 * total)))
+
+        def format_stage(batch_number: int, batch_text: str) -> Dict:
+            formatted_path = job.artifact(batch_number, 'formatted_path')
+            if formatted_path:
+                text_data = {
+                    'batch_number': batch_number,
+                    'original_text': batch_text,
+                    'formatted_text': formatted_path.read_text(encoding='utf-8'),
+                    'file_path': formatted_path
+                }
+            else:
+                text_data = self.text_processor.format_and_save_batch(batch_text, batch_number, formatted_dir)
+                # Texto novo invalida o áudio e o vídeo de uma execução anterior
+                job.checkpoint(batch_number, formatted_path=text_data['file_path'],
+                               audio_path=None, request_id=None, video_path=None)
+
+            record(job.formatted_texts, text_data, 'batch_number', f"Texto {batch_number}/{total} formatado")
+            return text_data
+
+        def audio_stage(text_data: Dict) -> Dict:
+            advance_status(JobStatus.GENERATING_AUDIO)
+            batch_number = text_data['batch_number']
+
+            audio_path = job.artifact(batch_number, 'audio_path')
+            if audio_path:
+                audio_data = {
+                    'audio_number': batch_number,
+                    'text': text_data['formatted_text'],
+                    'audio_path': audio_path,
+                    'duration': None
+                }
+            else:
+                audio_data = self.audio_generator.generate_audio_with_retry(
+                    text_data, voice_id, audio_dir, job.model_id
+                )
+                job.checkpoint(batch_number, audio_path=audio_data['audio_path'], request_id=None, video_path=None)
+
+            record(job.audios, audio_data, 'audio_number', f"Áudio {audio_data['audio_number']}/{total} gerado")
+            return audio_data
+
+        def record_video(video_data: Dict) -> Dict:
+            job.checkpoint(video_data['video_number'], image_path=video_data.get('image_path'),
+                           video_path=video_data['video_path'])
+            record(job.videos, video_data, 'video_number', f"✅ Vídeo {video_data['video_number']}/{total} concluído")
+            if on_video:
+                on_video(video_data)
+            return video_data
+
+        def on_submitted(submission: Dict):
+            self._checkpoint_submission(job, submission)
+
+        def video_stage(audio_data: Dict):
+            advance_status(JobStatus.GENERATING_VIDEO)
+            video_number = audio_data['audio_number']
+            segment = job.segment(video_number)
+
+            video_path = job.artifact(video_number, 'video_path')
+            if video_path:
+                return record_video({
+                    'video_number': video_number,
+                    'audio_path': audio_data['audio_path'],
+                    'image_path': Path(segment['image_path']) if segment.get('image_path') else None,
+                    'video_path': video_path
+                })
+
+            if segment.get('request_id') and segment.get('image_path'):
+                # Tarefa submetida antes da interrupção: volta a acompanhá-la em vez de pagar outro render
+                try:
+                    return record_video(self.video_generator.reattach_video({
+                        'video_number': video_number,
+                        'audio_path': audio_data['audio_path'],
+                        'image_path': Path(segment['image_path']),
+                        'audio_url': segment.get('audio_url'),
+                        'image_url': segment.get('image_url'),
+                        'request_id': segment['request_id']
+                    }, video_dir))
+                except Exception as e:
+                    logger.warning(f"⚠️ Tarefa {segment['request_id']} do segmento {video_number} não recuperada ({e}), submetendo de novo")
+                    job.checkpoint(video_number, request_id=None)
+
+            if Config.WAVESPEED_SUBMIT_ALL:
+                # Só upload + submissão ocupam o worker; a espera fica no poller compartilhado
+                return chain_future(
+                    self.video_generator.generate_video_async(
+                        audio_data, image_pool, used_images, video_dir, video_pool,
+                        on_submitted=on_submitted
+                    ),
+                    record_video
+                )
+
+            return record_video(self.video_generator.generate_single_video(
+                audio_data, image_pool, used_images, video_dir, on_submitted=on_submitted
+            ))
+
+        text_workers = self.text_processor.default_max_workers(total)
+        audio_workers = self.audio_generator.default_max_workers(total)
+        logger.info(
+            f"Pipeline do job {job.job_id}: {total} segmentos "
+            f"(texto: {text_workers} workers, áudio: {audio_workers} workers, vídeo: {max_workers_video} workers)"
+        )
+
+        failures = {}
+
+        with ThreadPoolExecutor(max_workers=text_workers) as text_pool, \
+                ThreadPoolExecutor(max_workers=audio_workers) as audio_pool, \
+                ThreadPoolExecutor(max_workers=max_workers_video) as video_pool:
+
+            segments = {}
+            for batch_number, batch_text in enumerate(batches, start=1):
+                formatted = text_pool.submit(format_stage, batch_number, batch_text)
+                audio = chain_future(formatted, audio_stage, audio_pool)
+                video = chain_future(audio, video_stage, video_pool)
+                segments[video] = batch_number
+
+            for future in as_completed(segments):
+                batch_number = segments[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    failures[batch_number] = str(e)
+                    logger.error(f"❌ Segmento {batch_number} falhou no pipeline: {e}")
+
+            if failures:
+                def retry_segment(batch_number: int) -> Dict:
+                    # Etapas com checkpoint são reaproveitadas: só a que falhou roda de novo
+                    text_data = format_stage(batch_number, batches[batch_number - 1])
+                    video = video_stage(audio_stage(text_data))
+                    return video.result() if isinstance(video, Future) else video
+
+                self._retry_segments(job, failures, retry_segment, update_progress)
+
+        job.formatted_texts.sort(key=lambda x: x['batch_number'])
+        job.audios.sort(key=lambda x: x['audio_number'])
+        job.videos.sort(key=lambda x: x['video_number'])
+
+        if failures:
+            raise Exception(self._failure_message(failures, 'segmentos falharam no pipeline'))
+
+        update_progress(f"{len(job.videos)} vídeos gerados com sucesso", 85)
+
+    def _retry_segments(
+        self,
+        job: Job,
+        failures: Dict[int, str],
+        run_segment: Callable[[int], Dict],
+        update_progress: Callable[[str, int], None]
+    ) -> Dict[int, Dict]:
+        """
+        Repete só os segmentos que falharam, cada um com seu próprio orçamento de
+        tentativas (SEGMENT_MAX_RETRIES) e backoff exponencial (SEGMENT_RETRY_DELAY, 2x, 4x...)
+
+        Os segmentos são repetidos em paralelo; o resultado dos que já deram certo
+        não é tocado.
+
+        Args:
+            job: Job em processamento
+            failures: batch_number -> erro; ao final, contém só os que continuaram falhando
+            run_segment: Processa um segmento e retorna o seu resultado (levanta exceção se falhar)
+            update_progress: Helper de progresso do process_job
+
+        Returns:
+            batch_number -> resultado dos segmentos recuperados
+        """
+        for batch_number, error in failures.items():
+            job.checkpoint(batch_number, error=error, attempts=1)
+
+        max_retries = max(0, Config.SEGMENT_MAX_RETRIES)
+        if not failures or max_retries == 0:
+            return {}
+
+        update_progress(f"🔁 Repetindo {len(failures)} segmento(s) que falharam...", job.progress_percent)
+
+        def retry(batch_number: int) -> Dict:
+            last_error = None
+            for attempt in range(1, max_retries + 1):
+                delay = Config.SEGMENT_RETRY_DELAY * (2 ** (attempt - 1))
+                logger.warning(f"🔁 Segmento {batch_number}: nova tentativa {attempt}/{max_retries} em {delay:.0f}s")
+                time.sleep(delay)
+
+                try:
+                    result = run_segment(batch_number)
+                    job.checkpoint(batch_number, error=None, attempts=None)
+                    logger.info(f"✅ Segmento {batch_number} recuperado na tentativa {attempt + 1}")
+                    return result
+                except Exception as e:
+                    last_error = e
+                    job.checkpoint(batch_number, error=str(e), attempts=attempt + 1)
+                    logger.error(f"❌ Segmento {batch_number} falhou novamente ({attempt}/{max_retries}): {e}")
+
+            raise last_error
+
+        recovered = {}
+        with ThreadPoolExecutor(max_workers=len(failures), thread_name_prefix='segment-retry') as executor:
+            futures = {executor.submit(retry, batch_number): batch_number for batch_number in failures}
+
+            for future in as_completed(futures):
+                batch_number = futures[future]
+                try:
+                    recovered[batch_number] = future.result()
+                except Exception as e:
+                    failures[batch_number] = str(e)
+
+        for batch_number in recovered:
+            failures.pop(batch_number)
+
+        return recovered
+
+    @staticmethod
+    def _merge_results(results: List[Dict], recovered: Dict[int, Dict], number_key: str) -> List[Dict]:
+        """Substitui os itens com erro pelos resultados recuperados em _retry_segments"""
+        merged = [item for item in results if item[number_key] not in recovered] + list(recovered.values())
+        return sorted(merged, key=lambda x: x[number_key])
+
+    @staticmethod
+    def _failure_message(failures: Dict[int, str], description: str) -> str:
+        """Mensagem de erro com os segmentos que esgotaram as tentativas"""
+        failed = ', '.join(str(n) for n in sorted(failures))
+        return f"{len(failures)} {description} após {Config.SEGMENT_MAX_RETRIES + 1} tentativas (batches: {failed})"
+
+    @staticmethod
+    def _checkpoint_submission(job: Job, submission: Dict):
+        """Grava no checkpoint do segmento a tarefa recém-submetida ao WaveSpeed"""
+        job.checkpoint(
+            submission['video_number'],
+            image_path=submission['image_path'],
+            audio_url=submission['audio_url'],
+            image_url=submission['image_url'],
+            request_id=submission['request_id']
+        )
+
+    @staticmethod
+    def load_job(job_id: str) -> Job:
+        """
+        Carrega um job interrompido (ou que falhou) para ser processado de novo
+
+        Os checkpoints dos segmentos são mantidos; status, erro e as listas de
+        resultados são reiniciados para que process_job os preencha outra vez.
+
+        Args:
+            job_id: ID do job
+
+        Returns:
+            Job pronto para process_job
+
+        Raises:
+            Exception: Se o estado do job não puder ser carregado
+        """
+        job = Job.load(job_id)
+
+        if not (job.status == JobStatus.COMPLETED and job.final_video_path and job.final_video_path.exists()):
+            job.status = JobStatus.CREATED
+            job.completed_at = None
+            job.error = None
+            job.formatted_texts = []
+            job.audios = []
+            job.videos = []
+
+        return job
+
+    def resume_job(
+        self,
+        job_id: str,
+        progress_callback: Optional[Callable[[str, int], None]] = None,
+        max_workers_video: int = 3
+    ) -> Path:
+        """
+        Retoma um job a partir do último checkpoint (ex: após reiniciar o servidor)
+
+        Segmentos com texto, áudio ou vídeo já produzidos não são refeitos e tarefas
+        ainda em processamento no WaveSpeed são acompanhadas pelo request_id gravado.
+
+        Args:
+            job_id: ID do job
+            progress_callback: Função de callback para progresso (message, percent)
+            max_workers_video: Número máximo de vídeos processados simultaneamente no WaveSpeed
+
+        Returns:
+            Path do vídeo final gerado
+
+        Raises:
+            Exception: Se o estado não existir, o job já estiver rodando ou o processamento falhar
+        """
+        if not self.claim_job(job_id):
+            raise Exception(f"Job {job_id} já está em execução")
+
+        try:
+            job = self.load_job(job_id)
+
+            if job.status == JobStatus.COMPLETED and job.final_video_path and job.final_video_path.exists():
+                logger.info(f"Job {job_id} já estava concluído: {job.final_video_path}")
+                return job.final_video_path
+
+            logger.info(f"🔁 Retomando job {job_id} ({len(job.segments)} segmentos com checkpoint)")
+
+            # O pipeline consulta os checkpoints segmento a segmento
+            return self.process_job(job, progress_callback, max_workers_video, pipeline=True)
+        finally:
+            self.release_job(job_id)
+
     def get_job_estimate(self, input_text: str) -> Dict:
         """
         Estima custo e tempo para processar um texto
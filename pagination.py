@@ -0,0 +1,56 @@
+"""
+Cursor helpers for keyset pagination (shared by the database backends)
+A cursor is the (sort value, id) of the last item of a page, encoded as opaque
+URL-safe text, so the next page starts right after it without OFFSET scans
+"""
+import json
+import base64
+from datetime import date, datetime
+from typing import Optional, Tuple
+
+
+def encode_cursor(sort_value: str, record_id: str) -> str:
+    """Encode the position of the last item of a page"""
+    raw = json.dumps([sort_value, record_id], ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, record_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return str(sort_value), str(record_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def normalize_time_range(since: Optional[str], until: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Validate since/until and make them comparable with stored ISO timestamps
+
+    Both bounds are inclusive. A date-only until (YYYY-MM-DD) covers that whole
+    day, so it becomes the last instant of the day instead of midnight.
+
+    Raises:
+        ValueError: If a bound is not an ISO date or timestamp
+    """
+    for value in (since, until):
+        if value:
+            try:
+                datetime.fromisoformat(value)
+            except ValueError:
+                raise ValueError(f"Invalid date: {value}")
+
+    if until and len(until) == 10:
+        until = datetime.combine(date.fromisoformat(until), datetime.max.time()).isoformat()
+
+    return since or None, until or None
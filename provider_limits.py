@@ -0,0 +1,193 @@
+"""
+Registro global de limites por provedor de API
+Todas as instâncias de TextProcessor, AudioGenerator e VideoGenerator do processo
+dividem o mesmo semáforo (requisições simultâneas) e o mesmo token bucket
+(requisições por minuto) de cada provedor/API key, então vários jobs rodando
+no mesmo servidor não estouram a cota de nenhum provedor
+"""
+import time
+import hashlib
+import threading
+from typing import Callable, Dict, Optional, Tuple
+from config import Config
+from utils import get_logger, RateLimiter
+
+logger = get_logger(__name__)
+
+
+class ProviderLimit:
+    """
+    Limite de concorrência adaptativo (AIMD) + token bucket de um provedor/API key
+
+    A concorrência efetiva começa em max_concurrent, cai pela metade a cada
+    evento de rate limit (on_rate_limited) e volta a crescer aos poucos com
+    respostas bem-sucedidas (on_success), então fica próxima do limite real
+    do provedor em vez de oscilar.
+
+    Uso:
+        with limit:            # reserva um slot e consome uma ficha
+            chamar_api()
+
+        limit.acquire()        # só o slot (ex: tarefa em voo até o poll concluir)
+        limit.throttle()       # só a ficha (ex: cada requisição HTTP)
+        limit.release()
+    """
+
+    # Pausa padrão após um 429 sem Retry-After (segundos)
+    DEFAULT_BACKOFF = 5.0
+
+    def __init__(self, name: str, max_concurrent: Optional[int], rate_per_minute: float):
+        """
+        Inicializa o limite
+
+        Args:
+            name: Nome para logs (ex: 'elevenlabs')
+            max_concurrent: Requisições/tarefas simultâneas (None = sem limite)
+            rate_per_minute: Requisições por minuto (<= 0 = sem limite)
+        """
+        self.name = name
+        self.max_concurrent = max(1, max_concurrent) if max_concurrent else None
+        self.rate_per_minute = rate_per_minute
+
+        self._cond = threading.Condition()
+        self._in_use = 0
+        self._limit = float(self.max_concurrent) if self.max_concurrent else None
+        self._paused_until = 0.0
+        self._decrease_blocked_until = 0.0
+        self._rate_limiter = RateLimiter(rate_per_minute)
+
+    @property
+    def effective_concurrency(self) -> Optional[int]:
+        """Concorrência permitida no momento (None = sem limite)"""
+        with self._cond:
+            return int(self._limit) if self._limit is not None else None
+
+    def acquire(self):
+        """Reserva um slot de concorrência (bloqueia até haver um livre e a pausa terminar)"""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    self._cond.wait(self._paused_until - now)
+                    continue
+
+                if self._limit is None or self._in_use < int(self._limit):
+                    self._in_use += 1
+                    return
+
+                self._cond.wait()
+
+    def release(self):
+        """Libera um slot reservado com acquire"""
+        with self._cond:
+            if self._in_use > 0:
+                self._in_use -= 1
+            self._cond.notify_all()
+
+    def throttle(self):
+        """Aguarda uma ficha do token bucket"""
+        self._rate_limiter.acquire()
+
+    def on_success(self):
+        """Aumento aditivo: +1 slot a cada 'janela' de respostas bem-sucedidas"""
+        with self._cond:
+            if self._limit is None or self._limit >= self.max_concurrent:
+                return
+
+            previous = int(self._limit)
+            self._limit = min(float(self.max_concurrent), self._limit + 1.0 / self._limit)
+
+            if int(self._limit) > previous:
+                logger.info(f"📈 {self.name}: concorrência efetiva aumentada para {int(self._limit)}")
+                self._cond.notify_all()
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> float:
+        """
+        Redução multiplicativa após um 429: reduz a concorrência pela metade e pausa
+        novas requisições até Retry-After (ou DEFAULT_BACKOFF)
+
+        Vários 429 do mesmo evento (requisições que já estavam em voo) contam como uma
+        única redução.
+
+        Args:
+            retry_after: Segundos indicados pelo header Retry-After, se houver
+
+        Returns:
+            Segundos de pausa aplicados
+        """
+        wait = retry_after if retry_after is not None else self.DEFAULT_BACKOFF
+
+        with self._cond:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + wait)
+
+            if self._limit is not None and now >= self._decrease_blocked_until:
+                self._limit = max(1.0, self._limit / 2)
+                self._decrease_blocked_until = self._paused_until
+                logger.warning(
+                    f"📉 {self.name}: rate limit, concorrência efetiva reduzida para "
+                    f"{int(self._limit)} e pausa de {wait:.0f}s"
+                )
+
+        return wait
+
+    def __enter__(self) -> 'ProviderLimit':
+        self.acquire()
+        try:
+            self.throttle()
+        except BaseException:
+            self.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+# Provedor -> (requisições simultâneas, requisições por minuto), lidos da Config sob demanda
+_PROVIDER_SETTINGS: Dict[str, Callable[[], Tuple[Optional[int], float]]] = {
+    'gemini': lambda: (Config.GEMINI_MAX_CONCURRENT, Config.GEMINI_RPM),
+    'elevenlabs': lambda: (Config.ELEVENLABS_MAX_CONCURRENT, Config.ELEVENLABS_RPM),
+    'minimax': lambda: (Config.MAX_CONCURRENT_REQUESTS, Config.MINIMAX_RPM),
+    'wavespeed': lambda: (Config.WAVESPEED_MAX_INFLIGHT, Config.WAVESPEED_RPM),
+}
+
+_limits: Dict[Tuple[str, str], ProviderLimit] = {}
+_limits_lock = threading.Lock()
+
+
+def provider_limit(provider: str, api_key: Optional[str] = None) -> ProviderLimit:
+    """
+    Retorna o limite compartilhado de um provedor/API key (criado sob demanda)
+
+    Args:
+        provider: 'gemini', 'elevenlabs', 'minimax' ou 'wavespeed'
+        api_key: API key usada (keys diferentes têm cotas independentes)
+
+    Returns:
+        ProviderLimit do par (provedor, API key)
+
+    Raises:
+        ValueError: Se o provedor não for conhecido
+    """
+    provider = provider.lower()
+    if provider not in _PROVIDER_SETTINGS:
+        raise ValueError(f"Provedor sem limites configurados: {provider}")
+
+    # Não guarda a key em claro, só um identificador
+    key_id = hashlib.sha256((api_key or '').encode('utf-8')).hexdigest()[:12]
+
+    with _limits_lock:
+        limit = _limits.get((provider, key_id))
+        if limit is None:
+            max_concurrent, rate_per_minute = _PROVIDER_SETTINGS[provider]()
+            limit = ProviderLimit(provider, max_concurrent, rate_per_minute)
+            _limits[(provider, key_id)] = limit
+
+            logger.info(
+                f"Limite de {provider} (key {key_id[:6]}…): "
+                f"{max_concurrent or 'sem limite'} simultâneas, "
+                f"{rate_per_minute or 'sem limite'} req/min"
+            )
+
+        return limit
@@ -0,0 +1,575 @@
+"""
+Database Layer - SQLite (WAL) storage for projects, avatars, and jobs
+Same API as database.Database, but every read/write touches only the rows involved,
+so job history can grow without slowing down progress updates
+"""
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+import uuid
+
+from pagination import encode_cursor, decode_cursor, normalize_time_range
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_projects_updated_at ON projects (updated_at);
+
+CREATE TABLE IF NOT EXISTS project_tags (
+    project_id TEXT NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (project_id, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_project_tags_tag ON project_tags (tag);
+
+CREATE TABLE IF NOT EXISTS avatars (
+    id TEXT PRIMARY KEY,
+    created_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_avatars_created_at ON avatars (created_at);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT,
+    started_at TEXT,
+    project_id TEXT,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS videos (
+    id TEXT PRIMARY KEY,
+    created_at TEXT,
+    project_id TEXT,
+    job_id TEXT,
+    path TEXT UNIQUE,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_videos_created ON videos (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_videos_project_created ON videos (project_id, created_at, id);
+
+CREATE TABLE IF NOT EXISTS tags (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    data TEXT NOT NULL
+);
+"""
+
+DEFAULT_TAGS = [
+    {"id": "tag_1", "name": "Marketing", "color": "#667eea"},
+    {"id": "tag_2", "name": "Education", "color": "#43e97b"},
+    {"id": "tag_3", "name": "Entertainment", "color": "#f093fb"},
+]
+
+# Job indexes match the keyset order (started_at DESC, id DESC) of list_jobs.
+# Created after _upgrade_schema so databases from before project_id get the column first.
+JOB_INDEXES = """
+DROP INDEX IF EXISTS idx_jobs_status_started_at;
+DROP INDEX IF EXISTS idx_jobs_started_at;
+CREATE INDEX IF NOT EXISTS idx_jobs_started ON jobs (started_at, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_started ON jobs (status, started_at, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_project_started ON jobs (project_id, started_at, id);
+"""
+
+
+class SQLiteDatabase:
+    """SQLite-based database (WAL mode, one connection per thread)"""
+
+    def __init__(self, data_dir: str = "./data", db_file: str = "app.db"):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+
+        self.db_path = self.data_dir / db_file
+
+        # Avatar storage directories
+        self.avatars_dir = self.data_dir / "avatars"
+        self.avatars_dir.mkdir(exist_ok=True)
+        (self.avatars_dir / "thumbnails").mkdir(exist_ok=True)
+
+        self._local = threading.local()
+
+        self._initialize_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection (created on first use)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        """Write transaction (BEGIN IMMEDIATE takes the write lock up front)"""
+        return _Transaction(self._connect())
+
+    def _initialize_schema(self):
+        """Create tables/indexes and the default tags"""
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        self._upgrade_schema()
+        conn.executescript(JOB_INDEXES)
+
+        with self._transaction() as tx:
+            if tx.execute("SELECT COUNT(*) FROM tags").fetchone()[0] == 0:
+                for tag in DEFAULT_TAGS:
+                    self._put_tag(tx, tag)
+
+    def _upgrade_schema(self):
+        """Add columns introduced after the first schema to existing databases"""
+        conn = self._connect()
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+
+        if 'project_id' not in columns:
+            with self._transaction() as tx:
+                tx.execute("ALTER TABLE jobs ADD COLUMN project_id TEXT")
+                rows = tx.execute("SELECT id, data FROM jobs").fetchall()
+                tx.executemany(
+                    "UPDATE jobs SET project_id = ? WHERE id = ?",
+                    [(json.loads(row['data']).get('project_id'), row['id']) for row in rows]
+                )
+
+    def _keyset_page(self, table: str, time_column: str, filters: List[Tuple[str, Any]], since: str = None,
+                     until: str = None, cursor: str = None, limit: int = 50) -> Tuple[List[Dict], Optional[str]]:
+        """
+        One page of a table ordered by (time_column, id) descending
+
+        Seeks with the cursor instead of OFFSET, so every page costs the same
+        whatever its depth. Fetches limit + 1 rows to know whether another page exists.
+        """
+        since, until = normalize_time_range(since, until)
+        clauses = [f"{column} = ?" for column, _ in filters]
+        params = [value for _, value in filters]
+
+        if since:
+            clauses.append(f"{time_column} >= ?")
+            params.append(since)
+        if until:
+            clauses.append(f"{time_column} <= ?")
+            params.append(until)
+
+        position = decode_cursor(cursor)
+        if position:
+            clauses.append(f"({time_column} < ? OR ({time_column} = ? AND id < ?))")
+            params.extend([position[0], position[0], position[1]])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connect().execute(
+            f"SELECT id, {time_column}, data FROM {table} {where} "
+            f"ORDER BY {time_column} DESC, id DESC LIMIT ?",
+            params + [limit + 1]
+        ).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last[time_column] or '', last['id'])
+
+        return [self._decode(row) for row in rows[:limit]], next_cursor
+
+    @staticmethod
+    def _decode(row) -> Optional[Dict]:
+        return json.loads(row['data']) if row else None
+
+    @staticmethod
+    def _encode(data: Dict) -> str:
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+    # ========================================================================
+    # PROJECTS
+    # ========================================================================
+
+    def _put_project(self, tx: sqlite3.Connection, project: Dict):
+        tx.execute(
+            "INSERT OR REPLACE INTO projects (id, updated_at, data) VALUES (?, ?, ?)",
+            (project['id'], project.get('updated_at'), self._encode(project))
+        )
+        tx.execute("DELETE FROM project_tags WHERE project_id = ?", (project['id'],))
+        tx.executemany(
+            "INSERT OR IGNORE INTO project_tags (project_id, tag) VALUES (?, ?)",
+            [(project['id'], tag) for tag in project.get('tags', [])]
+        )
+
+    def create_project(self, name: str, description: str = "", tags: List[str] = None) -> Dict:
+        """Create a new project"""
+        project = {
+            "id": f"proj_{uuid.uuid4().hex[:8]}",
+            "name": name,
+            "description": description,
+            "tags": tags or [],
+            "videos": [],
+            "created_at": datetime.now().isoformat(),
+            "updated_at": datetime.now().isoformat()
+        }
+
+        with self._transaction() as tx:
+            self._put_project(tx, project)
+
+        return project
+
+    def get_projects(self, tag_filter: str = None) -> List[Dict]:
+        """Get all projects, optionally filtered by tag"""
+        conn = self._connect()
+
+        if tag_filter:
+            rows = conn.execute(
+                "SELECT p.data FROM projects p JOIN project_tags t ON t.project_id = p.id "
+                "WHERE t.tag = ? ORDER BY p.updated_at DESC",
+                (tag_filter,)
+            ).fetchall()
+        else:
+            rows = conn.execute("SELECT data FROM projects ORDER BY updated_at DESC").fetchall()
+
+        return [self._decode(row) for row in rows]
+
+    def get_project(self, project_id: str) -> Optional[Dict]:
+        """Get a specific project"""
+        row = self._connect().execute("SELECT data FROM projects WHERE id = ?", (project_id,)).fetchone()
+        return self._decode(row)
+
+    def update_project(self, project_id: str, updates: Dict) -> Optional[Dict]:
+        """Update a project"""
+        with self._transaction() as tx:
+            project = self._decode(tx.execute("SELECT data FROM projects WHERE id = ?", (project_id,)).fetchone())
+            if project is None:
+                return None
+
+            project.update(updates)
+            project['updated_at'] = datetime.now().isoformat()
+            self._put_project(tx, project)
+
+        return project
+
+    def delete_project(self, project_id: str) -> bool:
+        """Delete a project"""
+        with self._transaction() as tx:
+            tx.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+
+        return True
+
+    def add_video_to_project(self, project_id: str, video_data: Dict) -> bool:
+        """Add a video to a project"""
+        with self._transaction() as tx:
+            project = self._decode(tx.execute("SELECT data FROM projects WHERE id = ?", (project_id,)).fetchone())
+            if project is None:
+                return False
+
+            if 'videos' not in project:
+                project['videos'] = []
+
+            video_entry = {
+                "id": f"vid_{uuid.uuid4().hex[:8]}",
+                "path": video_data.get('path'),
+                "name": video_data.get('name', 'Untitled'),
+                "duration": video_data.get('duration', 0),
+                "created_at": datetime.now().isoformat()
+            }
+
+            project['videos'].append(video_entry)
+            project['updated_at'] = datetime.now().isoformat()
+            self._put_project(tx, project)
+
+        return True
+
+    # ========================================================================
+    # AVATARS
+    # ========================================================================
+
+    def _put_avatar(self, tx: sqlite3.Connection, avatar: Dict):
+        tx.execute(
+            "INSERT OR REPLACE INTO avatars (id, created_at, data) VALUES (?, ?, ?)",
+            (avatar['id'], avatar.get('created_at'), self._encode(avatar))
+        )
+
+    def create_avatar(self, name: str, image_path: str, thumbnail_path: str = None) -> Dict:
+        """Create a new avatar entry"""
+        avatar = {
+            "id": f"avatar_{uuid.uuid4().hex[:8]}",
+            "name": name,
+            "image_path": image_path,
+            "thumbnail_path": thumbnail_path or image_path,
+            "created_at": datetime.now().isoformat()
+        }
+
+        with self._transaction() as tx:
+            self._put_avatar(tx, avatar)
+
+        return avatar
+
+    def get_avatars(self) -> List[Dict]:
+        """Get all avatars"""
+        rows = self._connect().execute("SELECT data FROM avatars ORDER BY created_at DESC").fetchall()
+        return [self._decode(row) for row in rows]
+
+    def get_avatar(self, avatar_id: str) -> Optional[Dict]:
+        """Get a specific avatar"""
+        row = self._connect().execute("SELECT data FROM avatars WHERE id = ?", (avatar_id,)).fetchone()
+        return self._decode(row)
+
+    def delete_avatar(self, avatar_id: str) -> bool:
+        """Delete an avatar"""
+        avatar = self.get_avatar(avatar_id)
+
+        # Find and delete avatar files
+        if avatar:
+            try:
+                Path(avatar['image_path']).unlink(missing_ok=True)
+                if avatar.get('thumbnail_path'):
+                    Path(avatar['thumbnail_path']).unlink(missing_ok=True)
+            except Exception as e:
+                print(f"Error deleting avatar files: {e}")
+
+        with self._transaction() as tx:
+            tx.execute("DELETE FROM avatars WHERE id = ?", (avatar_id,))
+
+        return True
+
+    # ========================================================================
+    # JOBS
+    # ========================================================================
+
+    def _put_job(self, tx: sqlite3.Connection, job: Dict):
+        tx.execute(
+            "INSERT OR REPLACE INTO jobs (id, status, started_at, project_id, data) VALUES (?, ?, ?, ?, ?)",
+            (job['id'], job.get('status'), job.get('started_at'), job.get('project_id'), self._encode(job))
+        )
+
+    def create_job(self, job_data: Dict) -> Dict:
+        """Create a job entry"""
+        job = {
+            "id": job_data.get('id', f"job_{uuid.uuid4().hex[:8]}"),
+            "type": job_data.get('type', 'video_generation'),
+            "status": job_data.get('status', 'processing'),  # queued, processing, completed, failed
+            "progress": 0,
+            "estimated_time": job_data.get('estimated_time', 0),
+            "started_at": datetime.now().isoformat(),
+            "completed_at": None,
+            "video_path": None,
+            "project_id": job_data.get('project_id'),
+            "metadata": job_data.get('metadata', {})
+        }
+
+        with self._transaction() as tx:
+            self._put_job(tx, job)
+
+        return job
+
+    def update_job(self, job_id: str, updates: Dict) -> Optional[Dict]:
+        """Update a job"""
+        with self._transaction() as tx:
+            job = self._decode(tx.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone())
+            if job is None:
+                return None
+
+            job.update(updates)
+
+            if updates.get('status') == 'completed':
+                job['completed_at'] = datetime.now().isoformat()
+                job['progress'] = 100
+
+            self._put_job(tx, job)
+
+        return job
+
+    def get_jobs(self, status: str = None, limit: int = 50) -> List[Dict]:
+        """Get jobs, optionally filtered by status"""
+        return self.list_jobs(status=status, limit=limit)[0]
+
+    def list_jobs(self, status: str = None, project_id: str = None, since: str = None, until: str = None,
+                  cursor: str = None, limit: int = 50) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Get one page of jobs, newest first
+
+        since/until are inclusive ISO dates or timestamps compared against started_at
+        (a date-only until covers the whole day). Pass the
+        returned next_cursor back to get the following page (None = last page).
+        """
+        filters = []
+        if status:
+            filters.append(('status', status))
+        if project_id:
+            filters.append(('project_id', project_id))
+
+        return self._keyset_page('jobs', 'started_at', filters, since, until, cursor, limit)
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """Get a specific job"""
+        row = self._connect().execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._decode(row)
+
+    def delete_job(self, job_id: str) -> bool:
+        """Delete a job"""
+        with self._transaction() as tx:
+            tx.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        return True
+
+    # ========================================================================
+    # VIDEOS (catalogue of generated outputs)
+    # ========================================================================
+
+    def _put_video(self, tx: sqlite3.Connection, video: Dict):
+        tx.execute(
+            "INSERT OR REPLACE INTO videos (id, created_at, project_id, job_id, path, data) VALUES (?, ?, ?, ?, ?, ?)",
+            (video['id'], video.get('created_at'), video.get('project_id'), video.get('job_id'),
+             video.get('path'), self._encode(video))
+        )
+
+    def add_video(self, video_data: Dict) -> Dict:
+        """Register an output video in the catalogue (re-registering a path updates it)"""
+        with self._transaction() as tx:
+            existing = tx.execute("SELECT id FROM videos WHERE path = ?", (video_data.get('path'),)).fetchone()
+
+            video = {
+                "id": existing['id'] if existing else f"vid_{uuid.uuid4().hex[:8]}",
+                "path": video_data.get('path'),
+                "name": video_data.get('name') or Path(video_data.get('path') or 'Untitled').name,
+                "size": video_data.get('size', 0),
+                "duration": video_data.get('duration', 0),
+                "job_id": video_data.get('job_id'),
+                "project_id": video_data.get('project_id'),
+                "created_at": video_data.get('created_at') or datetime.now().isoformat()
+            }
+
+            self._put_video(tx, video)
+
+        return video
+
+    def list_videos(self, project_id: str = None, since: str = None, until: str = None,
+                    cursor: str = None, limit: int = 50) -> Tuple[List[Dict], Optional[str]]:
+        """Get one page of catalogued videos, newest first (same cursor contract as list_jobs)"""
+        filters = [('project_id', project_id)] if project_id else []
+        return self._keyset_page('videos', 'created_at', filters, since, until, cursor, limit)
+
+    def count_videos(self) -> int:
+        """Number of catalogued videos"""
+        return self._connect().execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+    def delete_video(self, video_id: str) -> bool:
+        """Remove a video from the catalogue (the file itself is left alone)"""
+        with self._transaction() as tx:
+            tx.execute("DELETE FROM videos WHERE id = ?", (video_id,))
+        return True
+
+    # ========================================================================
+    # TAGS
+    # ========================================================================
+
+    def _put_tag(self, tx: sqlite3.Connection, tag: Dict):
+        tx.execute(
+            "INSERT OR REPLACE INTO tags (id, name, data) VALUES (?, ?, ?)",
+            (tag['id'], tag.get('name'), self._encode(tag))
+        )
+
+    def create_tag(self, name: str, color: str = "#667eea") -> Dict:
+        """Create a new tag"""
+        tag = {
+            "id": f"tag_{uuid.uuid4().hex[:8]}",
+            "name": name,
+            "color": color
+        }
+
+        with self._transaction() as tx:
+            self._put_tag(tx, tag)
+
+        return tag
+
+    def get_tags(self) -> List[Dict]:
+        """Get all tags"""
+        rows = self._connect().execute("SELECT data FROM tags ORDER BY name").fetchall()
+        return [self._decode(row) for row in rows]
+
+    def delete_tag(self, tag_id: str) -> bool:
+        """Delete a tag"""
+        with self._transaction() as tx:
+            tx.execute("DELETE FROM tags WHERE id = ?", (tag_id,))
+        return True
+
+    # ========================================================================
+    # MIGRATION
+    # ========================================================================
+
+    def import_json(self, json_dir: str = None) -> Dict[str, int]:
+        """
+        One-shot import of the JSON database files (projects/avatars/jobs/tags/videos.json)
+
+        Rows that already exist (same id) are overwritten, so running it twice is safe.
+
+        Returns:
+            Number of rows imported per table
+        """
+        json_dir = Path(json_dir) if json_dir else self.data_dir
+
+        importers = {
+            'projects': self._put_project,
+            'avatars': self._put_avatar,
+            'jobs': self._put_job,
+            'tags': self._put_tag,
+            'videos': self._put_video,
+        }
+
+        counts = {}
+        with self._transaction() as tx:
+            for table, put in importers.items():
+                json_file = json_dir / f"{table}.json"
+                if not json_file.exists():
+                    counts[table] = 0
+                    continue
+
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    rows = json.load(f)
+
+                for row in rows:
+                    put(tx, row)
+                counts[table] = len(rows)
+
+        return counts
+
+
+class _Transaction:
+    """Context manager: BEGIN IMMEDIATE ... COMMIT/ROLLBACK on a connection in autocommit mode"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute("COMMIT")
+        else:
+            self.conn.execute("ROLLBACK")
+
+
+def migrate_json_to_sqlite(data_dir: str = "./data") -> Dict[str, int]:
+    """
+    Migrate data/*.json into data/app.db
+
+    Usage:
+        python sqlite_database.py [data_dir]
+    """
+    database = SQLiteDatabase(data_dir)
+    counts = database.import_json()
+
+    print(f"Migrated into {database.db_path}:")
+    for table, count in counts.items():
+        print(f"  - {table}: {count}")
+
+    return counts
+
+
+if __name__ == "__main__":
+    import sys
+    migrate_json_to_sqlite(sys.argv[1] if len(sys.argv) > 1 else "./data")
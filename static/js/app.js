@@ -835,21 +835,38 @@ async function generateSingleVideo() {
 
         const data = await response.json();
 
-        if (data.success) {
+        if (!data.success) {
+            progressContainer.style.display = 'none';
+            updateLoadingTabItem(tempJobId, 'failed');
+            showMessage('statusMessages', data.error, 'error');
+            return;
+        }
+
+        // O servidor só enfileira o job; acompanha o progresso até terminar
+        progressText.textContent = 'Na fila de processamento...';
+        loadProcessingJobs();
+
+        const job = await watchJob(data.job_id, job => {
+            progressFill.style.width = `${job.progress || 0}%`;
+            if (job.message) progressText.textContent = job.message;
+            setLoadingTabProgress(tempJobId, job.progress || 0);
+        });
+
+        if (job.status === 'completed') {
             progressFill.style.width = '100%';
             progressText.textContent = 'Vídeo gerado com sucesso!';
 
-            state.currentVideoPath = data.video_path;
+            state.currentVideoPath = job.video_path;
 
             // Show video
             const videoPlayer = document.getElementById('videoPlayer');
-            videoPlayer.src = `/api/download/${encodeURIComponent(data.video_path)}`;
+            videoPlayer.src = `/api/download/${encodeURIComponent(job.video_path)}`;
             videoContainer.style.display = 'block';
 
             // Update loading tab
-            updateLoadingTabItem(tempJobId, 'completed', data.video_path);
+            updateLoadingTabItem(tempJobId, 'completed', job.video_path);
 
-            showMessage('statusMessages', `Vídeo gerado em ${data.duration.toFixed(1)}s`, 'success');
+            showMessage('statusMessages', `Vídeo gerado em ${job.duration.toFixed(1)}s`, 'success');
 
             // Reload history
             loadVideoHistory();
@@ -857,7 +874,7 @@ async function generateSingleVideo() {
         } else {
             progressContainer.style.display = 'none';
             updateLoadingTabItem(tempJobId, 'failed');
-            showMessage('statusMessages', data.error, 'error');
+            showMessage('statusMessages', job.error || 'Erro ao gerar vídeo', 'error');
         }
     } catch (error) {
         progressContainer.style.display = 'none';
@@ -1142,9 +1159,23 @@ async function generateBatchVideos() {
             })
         });
 
-        const data = await response.json();
+        const submitted = await response.json();
 
-        if (data.success) {
+        if (!submitted.success) {
+            showMessage('statusMessages', submitted.error, 'error');
+            return;
+        }
+
+        // O servidor só enfileira o lote; acompanha o progresso até terminar
+        loadProcessingJobs();
+
+        const data = await watchJob(submitted.job_id, job => {
+            state.previewData.scripts.forEach(script => {
+                setLoadingTabProgress(`batch_${script.id}`, job.progress || 0);
+            });
+        });
+
+        if (data.results) {
             const resultsCard = document.getElementById('multiResultsCard');
             const resultsContainer = document.getElementById('multiResults');
 
@@ -1183,7 +1214,7 @@ async function generateBatchVideos() {
             loadVideoHistory();
             loadProcessingJobs();
         } else {
-            showMessage('statusMessages', data.error, 'error');
+            showMessage('statusMessages', data.error || 'Erro ao gerar vídeos', 'error');
         }
     } catch (error) {
         showMessage('statusMessages', 'Erro ao gerar vídeos', 'error');
@@ -1297,6 +1328,62 @@ function addToCompletedVideos(video) {
     container.insertAdjacentHTML('afterbegin', itemHtml);
 }
 
+function watchJob(jobId, onProgress) {
+    // Recebe o progresso do job por SSE (/api/jobs/<id>/events) até completed/failed
+    if (!window.EventSource) {
+        return waitForJob(jobId, onProgress);
+    }
+
+    return new Promise(resolve => {
+        const source = new EventSource(`/api/jobs/${encodeURIComponent(jobId)}/events`);
+
+        const handle = (e) => {
+            const job = JSON.parse(e.data);
+            if (onProgress) onProgress(job);
+
+            if (e.type === 'completed' || e.type === 'failed') {
+                source.close();
+                resolve(job);
+            }
+        };
+
+        ['snapshot', 'stage', 'progress', 'completed', 'failed'].forEach(type => {
+            source.addEventListener(type, handle);
+        });
+
+        // Em caso de erro o EventSource reconecta sozinho e recebe um novo snapshot
+    });
+}
+
+async function waitForJob(jobId, onProgress, interval = 2000) {
+    // Consulta /api/jobs/<id> até o job terminar (completed/failed)
+    while (true) {
+        try {
+            const response = await fetch(`/api/jobs/${encodeURIComponent(jobId)}`);
+            const data = await response.json();
+
+            if (data.success) {
+                const job = data.job;
+                if (onProgress) onProgress(job);
+                if (job.status === 'completed' || job.status === 'failed') {
+                    return job;
+                }
+            }
+        } catch (error) {
+            console.error('Erro ao consultar job:', error);
+        }
+
+        await new Promise(resolve => setTimeout(resolve, interval));
+    }
+}
+
+function setLoadingTabProgress(itemId, percent) {
+    const item = document.querySelector(`.loading-video-card[data-id="${itemId}"]`);
+    if (!item) return;
+
+    item.querySelector('.progress-fill').style.width = `${Math.max(percent, 5)}%`;
+}
+
 async function loadProcessingJobs() {
     try {
         const response = await fetch('/api/jobs?status=processing');
@@ -1315,16 +1402,20 @@ async function loadProcessingJobs() {
 // VIDEO HISTORY
 // ============================================================================
 
-async function loadVideoHistory() {
+async function loadVideoHistory(cursor = null) {
     const container = document.getElementById('videoHistoryGrid');
     if (!container) return;
 
     try {
-        const response = await fetch('/api/videos/history');
+        // Paginado por cursor: sem cursor recarrega do início, com cursor anexa a próxima página
+        const params = new URLSearchParams({ limit: 24 });
+        if (cursor) params.set('cursor', cursor);
+
+        const response = await fetch(`/api/videos/history?${params}`);
         const data = await response.json();
 
-        if (data.success && data.videos.length > 0) {
-            container.innerHTML = data.videos.map(video => {
+        if (data.success && (data.videos.length > 0 || cursor)) {
+            const items = data.videos.map(video => {
                 const escapedPath = video.path.replace(/\\/g, '\\\\').replace(/'/g, "\\'");
                 const encodedPath = encodeURIComponent(video.path);
                 return `
@@ -1332,7 +1423,7 @@ async function loadVideoHistory() {
                     <video class="video-history-thumb" src="/api/stream/${encodedPath}" preload="metadata"></video>
                     <div class="video-history-info">
                         <div class="video-history-name">${video.name}</div>
-                        <div class="video-history-meta">${formatFileSize(video.size)} | ${formatDate(video.created_at * 1000)}</div>
+                        <div class="video-history-meta">${formatFileSize(video.size)} | ${formatDate(video.created_at)}</div>
                     </div>
                     <div class="video-history-actions">
                         <button class="btn btn-secondary" onclick="playVideo('${escapedPath}')">Assistir</button>
@@ -1340,6 +1431,23 @@ async function loadVideoHistory() {
                     </div>
                 </div>
             `}).join('');
+
+            const loadMore = container.querySelector('.video-history-more');
+            if (loadMore) loadMore.remove();
+
+            if (cursor) {
+                container.insertAdjacentHTML('beforeend', items);
+            } else {
+                container.innerHTML = items;
+            }
+
+            if (data.next_cursor) {
+                container.insertAdjacentHTML('beforeend', `
+                    <div class="video-history-more" style="grid-column: 1/-1; text-align: center;">
+                        <button class="btn btn-secondary" onclick="loadVideoHistory('${data.next_cursor}')">Carregar mais</button>
+                    </div>
+                `);
+            }
         } else {
             container.innerHTML = `
                 <div class="empty-state-large" style="grid-column: 1/-1;">
@@ -0,0 +1,67 @@
+"""
+Teste offline do servidor local de artefatos (backend de upload 'local')
+Não depende de rede externa: sobe o servidor em uma porta livre de 127.0.0.1
+"""
+import tempfile
+import urllib.request
+import urllib.error
+from pathlib import Path
+
+from artifact_server import ArtifactServer
+
+
+def _status(url: str, method: str = 'GET') -> int:
+    """Retorna o status HTTP de uma requisição"""
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, method=method), timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def test_artifact_server():
+    """Valida URLs assinadas: download, HEAD, assinatura adulterada, expiração e path traversal"""
+    print("=" * 60)
+    print("🧪 TESTE DO SERVIDOR LOCAL DE ARTEFATOS")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        audio = root / 'job_test' / 'audios' / 'audio 1.mp3'
+        audio.parent.mkdir(parents=True)
+        audio.write_bytes(b'ID3' + b'\x00' * 2048)
+
+        server = ArtifactServer(root=root, host='127.0.0.1', port=0, secret='test-secret').start()
+
+        try:
+            url = server.sign_url(audio, ttl=60)
+            print(f"URL assinada: {url}")
+
+            with urllib.request.urlopen(url, timeout=5) as response:
+                body = response.read()
+                assert response.status == 200
+                assert response.headers['Content-Type'] == 'audio/mpeg'
+            assert body == audio.read_bytes()
+            print("  ✅ GET retorna o conteúdo do arquivo")
+
+            assert _status(url, method='HEAD') == 200
+            print("  ✅ HEAD aceito (verificação de URL do uploader)")
+
+            assert _status(url[:-4] + '0000') == 403
+            print("  ✅ Assinatura adulterada é rejeitada")
+
+            assert _status(server.sign_url(audio, ttl=-1)) == 403
+            print("  ✅ URL expirada é rejeitada")
+
+            outside = f"{server.base_url}/artifacts/../../etc/passwd?expires=9999999999&sig=x"
+            assert _status(outside) in (403, 404)
+            print("  ✅ Caminhos fora da raiz não são servidos")
+
+        finally:
+            server.stop()
+
+    print("\n✅ Servidor de artefatos OK")
+
+
+if __name__ == "__main__":
+    test_artifact_server()
@@ -0,0 +1,66 @@
+"""
+Teste offline da entrega de vídeos (/api/stream e /api/download)
+Usa o cliente de teste do Flask: valida Range (206), ETag e 304
+"""
+import shutil
+from urllib.parse import quote
+
+from config import Config
+from web_server import app
+
+
+def test_video_delivery():
+    """Valida requisições Range, downloads retomados e requisições condicionais"""
+    print("=" * 60)
+    print("🧪 TESTE DE ENTREGA DE VÍDEOS")
+    print("=" * 60)
+
+    video_dir = Config.TEMP_FOLDER / 'test_video_delivery'
+    video_dir.mkdir(parents=True, exist_ok=True)
+    video = video_dir / 'video.mp4'
+    content = bytes(range(256)) * 64
+    video.write_bytes(content)
+
+    client = app.test_client()
+    stream_url = f"/api/stream/{quote(video.as_posix())}"
+    download_url = f"/api/download/{quote(video.as_posix())}"
+
+    try:
+        response = client.get(stream_url)
+        assert response.status_code == 200
+        assert response.data == content
+        assert response.headers['Accept-Ranges'] == 'bytes'
+        etag = response.headers['ETag']
+        assert etag and response.headers['Last-Modified']
+        assert 'max-age=0' in response.headers['Cache-Control']
+        print("  ✅ GET completo com ETag, Last-Modified e max-age=0")
+
+        response = client.get(stream_url, headers={'Range': 'bytes=100-199'})
+        assert response.status_code == 206
+        assert response.data == content[100:200]
+        assert response.headers['Content-Range'] == f"bytes 100-199/{len(content)}"
+        print("  ✅ Range retorna 206 só com o trecho pedido (seek no player)")
+
+        response = client.get(download_url, headers={'Range': f"bytes={len(content) - 1000}-"})
+        assert response.status_code == 206
+        assert response.data == content[-1000:]
+        assert 'attachment' in response.headers['Content-Disposition']
+        print("  ✅ Download retomado recebe só o restante do arquivo")
+
+        response = client.get(stream_url, headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+        print("  ✅ If-None-Match com o mesmo ETag retorna 304 sem corpo")
+
+        response = client.get(stream_url, headers={'Range': f"bytes={len(content) + 10}-"})
+        assert response.status_code == 416
+        print("  ✅ Range fora do arquivo retorna 416")
+
+    finally:
+        shutil.rmtree(video_dir, ignore_errors=True)
+
+    print("\n✅ Entrega de vídeos OK")
+
+
+if __name__ == "__main__":
+    test_video_delivery()
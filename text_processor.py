@@ -1,23 +1,64 @@
 """
 Módulo de processamento e formatação de texto usando Gemini 2.5 Flash
 """
+import json
 import google.generativeai as genai
 from pathlib import Path
 from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from config import Config
 from utils import get_logger, retry_with_backoff, create_batches, split_into_paragraphs
+from content_store import ContentStore
+from provider_limits import provider_limit
 
 logger = get_logger(__name__)
 
 class TextProcessor:
     """Processa e formata texto usando Gemini API"""
 
+    MODEL_NAME = 'gemini-2.5-flash-lite'
+
+    # Incrementar ao mudar _get_formatting_prompt, para invalidar o cache de formatação
+    PROMPT_TEMPLATE_VERSION = 2
+
     def __init__(self):
         """Inicializa o processador de texto"""
         genai.configure(api_key=Config.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
+        self.model = genai.GenerativeModel(self.MODEL_NAME)
+
+        # Concorrência e RPM da API key, compartilhados por todos os jobs do processo
+        self.limits = provider_limit('gemini', Config.GEMINI_API_KEY)
+
+        # Textos já formatados, por (versão do prompt, prompt, configuração de geração)
+        self.format_cache = ContentStore(Config.CACHE_FOLDER / 'formatted', suffix='.txt') if Config.GEMINI_CACHE_ENABLED else None
+
         logger.info("TextProcessor inicializado com Gemini 2.5 Flash Lite")
 
+    def generation_config(self) -> Dict:
+        """
+        Configuração de geração do Gemini
+
+        Com GEMINI_DETERMINISTIC=true usa temperatura 0 e top_k 1, para que o
+        mesmo texto produza sempre a mesma formatação.
+
+        Returns:
+            Dict de generation_config
+        """
+        if Config.GEMINI_DETERMINISTIC:
+            return {
+                'temperature': 0.0,
+                'top_p': 1.0,
+                'top_k': 1,
+                'max_output_tokens': 8192,
+            }
+
+        return {
+            'temperature': 0.7,
+            'top_p': 0.9,
+            'top_k': 40,
+            'max_output_tokens': 8192,
+        }
+
     def _get_formatting_prompt(self, batch_text: str, batch_number: int) -> str:
         """
         Retorna o prompt de formatação para o Gemini
@@ -27,7 +68,8 @@ class TextProcessor:
 
         Args:
             batch_text: Texto do batch a ser formatado
-            batch_number: Número do batch (para contexto)
+            batch_number: Número do batch (não entra no prompt padrão, para que o
+                          cache continue valendo quando batches mudam de posição)
 
         Returns:
             Prompt formatado
@@ -36,7 +78,7 @@ class TextProcessor:
 
 Sua tarefa é otimizar o seguinte texto para ser narrado em um vídeo com sincronização labial (lip-sync).
 
-BATCH #{batch_number}:
+TEXTO ORIGINAL:
 {batch_text}
 
 INSTRUÇÕES DE FORMATAÇÃO:
@@ -60,6 +102,9 @@ TEXTO FORMATADO:"""
         """
         Formata um batch de texto usando Gemini
 
+        Batches já formatados com o mesmo prompt e configuração são lidos do
+        cache, sem chamar a API.
+
         Args:
             batch_text: Texto do batch
             batch_number: Número do batch
@@ -74,19 +119,32 @@ TEXTO FORMATADO:"""
             logger.info(f"Formatando batch #{batch_number}...")
 
             prompt = self._get_formatting_prompt(batch_text, batch_number)
-
-            response = self.model.generate_content(
-                prompt,
-                generation_config={
-                    'temperature': 0.7,
-                    'top_p': 0.9,
-                    'top_k': 40,
-                    'max_output_tokens': 8192,
-                }
-            )
+            generation_config = self.generation_config()
+
+            cache_key = None
+            if self.format_cache is not None:
+                cache_key = ContentStore.make_key(
+                    self.PROMPT_TEMPLATE_VERSION,
+                    self.MODEL_NAME,
+                    prompt,
+                    json.dumps(generation_config, sort_keys=True)
+                )
+                cached_path = self.format_cache.get(cache_key)
+                if cached_path:
+                    logger.info(f"♻️  Batch #{batch_number} reaproveitado do cache de formatação")
+                    return cached_path.read_text(encoding='utf-8')
+
+            with self.limits:
+                response = self.model.generate_content(
+                    prompt,
+                    generation_config=generation_config
+                )
 
             formatted_text = response.text.strip()
 
+            if cache_key is not None:
+                self.format_cache.put_bytes(cache_key, formatted_text.encode('utf-8'))
+
             logger.info(f"Batch #{batch_number} formatado com sucesso ({len(formatted_text)} caracteres)")
 
             return formatted_text
@@ -123,50 +181,104 @@ TEXTO FORMATADO:"""
         """
         logger.info("Iniciando processamento de texto")
 
-        # Divide em parágrafos
-        paragraphs = split_into_paragraphs(full_text)
-        logger.info(f"Texto dividido em {len(paragraphs)} parágrafos")
-
-        # Cria batches
-        batches = create_batches(paragraphs, Config.BATCH_SIZE)
-        logger.info(f"Criados {len(batches)} batches de {Config.BATCH_SIZE} parágrafos cada")
+        batches = self.split_batches(full_text)
 
         # Cria diretório de saída
         formatted_dir = output_dir / 'formatted_text'
         formatted_dir.mkdir(parents=True, exist_ok=True)
 
-        results = []
-
-        for idx, batch in enumerate(batches, start=1):
-            batch_number = idx
+        max_workers = self.default_max_workers(len(batches))
+        logger.info(f"Formatando {len(batches)} batches com {max_workers} workers paralelos")
 
-            # Junta parágrafos do batch
-            batch_text = '\n\n'.join(batch)
+        results = [None] * len(batches)
+        completed = 0
 
-            # Atualiza progresso
-            if progress_callback:
-                progress_callback(f"Formatando texto batch {batch_number}/{len(batches)}...")
+        # Cada batch_N.txt é salvo assim que o seu batch fica pronto
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.format_and_save_batch, batch_text, batch_number, formatted_dir): batch_number
+                for batch_number, batch_text in enumerate(batches, start=1)
+            }
 
-            # Formata batch
-            formatted_text = self.format_batch(batch_text, batch_number)
+            for future in as_completed(futures):
+                batch_number = futures[future]
+                try:
+                    results[batch_number - 1] = future.result()
+                except Exception:
+                    # Não gasta cota com os batches restantes se um falhou
+                    for pending in futures:
+                        pending.cancel()
+                    raise
 
-            # Salva em arquivo
-            file_path = formatted_dir / f'batch_{batch_number}.txt'
-            file_path.write_text(formatted_text, encoding='utf-8')
+                completed += 1
 
-            logger.info(f"Batch {batch_number} salvo em: {file_path}")
-
-            results.append({
-                'batch_number': batch_number,
-                'original_text': batch_text,
-                'formatted_text': formatted_text,
-                'file_path': file_path
-            })
+                # Atualiza progresso
+                if progress_callback:
+                    progress_callback(f"Formatando texto batch {completed}/{len(batches)}...")
 
         logger.info(f"Processamento de texto concluído: {len(results)} batches")
 
         return results
 
+    def default_max_workers(self, num_batches: int) -> int:
+        """
+        Número padrão de batches formatados em paralelo
+
+        Args:
+            num_batches: Quantidade de batches
+
+        Returns:
+            Número de workers (pelo menos 1)
+        """
+        return max(1, min(Config.GEMINI_MAX_CONCURRENT, num_batches))
+
+    def split_batches(self, full_text: str) -> List[str]:
+        """
+        Divide o texto completo em batches de parágrafos
+
+        Args:
+            full_text: Texto completo a processar
+
+        Returns:
+            Lista com o texto de cada batch (parágrafos unidos por linha em branco)
+        """
+        # Divide em parágrafos
+        paragraphs = split_into_paragraphs(full_text)
+        logger.info(f"Texto dividido em {len(paragraphs)} parágrafos")
+
+        # Cria batches
+        batches = create_batches(paragraphs, Config.BATCH_SIZE)
+        logger.info(f"Criados {len(batches)} batches de {Config.BATCH_SIZE} parágrafos cada")
+
+        return ['\n\n'.join(batch) for batch in batches]
+
+    def format_and_save_batch(self, batch_text: str, batch_number: int, formatted_dir: Path) -> Dict[str, any]:
+        """
+        Formata um batch e salva o resultado em batch_N.txt
+
+        Args:
+            batch_text: Texto original do batch
+            batch_number: Número do batch
+            formatted_dir: Diretório onde salvar o texto formatado
+
+        Returns:
+            Dict no mesmo formato dos itens retornados por process_text
+        """
+        formatted_text = self.format_batch(batch_text, batch_number)
+
+        # Salva em arquivo
+        file_path = formatted_dir / f'batch_{batch_number}.txt'
+        file_path.write_text(formatted_text, encoding='utf-8')
+
+        logger.info(f"Batch {batch_number} salvo em: {file_path}")
+
+        return {
+            'batch_number': batch_number,
+            'original_text': batch_text,
+            'formatted_text': formatted_text,
+            'file_path': file_path
+        }
+
 def test_text_processor():
     """Função de teste do processador de texto"""
     from pathlib import Path
@@ -0,0 +1,243 @@
+"""
+Cache de URLs públicas de arquivos já enviados
+Chaveado pelo SHA-256 do conteúdo, respeitando o tempo de retenção de cada host
+e persistido em disco para ser reaproveitado entre jobs e execuções
+"""
+import os
+import json
+import time
+import atexit
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+from config import Config
+from utils import get_logger, cached_file_sha256
+
+logger = get_logger(__name__)
+
+
+class UploadCache:
+    """Evita reenviar o mesmo arquivo enquanto a URL anterior ainda é válida"""
+
+    # Retenção de cada host em segundos (None = permanente, 0 = não reutilizar)
+    HOST_RETENTION = {
+        'tmpfiles.org': 60 * 60,             # 1 hora
+        '0x0.st': 365 * 24 * 60 * 60,        # 365 dias
+        'catbox.moe': None,                  # permanente
+        'files.catbox.moe': None,            # permanente
+        'file.io': 0,                        # apagado após o primeiro download
+    }
+
+    # Locks por conteúdo: o hash escolhe um de N locks fixos (memória constante)
+    KEY_LOCK_STRIPES = 64
+
+    # Intervalo (s) para agrupar alterações antes de gravar o arquivo do cache
+    SAVE_DELAY = 5.0
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> 'UploadCache':
+        """Retorna o cache persistente global do processo (criado sob demanda)"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(cache_file=Config.CACHE_FOLDER / 'upload_urls.json')
+            return cls._shared
+
+    def __init__(self, min_remaining: float = None, cache_file: Optional[Path] = None):
+        """
+        Inicializa o cache
+
+        Args:
+            min_remaining: Validade mínima restante (segundos) para reutilizar uma URL
+                           (padrão: Config.UPLOAD_CACHE_MIN_REMAINING)
+            cache_file: Arquivo JSON onde persistir as entradas (None = só em memória)
+        """
+        if min_remaining is None:
+            min_remaining = Config.UPLOAD_CACHE_MIN_REMAINING
+
+        self.min_remaining = min_remaining
+        self.cache_file = Path(cache_file) if cache_file else None
+
+        # sha256 -> {'url': ..., 'host': ..., 'uploaded_at': ..., 'expires_at': ...}
+        self._entries: Dict[str, Dict] = {}
+
+        self._lock = threading.Lock()
+        self._key_locks = [threading.Lock() for _ in range(self.KEY_LOCK_STRIPES)]
+
+        # Gravação adiada: alterações marcam o cache como sujo e um timer grava uma vez
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+        self._save_lock = threading.Lock()
+
+        if self.cache_file:
+            self._load()
+            atexit.register(self.flush)
+
+    @classmethod
+    def retention_for(cls, url: str) -> Optional[float]:
+        """
+        Retorna a retenção conhecida do host de uma URL
+
+        Args:
+            url: URL pública retornada pelo upload
+
+        Returns:
+            Segundos de retenção, None se permanente ou 0 se não deve ser reutilizada
+        """
+        host = (urlparse(url).hostname or '').lower()
+        if host.startswith('www.'):
+            host = host[4:]
+
+        if host in cls.HOST_RETENTION:
+            return cls.HOST_RETENTION[host]
+
+        # Host desconhecido: não arrisca reutilizar
+        return 0
+
+    def digest(self, file_path: Path) -> str:
+        """SHA-256 do arquivo (ver utils.cached_file_sha256)"""
+        return cached_file_sha256(file_path)
+
+    def get(self, file_path: Path) -> Optional[str]:
+        """
+        Retorna a URL em cache do arquivo, se ainda tiver validade suficiente
+
+        Args:
+            file_path: Caminho do arquivo
+
+        Returns:
+            URL pública ou None
+        """
+        return self._get_by_digest(self.digest(file_path))
+
+    def put(self, file_path: Path, url: str):
+        """
+        Registra a URL pública de um arquivo
+
+        Args:
+            file_path: Caminho do arquivo enviado
+            url: URL pública retornada pelo upload
+        """
+        self._put_by_digest(self.digest(file_path), url)
+
+    def get_or_upload(self, file_path: Path, upload_func: Callable[[Path], str]) -> str:
+        """
+        Retorna a URL em cache ou faz o upload (uma única vez por conteúdo)
+
+        Chamadas simultâneas para o mesmo conteúdo aguardam o primeiro upload em
+        vez de enviarem o arquivo de novo.
+
+        Args:
+            file_path: Caminho do arquivo
+            upload_func: Função de upload que recebe o Path e retorna a URL
+
+        Returns:
+            URL pública do arquivo
+        """
+        file_digest = self.digest(file_path)
+
+        key_lock = self._key_locks[int(file_digest[:8], 16) % self.KEY_LOCK_STRIPES]
+
+        with key_lock:
+            url = self._get_by_digest(file_digest)
+            if url:
+                logger.info(f"♻️  Reutilizando upload de {Path(file_path).name}: {url}")
+                return url
+
+            url = upload_func(file_path)
+            self._put_by_digest(file_digest, url)
+            return url
+
+    def _get_by_digest(self, file_digest: str) -> Optional[str]:
+        """Busca uma entrada válida pelo hash"""
+        with self._lock:
+            entry = self._entries.get(file_digest)
+
+        if entry is None:
+            return None
+
+        expires_at = entry.get('expires_at')
+        if expires_at is not None and expires_at - time.time() < self.min_remaining:
+            logger.info(f"URL em cache perto de expirar ({entry['host']}), novo upload necessário")
+            with self._lock:
+                self._entries.pop(file_digest, None)
+                self._schedule_save()
+            return None
+
+        return entry['url']
+
+    def _put_by_digest(self, file_digest: str, url: str):
+        """Registra uma URL pelo hash, se o host permitir reutilização"""
+        retention = self.retention_for(url)
+        if retention == 0:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._entries[file_digest] = {
+                'url': url,
+                'host': urlparse(url).hostname,
+                'uploaded_at': now,
+                'expires_at': now + retention if retention is not None else None,
+            }
+            self._schedule_save()
+
+    def _load(self):
+        """Carrega as entradas do disco, descartando as já expiradas"""
+        if not self.cache_file.exists():
+            return
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except Exception as e:
+            logger.warning(f"Cache de uploads ilegível ({self.cache_file}), ignorando: {e}")
+            return
+
+        now = time.time()
+        self._entries = {
+            digest: entry for digest, entry in entries.items()
+            if entry.get('expires_at') is None or entry['expires_at'] > now
+        }
+
+        logger.info(f"Cache de uploads carregado: {len(self._entries)} URLs válidas")
+
+    def _schedule_save(self):
+        """Marca o cache como alterado e agenda uma gravação (chamado com o lock)"""
+        if not self.cache_file:
+            return
+
+        self._dirty = True
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(self.SAVE_DELAY, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        """Grava as entradas no disco se houver alterações (arquivo temporário + rename)"""
+        if not self.cache_file:
+            return
+
+        # Um único gravador por vez: todos usam o mesmo arquivo temporário
+        with self._save_lock:
+            with self._lock:
+                self._save_timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                entries = dict(self._entries)
+
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.cache_file.with_suffix('.tmp')
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(entries, f, indent=2)
+                os.replace(tmp_file, self.cache_file)
+            except Exception as e:
+                logger.warning(f"Falha ao salvar cache de uploads: {e}")
+                # Tenta de novo após SAVE_DELAY (flush já limpou _save_timer)
+                with self._lock:
+                    self._schedule_save()
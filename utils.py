@@ -4,9 +4,13 @@ Funções auxiliares e utilitárias
 import time
 import logging
 import random
+import hashlib
+import threading
 from pathlib import Path
 from functools import wraps
-from typing import List, Callable, Any
+from collections import OrderedDict
+from typing import List, Callable, Any, Optional, Tuple
+from concurrent.futures import Future, Executor
 import requests
 
 # Configuração de logging
@@ -23,7 +27,8 @@ def retry_with_backoff(
     max_retries: int = 3,
     base_delay: float = 1.0,
     exponential: bool = True,
-    exceptions: tuple = (requests.HTTPError, requests.RequestException)
+    exceptions: tuple = (requests.HTTPError, requests.RequestException),
+    should_retry: Optional[Callable[[Exception], bool]] = None
 ):
     """
     Decorador para retry com backoff exponencial
@@ -33,6 +38,7 @@ def retry_with_backoff(
         base_delay: Delay base em segundos
         exponential: Se True, usa backoff exponencial (2^n)
         exceptions: Tupla de exceções que devem acionar retry
+        should_retry: Filtro opcional; exceções para as quais retorna False sobem na hora
     """
     def decorator(func: Callable) -> Callable:
         @wraps(func)
@@ -43,6 +49,9 @@ def retry_with_backoff(
                 try:
                     return func(*args, **kwargs)
                 except exceptions as e:
+                    if should_retry is not None and not should_retry(e):
+                        raise
+
                     if attempt == max_retries - 1:
                         logger.error(f"Falhou após {max_retries} tentativas: {e}")
                         raise
@@ -64,6 +73,114 @@ def retry_with_backoff(
         return wrapper
     return decorator
 
+def chain_future(previous: Future, fn: Callable, executor: Optional[Executor] = None) -> Future:
+    """
+    Agenda fn(resultado de previous) assim que previous concluir
+
+    Se fn retornar um Future, o Future encadeado só conclui quando ele concluir,
+    o que permite esperar pelo poller do WaveSpeed sem ocupar uma thread.
+
+    Args:
+        previous: Future da etapa anterior
+        fn: Função que recebe o resultado da etapa anterior
+        executor: Executor onde rodar fn (None = na thread que concluiu previous)
+
+    Returns:
+        Future com o resultado de fn (ou a exceção da etapa que falhou); cancelado
+        se previous ou o Future retornado por fn for cancelado
+    """
+    chained = Future()
+
+    def _cancel():
+        # cancel() sozinho não acorda as_completed/wait: os waiters só são avisados
+        # por set_running_or_notify_cancel (como fazem os executors)
+        if chained.cancel():
+            chained.set_running_or_notify_cancel()
+
+    def _settle(inner: Future):
+        # exception() levantaria CancelledError aqui e o encadeado nunca concluiria
+        if inner.cancelled():
+            _cancel()
+            return
+
+        if inner.exception() is not None:
+            chained.set_exception(inner.exception())
+            return
+
+        result = inner.result()
+        if isinstance(result, Future):
+            result.add_done_callback(_settle)
+        else:
+            chained.set_result(result)
+
+    def _on_previous_done(prev: Future):
+        if prev.cancelled():
+            _cancel()
+            return
+
+        if prev.exception() is not None:
+            chained.set_exception(prev.exception())
+            return
+
+        try:
+            if executor is None:
+                inner = Future()
+                try:
+                    inner.set_result(fn(prev.result()))
+                except Exception as e:
+                    inner.set_exception(e)
+            else:
+                inner = executor.submit(fn, prev.result())
+        except Exception as e:
+            chained.set_exception(e)
+            return
+
+        inner.add_done_callback(_settle)
+
+    previous.add_done_callback(_on_previous_done)
+    return chained
+
+class RateLimiter:
+    """
+    Token bucket thread-safe: no máximo rate_per_minute chamadas por minuto,
+    com rajadas de até burst chamadas
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int = None):
+        """
+        Inicializa o limitador
+
+        Args:
+            rate_per_minute: Chamadas permitidas por minuto (<= 0 = sem limite)
+            burst: Tamanho máximo da rajada (padrão: 1)
+        """
+        self.rate_per_minute = rate_per_minute
+        self.capacity = max(1, burst or 1)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloqueia até haver uma ficha disponível e a consome"""
+        if self.rate_per_minute <= 0:
+            return
+
+        refill_per_second = self.rate_per_minute / 60.0
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * refill_per_second)
+                self._updated_at = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / refill_per_second
+
+            time.sleep(wait)
+
 def validate_images(image_paths: List[str]) -> tuple[bool, str]:
     """
     Valida lista de imagens
@@ -153,6 +270,55 @@ def create_batches(items: List[Any], batch_size: int) -> List[List[Any]]:
         batches.append(items[i:i + batch_size])
     return batches
 
+def file_sha256(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Calcula o SHA-256 do conteúdo de um arquivo
+
+    Args:
+        file_path: Caminho do arquivo
+        chunk_size: Tamanho dos blocos de leitura
+
+    Returns:
+        Hash hexadecimal
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# (caminho, tamanho, mtime) -> sha256, compartilhado pelos caches para não re-hashear o mesmo arquivo
+_digest_memo: 'OrderedDict[Tuple[str, int, int], str]' = OrderedDict()
+_digest_memo_lock = threading.Lock()
+_DIGEST_MEMO_MAX = 4096
+
+def cached_file_sha256(file_path: Path) -> str:
+    """
+    SHA-256 do conteúdo de um arquivo, memorizado por (caminho, tamanho, mtime)
+
+    Args:
+        file_path: Caminho do arquivo
+
+    Returns:
+        Hash hexadecimal
+    """
+    stat = Path(file_path).stat()
+    memo_key = (str(Path(file_path).resolve()), stat.st_size, stat.st_mtime_ns)
+
+    with _digest_memo_lock:
+        cached = _digest_memo.get(memo_key)
+        if cached:
+            _digest_memo.move_to_end(memo_key)
+            return cached
+
+    value = file_sha256(file_path)
+
+    with _digest_memo_lock:
+        _digest_memo[memo_key] = value
+        if len(_digest_memo) > _DIGEST_MEMO_MAX:
+            _digest_memo.popitem(last=False)
+    return value
+
 def select_random_image(image_pool: List[Path], used_images: List[Path] = None) -> Path:
     """
     Seleciona uma imagem aleatória do pool, evitando repetições consecutivas
@@ -1,13 +1,24 @@
 """
 Módulo de concatenação de vídeos usando FFmpeg
 """
+import os
+import json
+import shutil
+import threading
 import subprocess
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
+from config import Config
 from utils import get_logger
 
 logger = get_logger(__name__)
 
+# VIDEO_QUALITY -> CRF do libx264 quando o vídeo final precisa ser re-encodado
+_QUALITY_CRF = {'low': 28, 'medium': 23, 'high': 18}
+
 class VideoConcatenator:
     """Concatena múltiplos vídeos usando FFmpeg"""
 
@@ -78,32 +89,39 @@ class VideoConcatenator:
 
             # Cria arquivo de lista para FFmpeg
             list_file = output_path.parent / 'concat_list.txt'
-
-            with open(list_file, 'w') as f:
-                for video_path in video_paths:
-                    # FFmpeg concat demuxer requer caminhos absolutos
-                    abs_path = video_path.resolve()
-                    # Escapa apóstrofos no caminho
-                    escaped_path = str(abs_path).replace("'", "'\\''")
-                    f.write(f"file '{escaped_path}'\n")
+            self._write_list_file(video_paths, list_file)
 
             logger.info(f"Lista de concatenação criada: {list_file}")
 
             if add_transitions and len(video_paths) > 1:
-                # Concatenação com transições (mais complexa)
+                # Concatenação com transições (um único encode com xfade/acrossfade)
                 output_path = self._concatenate_with_transitions(
                     video_paths,
                     output_path,
                     transition_duration,
-                    progress_callback
+                    progress_callback,
+                    list_file
                 )
             else:
-                # Concatenação simples (mais rápida)
-                output_path = self._concatenate_simple(
-                    list_file,
-                    output_path,
-                    progress_callback
-                )
+                # Concatenação simples por cópia de streams (mais rápida); só os segmentos
+                # com codec/formato diferente da maioria são re-encodados antes
+                normalized_dir = output_path.parent / 'normalized'
+                copy_paths = self.normalize_for_copy(video_paths, normalized_dir, progress_callback)
+
+                if copy_paths is None:
+                    # Não dá para igualar os segmentos para cópia: re-encoda tudo em um único passo
+                    output_path = self._concatenate_reencode(video_paths, output_path, progress_callback)
+                else:
+                    if copy_paths != video_paths:
+                        self._write_list_file(copy_paths, list_file)
+
+                    output_path = self._concatenate_simple(
+                        list_file,
+                        output_path,
+                        progress_callback
+                    )
+
+                shutil.rmtree(normalized_dir, ignore_errors=True)
 
             # Remove arquivo temporário
             list_file.unlink(missing_ok=True)
@@ -116,6 +134,165 @@ class VideoConcatenator:
             logger.error(f"Erro ao concatenar vídeos: {e}")
             raise
 
+    @staticmethod
+    def _write_list_file(video_paths: List[Path], list_file: Path):
+        """Escreve a lista de entrada do concat demuxer"""
+        with open(list_file, 'w') as f:
+            for video_path in video_paths:
+                # FFmpeg concat demuxer requer caminhos absolutos
+                abs_path = Path(video_path).resolve()
+                # Escapa apóstrofos no caminho
+                escaped_path = str(abs_path).replace("'", "'\\''")
+                f.write(f"file '{escaped_path}'\n")
+
+    @staticmethod
+    def _stream_signature(info: Dict) -> tuple:
+        """Parâmetros que precisam ser idênticos para concatenar com -c copy"""
+        video = info.get('video') or {}
+        audio = info.get('audio') or {}
+        return (
+            video.get('codec'), video.get('profile'), video.get('width'), video.get('height'),
+            video.get('fps'), video.get('pix_fmt'), video.get('time_base'),
+            audio.get('codec'), audio.get('sample_rate'), audio.get('channels')
+        )
+
+    def normalize_for_copy(
+        self,
+        video_paths: List[Path],
+        normalized_dir: Path,
+        progress_callback=None
+    ) -> List[Path]:
+        """
+        Garante que todos os segmentos possam ser concatenados com -c copy
+
+        Sonda todos os segmentos uma vez e usa como referência os parâmetros da
+        maioria (codec, perfil, resolução, fps, pixel format, timebase e áudio).
+        Só os segmentos diferentes da referência são re-encodados para ela; no
+        caso comum (todos vindos do mesmo modelo e resolução) nada é re-encodado.
+
+        Args:
+            video_paths: Lista de vídeos, em ordem
+            normalized_dir: Onde salvar os segmentos re-encodados
+            progress_callback: Função de callback para progresso
+
+        Returns:
+            Lista de vídeos (originais ou re-encodados), na mesma ordem, ou None se
+            a compatibilidade não puder ser garantida (falha no probe, referência que
+            não é H.264/AAC); nesse caso o chamador deve re-encodar a concatenação inteira
+        """
+        try:
+            infos = [self.probe(video_path) for video_path in video_paths]
+        except Exception as e:
+            logger.warning(f"⚠️ Não foi possível sondar os segmentos ({e}), re-encodando a concatenação")
+            return None
+
+        signatures = [self._stream_signature(info) for info in infos]
+        reference_signature = Counter(signatures).most_common(1)[0][0]
+        mismatched = [idx for idx, signature in enumerate(signatures) if signature != reference_signature]
+
+        if not mismatched:
+            logger.info(f"⚡ {len(video_paths)} segmentos compatíveis: concatenação por cópia, sem re-encode")
+            return video_paths
+
+        reference = infos[signatures.index(reference_signature)]
+        logger.info(f"🔧 Re-encodando {len(mismatched)}/{len(video_paths)} segmentos incompatíveis antes da cópia")
+
+        if progress_callback:
+            progress_callback(f"Ajustando {len(mismatched)} segmento(s) com formato diferente...")
+
+        normalized_dir.mkdir(parents=True, exist_ok=True)
+        copy_paths = list(video_paths)
+
+        try:
+            for idx in mismatched:
+                destination = normalized_dir / f"segment_{idx + 1}.mp4"
+                copy_paths[idx] = self._transcode_to_match(video_paths[idx], infos[idx], reference, destination)
+        except Exception as e:
+            logger.warning(f"⚠️ Não foi possível igualar os segmentos para cópia ({e}), re-encodando a concatenação")
+            shutil.rmtree(normalized_dir, ignore_errors=True)
+            return None
+
+        return copy_paths
+
+    def _transcode_to_match(self, source: Path, info: Dict, reference: Dict, destination: Path) -> Path:
+        """
+        Re-encoda um segmento com os parâmetros de referência (H.264/AAC)
+
+        Args:
+            source: Segmento incompatível
+            info: probe() do segmento
+            reference: probe() de um segmento da maioria
+            destination: Arquivo de saída
+
+        Returns:
+            destination
+
+        Raises:
+            Exception: Se a referência não for H.264 (sem encoder equivalente) ou o FFmpeg falhar
+        """
+        video = reference['video'] or {}
+        audio: Optional[Dict] = reference.get('audio')
+
+        if video.get('codec') != 'h264' or (audio and audio.get('codec') != 'aac'):
+            raise Exception(
+                f"Segmentos com formatos diferentes e referência {video.get('codec')}/"
+                f"{audio.get('codec') if audio else 'sem áudio'}: não é possível igualar para cópia"
+            )
+
+        width, height = video['width'], video['height']
+        fps = video.get('fps') or 25
+
+        cmd = ['ffmpeg', '-i', str(source)]
+
+        # Segmento sem áudio recebe uma trilha silenciosa para casar com os demais
+        if audio and not info.get('audio'):
+            cmd += ['-f', 'lavfi', '-i', f"anullsrc=r={audio['sample_rate']}:cl=stereo"]
+
+        cmd += [
+            '-vf', (
+                f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={fps}"
+            ),
+            '-map', '0:v:0'
+        ]
+
+        if audio:
+            cmd += [
+                '-map', '0:a:0' if info.get('audio') else '1:a:0',
+                '-c:a', 'aac',
+                '-ar', str(audio['sample_rate']),
+                '-ac', str(audio['channels'])
+            ]
+            if not info.get('audio'):
+                cmd += ['-shortest']  # anullsrc é infinito
+        else:
+            cmd += ['-an']
+
+        cmd += self._video_encode_args(video.get('pix_fmt') or 'yuv420p')
+
+        profile = (video.get('profile') or '').lower()
+        if profile in ('baseline', 'main', 'high'):
+            cmd += ['-profile:v', profile]
+
+        # Mesmo timescale da trilha de vídeo da referência (exigido pelo concat com -c copy)
+        time_base = video.get('time_base') or ''
+        if '/' in time_base:
+            cmd += ['-video_track_timescale', time_base.split('/')[1]]
+
+        cmd += ['-y', str(destination)]
+
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=max(300, info['duration'] * 3)
+        )
+
+        if result.returncode != 0:
+            raise Exception(f"FFmpeg falhou ao re-encodar {source.name}: {result.stderr[-2000:]}")
+
+        return destination
+
     def _concatenate_simple(
         self,
         list_file: Path,
@@ -143,6 +320,7 @@ class VideoConcatenator:
                 '-safe', '0',
                 '-i', str(list_file),
                 '-c', 'copy',  # Copia streams sem re-encoding (mais rápido)
+                '-movflags', '+faststart',  # moov no início: o player começa a tocar antes do download terminar
                 '-y',  # Sobrescreve arquivo de saída
                 str(output_path)
             ]
@@ -173,76 +351,133 @@ class VideoConcatenator:
             logger.error(f"Erro na concatenação simples: {e}")
             raise
 
+    def _concatenate_reencode(
+        self,
+        video_paths: List[Path],
+        output_path: Path,
+        progress_callback=None
+    ) -> Path:
+        """
+        Concatenação com re-encode de todos os segmentos (filtro concat, H.264/AAC)
+
+        Usada quando os segmentos não podem ser igualados para -c copy. Cada segmento
+        é normalizado para a resolução/fps do primeiro; segmentos sem áudio recebem
+        silêncio.
+
+        Args:
+            video_paths: Lista de vídeos
+            output_path: Path do vídeo de saída
+            progress_callback: Função de callback
+
+        Returns:
+            Path do vídeo gerado
+        """
+        logger.info("Usando concatenação com re-encode (segmentos incompatíveis com cópia)")
+
+        if progress_callback:
+            progress_callback("Processando concatenação (re-encode)...")
+
+        infos = [self.probe(video_path) for video_path in video_paths]
+        has_audio = any(info.get('audio') for info in infos)
+
+        filters = self._segment_filters(infos, has_audio)
+        inputs = ''.join(f"[v{idx}][a{idx}]" if has_audio else f"[v{idx}]" for idx in range(len(infos)))
+        outputs = '[vout][aout]' if has_audio else '[vout]'
+        filters.append(f"{inputs}concat=n={len(infos)}:v=1:a={1 if has_audio else 0}{outputs}")
+
+        cmd = ['ffmpeg']
+        for video_path in video_paths:
+            cmd += ['-i', str(video_path)]
+        cmd += [
+            '-filter_complex', ';'.join(filters),
+            '-map', '[vout]'
+        ]
+        if has_audio:
+            cmd += ['-map', '[aout]', '-c:a', 'aac', '-b:a', '192k']
+        else:
+            cmd += ['-an']
+        cmd += self._video_encode_args() + ['-y', str(output_path)]
+
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=max(300, sum(info['duration'] for info in infos) * 3)
+        )
+
+        if result.returncode != 0:
+            raise Exception(f"FFmpeg falhou: {result.stderr[-2000:]}")
+
+        logger.info("Concatenação com re-encode concluída")
+
+        return output_path
+
     def _concatenate_with_transitions(
         self,
         video_paths: List[Path],
         output_path: Path,
         transition_duration: float,
-        progress_callback=None
+        progress_callback=None,
+        list_file: Path = None
     ) -> Path:
         """
-        Concatenação com transições de fade
+        Concatenação com crossfade entre segmentos em um único encode
+
+        Monta um filtergraph encadeando xfade (vídeo) e acrossfade (áudio); o offset
+        de cada transição vem da duração real (ffprobe) dos segmentos anteriores.
 
         Args:
             video_paths: Lista de vídeos
             output_path: Path do vídeo de saída
-            transition_duration: Duração do fade em segundos
+            transition_duration: Duração do crossfade em segundos
             progress_callback: Função de callback
+            list_file: Lista do concat demuxer, usada no fallback para concatenação simples
 
         Returns:
             Path do vídeo gerado
         """
         try:
-            logger.info(f"Usando concatenação com transições (fade de {transition_duration}s)")
+            logger.info(f"Usando concatenação com transições (crossfade de {transition_duration}s)")
 
             if progress_callback:
                 progress_callback("Processando concatenação com transições...")
 
-            # Para transições, precisamos re-encodar
-            # Primeiro, concatenamos sem transições
-            temp_concat = output_path.parent / 'temp_concat.mp4'
+            infos = [self.probe(video_path) for video_path in video_paths]
+            durations = [info['duration'] for info in infos]
 
-            # Cria arquivo de lista temporário
-            list_file = output_path.parent / 'concat_list_temp.txt'
+            if any(duration <= 0 for duration in durations):
+                raise Exception("Não foi possível obter a duração de todos os segmentos")
 
-            with open(list_file, 'w') as f:
-                for video_path in video_paths:
-                    abs_path = video_path.resolve()
-                    escaped_path = str(abs_path).replace("'", "'\\''")
-                    f.write(f"file '{escaped_path}'\n")
+            # A transição não pode ser maior que metade do segmento mais curto
+            transition = min(transition_duration, min(durations) / 2)
+            has_audio = all(info.get('audio') for info in infos)
 
-            # Concatenação base
-            cmd_concat = [
-                'ffmpeg',
-                '-f', 'concat',
-                '-safe', '0',
-                '-i', str(list_file),
-                '-c', 'copy',
-                '-y',
-                str(temp_concat)
+            filtergraph = self._build_transition_filtergraph(infos, transition, has_audio)
+
+            cmd = ['ffmpeg']
+            for video_path in video_paths:
+                cmd += ['-i', str(video_path)]
+            cmd += [
+                '-filter_complex', filtergraph,
+                '-map', '[vout]'
             ]
+            if has_audio:
+                cmd += ['-map', '[aout]', '-c:a', 'aac', '-b:a', '192k']
+            else:
+                cmd += ['-an']
+            cmd += self._video_encode_args() + ['-y', str(output_path)]
 
-            logger.info("Executando concatenação base...")
+            logger.info(f"Executando encode único com {len(video_paths) - 1} transições...")
 
             result = subprocess.run(
-                cmd_concat,
+                cmd,
                 capture_output=True,
                 text=True,
-                timeout=300
+                timeout=max(300, sum(durations) * 3)
             )
 
             if result.returncode != 0:
-                raise Exception(f"Concatenação base falhou: {result.stderr}")
-
-            # Para simplificar, usamos o vídeo concatenado sem transições elaboradas
-            # (Implementar transições de fade entre múltiplos vídeos é muito complexo com FFmpeg)
-            # Em produção, considere usar bibliotecas como moviepy para isso
-
-            import shutil
-            shutil.move(str(temp_concat), str(output_path))
-
-            # Cleanup
-            list_file.unlink(missing_ok=True)
+                raise Exception(f"FFmpeg falhou: {result.stderr[-2000:]}")
 
             logger.info("Concatenação com transições concluída")
 
@@ -250,10 +485,178 @@ class VideoConcatenator:
 
         except Exception as e:
             logger.error(f"Erro na concatenação com transições: {e}")
+            if list_file is None:
+                raise
             # Fallback para concatenação simples
             logger.warning("Fallback para concatenação simples")
             return self._concatenate_simple(list_file, output_path, progress_callback)
 
+    @staticmethod
+    def _build_transition_filtergraph(infos: List[Dict], transition: float, has_audio: bool) -> str:
+        """
+        Filtergraph de crossfade encadeado: [v0][v1]xfade → [x1][v2]xfade → ... → [vout]
+
+        Os segmentos são normalizados para a resolução/fps do primeiro (xfade exige
+        entradas idênticas). O offset da transição k é a soma das durações dos
+        segmentos anteriores menos as k transições já aplicadas.
+
+        Args:
+            infos: Resultado de probe() de cada segmento, em ordem
+            transition: Duração do crossfade em segundos
+            has_audio: Se True, também encadeia acrossfade → [aout]
+
+        Returns:
+            String para -filter_complex
+        """
+        filters = VideoConcatenator._segment_filters(infos, has_audio)
+
+        elapsed = 0.0
+        video_label, audio_label = 'v0', 'a0'
+        for idx in range(1, len(infos)):
+            elapsed += infos[idx - 1]['duration']
+            offset = elapsed - idx * transition
+            last = idx == len(infos) - 1
+
+            next_video = 'vout' if last else f"x{idx}"
+            filters.append(
+                f"[{video_label}][v{idx}]xfade=transition=fade:duration={transition:.3f}:offset={offset:.3f}[{next_video}]"
+            )
+            video_label = next_video
+
+            if has_audio:
+                next_audio = 'aout' if last else f"c{idx}"
+                filters.append(f"[{audio_label}][a{idx}]acrossfade=d={transition:.3f}[{next_audio}]")
+                audio_label = next_audio
+
+        return ';'.join(filters)
+
+    @staticmethod
+    def _segment_filters(infos: List[Dict], has_audio: bool) -> List[str]:
+        """
+        Filtros que normalizam cada segmento para [v{i}] (e [a{i}]) com os parâmetros do primeiro
+
+        Args:
+            infos: Resultado de probe() de cada segmento, em ordem
+            has_audio: Se True, também gera [a{i}] (silêncio para segmentos sem áudio)
+
+        Returns:
+            Lista de filtros para -filter_complex
+        """
+        first = infos[0]['video']
+        width, height = first['width'], first['height']
+        fps = first['fps'] or 25
+        sample_rate = next((info['audio']['sample_rate'] for info in infos if info.get('audio')), None) or 48000
+
+        filters = []
+        for idx, info in enumerate(infos):
+            filters.append(
+                f"[{idx}:v]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={fps},format=yuv420p,settb=AVTB[v{idx}]"
+            )
+            if not has_audio:
+                continue
+            if info.get('audio'):
+                filters.append(
+                    f"[{idx}:a]aresample={sample_rate},aformat=sample_fmts=fltp:channel_layouts=stereo[a{idx}]"
+                )
+            else:
+                filters.append(
+                    f"anullsrc=r={sample_rate}:cl=stereo,atrim=duration={info['duration']:.3f},"
+                    f"aformat=sample_fmts=fltp:channel_layouts=stereo[a{idx}]"
+                )
+
+        return filters
+
+    @staticmethod
+    def _video_encode_args(pix_fmt: str = 'yuv420p') -> List[str]:
+        """Argumentos de encode H.264 para saídas re-encodadas (qualidade de VIDEO_QUALITY)"""
+        crf = _QUALITY_CRF.get(Config.VIDEO_QUALITY, _QUALITY_CRF['high'])
+        return [
+            '-c:v', 'libx264',
+            '-preset', 'veryfast',
+            '-crf', str(crf),
+            '-pix_fmt', pix_fmt,
+            '-movflags', '+faststart'
+        ]
+
+    def probe(self, video_path: Path) -> Dict:
+        """
+        Lê duração e parâmetros dos streams de um vídeo com ffprobe
+
+        Args:
+            video_path: Path do vídeo
+
+        Returns:
+            Dict:
+            {
+                'duration': 12.48,
+                'size': 1234567,
+                'format': 'mov,mp4,m4a,3gp,3g2,mj2',
+                'video': {'codec': 'h264', 'profile': 'High', 'width': 832, 'height': 480,
+                          'fps': Fraction(25, 1), 'pix_fmt': 'yuv420p', 'time_base': '1/12800'},
+                'audio': {'codec': 'aac', 'sample_rate': 44100, 'channels': 2,
+                          'channel_layout': 'stereo', 'time_base': '1/44100'}  # None se não houver áudio
+            }
+
+        Raises:
+            Exception: Se o ffprobe falhar
+        """
+        cmd = [
+            'ffprobe',
+            '-v', 'quiet',
+            '-print_format', 'json',
+            '-show_format',
+            '-show_streams',
+            str(video_path)
+        ]
+
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=30
+        )
+
+        if result.returncode != 0:
+            raise Exception(f"ffprobe falhou: {result.stderr}")
+
+        data = json.loads(result.stdout)
+        fmt = data.get('format', {})
+
+        info = {
+            'duration': float(fmt.get('duration', 0) or 0),
+            'size': int(fmt.get('size', 0) or 0),
+            'format': fmt.get('format_name', 'unknown'),
+            'video': None,
+            'audio': None
+        }
+
+        for stream in data.get('streams', []):
+            codec_type = stream.get('codec_type')
+
+            if codec_type == 'video' and info['video'] is None:
+                rate = stream.get('r_frame_rate', '0/1')
+                info['video'] = {
+                    'codec': stream.get('codec_name', 'unknown'),
+                    'profile': stream.get('profile'),
+                    'width': stream.get('width', 0),
+                    'height': stream.get('height', 0),
+                    'fps': Fraction(rate) if rate and not rate.endswith('/0') else Fraction(0),
+                    'pix_fmt': stream.get('pix_fmt'),
+                    'time_base': stream.get('time_base')
+                }
+
+            elif codec_type == 'audio' and info['audio'] is None:
+                info['audio'] = {
+                    'codec': stream.get('codec_name', 'unknown'),
+                    'sample_rate': int(stream.get('sample_rate', 0) or 0),
+                    'channels': stream.get('channels', 0),
+                    'channel_layout': stream.get('channel_layout'),
+                    'time_base': stream.get('time_base')
+                }
+
+        return info
+
     def get_video_info(self, video_path: Path) -> Dict:
         """
         Obtém informações sobre um vídeo
@@ -265,45 +668,22 @@ class VideoConcatenator:
             Dict com informações do vídeo
         """
         try:
-            cmd = [
-                'ffprobe',
-                '-v', 'quiet',
-                '-print_format', 'json',
-                '-show_format',
-                '-show_streams',
-                str(video_path)
-            ]
-
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-
-            if result.returncode != 0:
-                raise Exception(f"ffprobe falhou: {result.stderr}")
-
-            import json
-            data = json.loads(result.stdout)
+            info = self.probe(video_path)
 
             # Extrai informações relevantes
             video_info = {
-                'duration': float(data.get('format', {}).get('duration', 0)),
-                'size': int(data.get('format', {}).get('size', 0)),
-                'format': data.get('format', {}).get('format_name', 'unknown'),
+                'duration': info['duration'],
+                'size': info['size'],
+                'format': info['format'],
             }
 
-            # Busca stream de vídeo
-            for stream in data.get('streams', []):
-                if stream.get('codec_type') == 'video':
-                    video_info.update({
-                        'width': stream.get('width', 0),
-                        'height': stream.get('height', 0),
-                        'fps': eval(stream.get('r_frame_rate', '0/1')),
-                        'codec': stream.get('codec_name', 'unknown')
-                    })
-                    break
+            if info['video']:
+                video_info.update({
+                    'width': info['video']['width'],
+                    'height': info['video']['height'],
+                    'fps': float(info['video']['fps']),
+                    'codec': info['video']['codec']
+                })
 
             return video_info
 
@@ -311,6 +691,246 @@ class VideoConcatenator:
             logger.error(f"Erro ao obter info do vídeo: {e}")
             return {}
 
+class IncrementalConcatenator:
+    """
+    Concatena os segmentos conforme ficam prontos, em vez de esperar todos
+
+    Cada segmento do prefixo contíguo (1, 2, 3...) é remuxado (-c copy) para
+    MPEG-TS com timestamps contínuos e anexado a um arquivo .ts que cresce
+    durante o job. No fim, finalize() só remuxa esse arquivo para MP4, então o
+    vídeo final fica pronto segundos depois do último segmento.
+
+    Segmentos com formato diferente do primeiro são re-encodados para ele antes
+    de entrar (ver VideoConcatenator.normalize_for_copy). Qualquer falha desativa
+    o modo incremental e finalize() retorna None, para o chamador usar a
+    concatenação normal.
+
+    O arquivo .ts também é publicado como uma playlist HLS (progressive.m3u8, tipo
+    EVENT, um EXT-X-BYTERANGE por segmento) que cresce junto com ele, para assistir
+    ao início do vídeo enquanto o resto ainda está sendo renderizado. close()
+    remove o diretório de trabalho quando o job termina.
+
+    Uso:
+        incremental = IncrementalConcatenator(concatenator, job_dir / 'progressive')
+        incremental.add(1, video_1)      # de qualquer thread, em qualquer ordem
+        ...
+        final = incremental.finalize(output_path, expected_segments=n)
+    """
+
+    def __init__(self, concatenator: VideoConcatenator, work_dir: Path, progress_callback=None,
+                 target_duration: Optional[int] = None):
+        """
+        Inicializa o concatenador incremental
+
+        Args:
+            concatenator: VideoConcatenator usado para probe e re-encode
+            work_dir: Diretório de trabalho (recriado vazio)
+            progress_callback: Função de callback para progresso
+            target_duration: EXT-X-TARGETDURATION da playlist (padrão: Config.PREVIEW_TARGET_DURATION)
+        """
+        self.concatenator = concatenator
+        self.work_dir = work_dir
+        self.progress_callback = progress_callback
+
+        # Fixo durante todo o job: o HLS não permite alterar o alvo de uma playlist EVENT
+        self.target_duration = target_duration or Config.PREVIEW_TARGET_DURATION
+
+        shutil.rmtree(work_dir, ignore_errors=True)
+        work_dir.mkdir(parents=True, exist_ok=True)
+
+        self.stream_path = work_dir / 'progressive.ts'
+        self.stream_path.touch()
+        self.playlist_path = work_dir / 'progressive.m3u8'
+
+        # (offset, tamanho em bytes, duração) de cada segmento no .ts, para a playlist
+        self._ranges: List[tuple] = []
+        self._write_playlist(ended=False)
+
+        self._lock = threading.Lock()
+        self._ready: Dict[int, Path] = {}
+        self._next_segment = 1
+        self._elapsed = 0.0
+        self._reference: Optional[Dict] = None
+        self.error: Optional[Exception] = None
+
+        # Um único worker: os segmentos são anexados em ordem, fora das threads do pipeline
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='incremental-concat')
+
+    @property
+    def appended(self) -> int:
+        """Número de segmentos já anexados"""
+        with self._lock:
+            return self._next_segment - 1
+
+    def add(self, segment_number: int, video_path: Path):
+        """
+        Registra um segmento pronto (anexa tudo o que ficar contíguo)
+
+        Args:
+            segment_number: Número do segmento (1 = primeiro)
+            video_path: Vídeo do segmento
+        """
+        with self._lock:
+            if self.error is not None or segment_number < self._next_segment:
+                return
+            self._ready[segment_number] = Path(video_path)
+
+        self._executor.submit(self._drain)
+
+    def _drain(self):
+        """Anexa os segmentos contíguos disponíveis (roda no worker)"""
+        while True:
+            with self._lock:
+                if self.error is not None or self._next_segment not in self._ready:
+                    return
+                segment_number = self._next_segment
+                video_path = self._ready.pop(segment_number)
+
+            try:
+                self._append(segment_number, video_path)
+            except Exception as e:
+                logger.warning(f"⚠️ Concatenação incremental desativada no segmento {segment_number}: {e}")
+                with self._lock:
+                    self.error = e
+                return
+
+            with self._lock:
+                self._next_segment += 1
+
+    def _append(self, segment_number: int, video_path: Path):
+        """Remuxa um segmento para MPEG-TS (com offset de timestamps) e anexa ao arquivo"""
+        info = self.concatenator.probe(video_path)
+
+        if self._reference is None:
+            self._reference = info
+        elif VideoConcatenator._stream_signature(info) != VideoConcatenator._stream_signature(self._reference):
+            video_path = self.concatenator._transcode_to_match(
+                video_path, info, self._reference, self.work_dir / f'normalized_{segment_number}.mp4'
+            )
+            info = self.concatenator.probe(video_path)
+
+        part_path = self.work_dir / f'segment_{segment_number}.ts'
+
+        cmd = [
+            'ffmpeg',
+            '-i', str(video_path),
+            '-map', '0',
+            '-c', 'copy',
+            '-output_ts_offset', f"{self._elapsed:.6f}"
+        ]
+        if (info.get('video') or {}).get('codec') == 'h264':
+            cmd += ['-bsf:v', 'h264_mp4toannexb']
+        cmd += ['-f', 'mpegts', '-y', str(part_path)]
+
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+
+        if result.returncode != 0:
+            raise Exception(f"FFmpeg falhou ao remuxar segmento {segment_number}: {result.stderr[-2000:]}")
+
+        # Arquivos MPEG-TS podem ser concatenados byte a byte
+        offset = self.stream_path.stat().st_size
+        with open(self.stream_path, 'ab') as stream, open(part_path, 'rb') as part:
+            shutil.copyfileobj(part, stream, 1024 * 1024)
+        length = part_path.stat().st_size
+        part_path.unlink(missing_ok=True)
+
+        self._elapsed += info['duration']
+        self._ranges.append((offset, length, info['duration']))
+
+        if info['duration'] > self.target_duration:
+            logger.warning(
+                f"⚠️ Segmento {segment_number} ({info['duration']:.1f}s) excede PREVIEW_TARGET_DURATION "
+                f"({self.target_duration}s); o preview pode travar em alguns players"
+            )
+        self._write_playlist(ended=False)
+
+        logger.info(f"➕ Segmento {segment_number} anexado ao vídeo progressivo ({self._elapsed:.1f}s)")
+
+        if self.progress_callback:
+            self.progress_callback(f"Segmento {segment_number} anexado ao vídeo final")
+
+    def finalize(self, output_path: Path, expected_segments: int) -> Optional[Path]:
+        """
+        Aguarda os segmentos pendentes e gera o MP4 final (remux, sem re-encode)
+
+        Args:
+            output_path: Path do vídeo final
+            expected_segments: Número total de segmentos do job
+
+        Returns:
+            output_path, ou None se o modo incremental falhou ou faltam segmentos
+        """
+        self._executor.shutdown(wait=True)
+        self._write_playlist(ended=True)
+
+        if self.error is not None:
+            return None
+
+        if self.appended != expected_segments:
+            logger.warning(
+                f"⚠️ Vídeo progressivo tem {self.appended}/{expected_segments} segmentos, usando concatenação normal"
+            )
+            return None
+
+        cmd = [
+            'ffmpeg',
+            '-i', str(self.stream_path),
+            '-map', '0',
+            '-c', 'copy'
+        ]
+        reference_audio = (self._reference or {}).get('audio') or {}
+        if reference_audio.get('codec') == 'aac':
+            cmd += ['-bsf:a', 'aac_adtstoasc']
+        cmd += ['-movflags', '+faststart', '-y', str(output_path)]
+
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+
+        if result.returncode != 0:
+            logger.warning(f"⚠️ Remux do vídeo progressivo falhou, usando concatenação normal: {result.stderr[-2000:]}")
+            return None
+
+        logger.info(f"Vídeo final gerado a partir do vídeo progressivo: {output_path}")
+
+        return output_path
+
+    def close(self):
+        """Descarta trabalho pendente e remove o diretório de trabalho (o vídeo final já foi gerado ou o job falhou)"""
+        with self._lock:
+            self._ready.clear()
+        self._executor.shutdown(wait=True)
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def _write_playlist(self, ended: bool):
+        """
+        Reescreve a playlist HLS com os segmentos já anexados
+
+        Args:
+            ended: Se True, adiciona EXT-X-ENDLIST (o player para de recarregar)
+        """
+        lines = [
+            '#EXTM3U',
+            '#EXT-X-VERSION:4',
+            f'#EXT-X-TARGETDURATION:{self.target_duration}',
+            '#EXT-X-MEDIA-SEQUENCE:0',
+            '#EXT-X-PLAYLIST-TYPE:EVENT'
+        ]
+
+        # Os timestamps já são contínuos (-output_ts_offset), sem EXT-X-DISCONTINUITY
+        for offset, length, duration in self._ranges:
+            lines += [
+                f'#EXTINF:{duration:.3f},',
+                f'#EXT-X-BYTERANGE:{length}@{offset}',
+                self.stream_path.name
+            ]
+
+        if ended:
+            lines.append('#EXT-X-ENDLIST')
+
+        # Grava e renomeia: o player nunca lê uma playlist pela metade
+        tmp_path = self.playlist_path.with_suffix('.m3u8.tmp')
+        tmp_path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+        os.replace(tmp_path, self.playlist_path)
+
 def test_video_concatenator():
     """Função de teste do concatenador"""
     print(f"\n{'='*60}")
@@ -1,13 +1,17 @@
 """
 Módulo de geração de vídeo com lip-sync usando WaveSpeed Wan 2.2 API
 """
-import time
+import os
 import requests
 from pathlib import Path
-from typing import List, Dict, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Dict, Optional
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, as_completed
 from config import Config
-from utils import get_logger, retry_with_backoff, select_random_image
+from utils import get_logger, retry_with_backoff, select_random_image, chain_future
+from wavespeed_poller import WaveSpeedPoller
+from content_store import ContentStore
+from provider_limits import provider_limit
+from upload_cache import UploadCache
 
 logger = get_logger(__name__)
 
@@ -15,6 +19,7 @@ class WaveSpeedClient:
     """Cliente para WaveSpeed API"""
 
     BASE_URL = "https://api.wavespeed.ai/api/v3"
+    MODEL = "wavespeed-ai/wan-2.2/speech-to-video"
 
     def __init__(self, api_key: str):
         """
@@ -25,6 +30,11 @@ class WaveSpeedClient:
         """
         self.api_key = api_key
         self.session = requests.Session()
+
+        # Cota da API key, compartilhada por todos os clientes do processo:
+        # slots = tarefas em voo (WAVESPEED_MAX_INFLIGHT), fichas = requisições HTTP (WAVESPEED_RPM)
+        self.limits = provider_limit('wavespeed', api_key)
+
         logger.info("WaveSpeedClient inicializado")
 
     def _headers(self) -> dict:
@@ -51,7 +61,7 @@ class WaveSpeedClient:
             Exception: Se a submissão falhar
         """
         try:
-            endpoint = f"{self.BASE_URL}/wavespeed-ai/wan-2.2/speech-to-video"
+            endpoint = f"{self.BASE_URL}/{self.MODEL}"
 
             payload = {
                 "audio": audio_url,
@@ -63,6 +73,8 @@ class WaveSpeedClient:
 
             logger.info(f"Submetendo tarefa: {endpoint}")
 
+            self.limits.throttle()
+
             response = self.session.post(
                 endpoint,
                 headers=self._headers(),
@@ -96,104 +108,75 @@ class WaveSpeedClient:
             logger.error(f"Erro ao submeter tarefa: {e}")
             raise
 
-    def poll_result(self, request_id: str, poll_interval: float = None, poll_timeout: float = None) -> dict:
+    def fetch_result(self, request_id: str) -> dict:
         """
-        Faz polling até obter resultado da tarefa
+        Consulta uma única vez o status de uma tarefa
 
         Args:
             request_id: ID da tarefa
-            poll_interval: Intervalo entre polls em segundos
-            poll_timeout: Timeout total em segundos
 
         Returns:
-            Dict com dados do resultado
+            Dict 'data' da resposta (contém 'status' e, se concluída, 'outputs')
 
         Raises:
-            Exception: Se polling falhar ou timeout
+            requests.HTTPError / requests.ConnectionError: Em falhas de rede ou HTTP
         """
-        if poll_interval is None:
-            poll_interval = Config.POLL_INTERVAL
-
-        if poll_timeout is None:
-            poll_timeout = Config.POLL_TIMEOUT
-
         endpoint = f"{self.BASE_URL}/predictions/{request_id}/result"
-        start_time = time.time()
-
-        logger.info(f"Iniciando polling para tarefa {request_id}")
-
-        # Aguarda 15 segundos antes do primeiro poll (API precisa de tempo para processar)
-        logger.info("Aguardando 15s antes do primeiro poll (API processando)...")
-        time.sleep(15)
-
-        poll_count = 0
-        max_connection_errors = 5
-
-        while True:
-            poll_count += 1
 
-            try:
-                logger.info(f"Poll #{poll_count} para tarefa {request_id}...")
-
-                response = self.session.get(
-                    endpoint,
-                    headers=self._headers(),
-                    timeout=30
-                )
-
-                response.raise_for_status()
+        self.limits.throttle()
 
-                data = response.json()
-                status = data.get("data", {}).get("status")
+        response = self.session.get(
+            endpoint,
+            headers=self._headers(),
+            timeout=30
+        )
 
-                logger.info(f"Status da tarefa {request_id}: {status}")
+        response.raise_for_status()
 
-                if status == "completed":
-                    logger.info(f"✅ Tarefa {request_id} concluída com sucesso")
-                    return data["data"]
+        return response.json().get("data", {})
 
-                elif status == "failed":
-                    error_msg = data.get("data", {}).get("error", "Erro desconhecido")
-                    raise Exception(f"Processamento falhou na API: {error_msg}")
+    def poll_result_async(
+        self,
+        request_id: str,
+        poll_interval: float = None,
+        poll_timeout: float = None
+    ) -> Future:
+        """
+        Registra a tarefa no poller compartilhado do processo
 
-                # Verifica timeout
-                elapsed = time.time() - start_time
-                if elapsed > poll_timeout:
-                    raise Exception(f"Timeout após {poll_timeout}s aguardando resultado")
+        Args:
+            request_id: ID da tarefa
+            poll_interval: Intervalo entre polls em segundos
+            poll_timeout: Timeout total em segundos
 
-                # Aguarda antes do próximo poll
-                logger.info(f"Aguardando {poll_interval}s antes do próximo poll...")
-                time.sleep(poll_interval)
+        Returns:
+            Future resolvido com o dict de resultado quando a tarefa concluir
+        """
+        return WaveSpeedPoller.instance().track(
+            self,
+            request_id,
+            poll_interval=poll_interval,
+            poll_timeout=poll_timeout
+        )
 
-            except requests.exceptions.ConnectionError as e:
-                logger.warning(f"⚠️  Erro de conexão no poll #{poll_count}: {e}")
+    def poll_result(self, request_id: str, poll_interval: float = None, poll_timeout: float = None) -> dict:
+        """
+        Aguarda o resultado da tarefa (via poller compartilhado)
 
-                if poll_count >= max_connection_errors:
-                    raise Exception(
-                        f"Muitos erros de conexão ({max_connection_errors}). "
-                        "A API WaveSpeed pode estar sobrecarregada ou instável."
-                    )
+        Args:
+            request_id: ID da tarefa
+            poll_interval: Intervalo entre polls em segundos
+            poll_timeout: Timeout total em segundos
 
-                # Aguarda mais tempo antes de tentar novamente
-                logger.info("Aguardando 10s devido a erro de conexão...")
-                time.sleep(10)
-                continue
+        Returns:
+            Dict com dados do resultado
 
-            except requests.HTTPError as e:
-                if e.response.status_code == 429:
-                    logger.warning("Rate limit no polling, aguardando 30s...")
-                    time.sleep(30)
-                    continue
-                elif e.response.status_code >= 500:
-                    logger.warning(f"Erro do servidor ({e.response.status_code}), aguardando 15s...")
-                    time.sleep(15)
-                    continue
-                else:
-                    raise
+        Raises:
+            Exception: Se polling falhar ou timeout
+        """
+        logger.info(f"Aguardando resultado da tarefa {request_id} no poller compartilhado")
 
-            except Exception as e:
-                logger.error(f"Erro inesperado no polling: {type(e).__name__}: {e}")
-                raise
+        return self.poll_result_async(request_id, poll_interval, poll_timeout).result()
 
     def process_video(
         self,
@@ -218,6 +201,22 @@ class WaveSpeedClient:
         request_id = self.submit_task(audio_url, image_url, resolution)
         result = self.poll_result(request_id)
 
+        return self.get_output_url(result)
+
+    @staticmethod
+    def get_output_url(result: dict) -> str:
+        """
+        Extrai a URL do vídeo gerado de um resultado concluído
+
+        Args:
+            result: Dict de resultado retornado pelo polling
+
+        Returns:
+            URL do vídeo gerado
+
+        Raises:
+            Exception: Se o resultado não tiver outputs
+        """
         outputs = result.get("outputs", [])
         if not outputs:
             raise Exception("Nenhum output retornado pela API")
@@ -381,7 +380,7 @@ class FileUploader:
             raise
 
     @staticmethod
-    def upload_file(file_path: Path) -> str:
+    def upload_file(file_path: Path, use_cache: bool = True) -> str:
         """
         Faz upload de arquivo tentando múltiplos serviços com fallback automático
 
@@ -393,6 +392,8 @@ class FileUploader:
 
         Args:
             file_path: Caminho do arquivo
+            use_cache: Se True, reutiliza a URL de um upload anterior do mesmo conteúdo
+                       enquanto ela for válida (ver UploadCache)
 
         Returns:
             URL pública do arquivo
@@ -400,6 +401,11 @@ class FileUploader:
         Raises:
             Exception: Se todos os serviços falharem
         """
+        if use_cache:
+            return UploadCache.shared().get_or_upload(
+                file_path, lambda path: FileUploader.upload_file(path, use_cache=False)
+            )
+
         logger.info(f"📤 Iniciando upload de {file_path.name}...")
 
         # Lista de serviços para tentar (em ordem de preferência)
@@ -439,15 +445,353 @@ class VideoGenerator:
         """Inicializa o gerador de vídeo"""
         self.client = WaveSpeedClient(Config.WAVESPEED_API_KEY)
         self.uploader = FileUploader()
+
+        # Vídeos já renderizados, por (hash do áudio, hash da imagem, resolução)
+        self.render_cache = ContentStore(Config.CACHE_FOLDER / 'renders', suffix='.mp4') if Config.RENDER_CACHE_ENABLED else None
+
+        # Cota de tarefas simultâneas na fila do WaveSpeed (compartilhada por todo o processo)
+        self.max_inflight = max(1, Config.WAVESPEED_MAX_INFLIGHT)
+        self._inflight_slots = self.client.limits
+
         logger.info("VideoGenerator inicializado")
 
+    def prepare_image_pool(self, image_paths: List[Path], output_dir: Path) -> List[Path]:
+        """
+        Copia as imagens do job para output_dir/images
+
+        Args:
+            image_paths: Lista de Paths das imagens disponíveis
+            output_dir: Diretório do job
+
+        Returns:
+            Lista de Paths das cópias dentro do diretório do job
+        """
+        import shutil
+
+        images_dir = output_dir / 'images'
+        images_dir.mkdir(parents=True, exist_ok=True)
+
+        image_pool = []
+        for idx, img_path in enumerate(image_paths, start=1):
+            dest = images_dir / f"image_{idx}{Path(img_path).suffix}"
+            if not dest.exists():
+                shutil.copy2(img_path, dest)
+            image_pool.append(dest)
+
+        return image_pool
+
+    def select_image(self, audio_data: Dict, image_pool: List[Path], used_images: List[Path]) -> Path:
+        """
+        Escolhe a imagem de um segmento (evitando repetições consecutivas)
+
+        Se alguma imagem do pool já tiver render em cache para este áudio, ela é
+        preferida, para que re-execuções do mesmo job reaproveitem os vídeos.
+
+        Args:
+            audio_data: Dict do áudio ({'audio_number': 1, 'audio_path': Path(...), ...})
+            image_pool: Imagens disponíveis (ver prepare_image_pool)
+            used_images: Imagens já usadas; a escolhida é adicionada à lista
+
+        Returns:
+            Path da imagem escolhida
+
+        Raises:
+            Exception: Se o áudio não existir
+        """
+        audio_path = audio_data['audio_path']
+
+        if not audio_path or not audio_path.exists():
+            raise Exception(f"Áudio não encontrado: {audio_path}")
+
+        candidates = image_pool
+        if self.render_cache is not None:
+            cached = [img for img in image_pool if self.render_cache.get(self._render_key(audio_path, img))]
+            if cached:
+                candidates = cached
+
+        # Seleciona imagem aleatória (evita repetições consecutivas)
+        image_path = select_random_image(candidates, used_images)
+        used_images.append(image_path)
+
+        return image_path
+
+    def lookup_render(self, audio_data: Dict, image_path: Path, video_dir: Path) -> Optional[Dict]:
+        """
+        Procura um vídeo já renderizado para as mesmas entradas
+
+        Args:
+            audio_data: Dict do áudio
+            image_path: Imagem escolhida para o segmento
+            video_dir: Diretório onde salvar video_N.mp4
+
+        Returns:
+            Dict do vídeo (mesmo formato de generate_single_video) ou None
+        """
+        if self.render_cache is None:
+            return None
+
+        video_number = audio_data['audio_number']
+        video_path = self.render_cache.fetch(
+            self._render_key(audio_data['audio_path'], image_path),
+            video_dir / f'video_{video_number}.mp4'
+        )
+
+        if video_path is None:
+            return None
+
+        logger.info(f"♻️  Vídeo {video_number} reaproveitado do cache de renders (sem custo de API)")
+
+        return {
+            'video_number': video_number,
+            'audio_path': audio_data['audio_path'],
+            'image_path': image_path,
+            'video_path': video_path
+        }
+
+    def _render_key(self, audio_path: Path, image_path: Path) -> str:
+        """Chave do cache de renders: conteúdo do áudio + conteúdo da imagem + resolução + modelo"""
+        return ContentStore.make_key(
+            self.render_cache.file_digest(audio_path),
+            self.render_cache.file_digest(image_path),
+            Config.DEFAULT_RESOLUTION,
+            WaveSpeedClient.MODEL
+        )
+
+    def submit_video(self, audio_data: Dict, image_path: Path) -> Dict:
+        """
+        Faz upload dos arquivos de um segmento e submete a tarefa ao WaveSpeed
+
+        Não aguarda a cota de tarefas simultâneas; quem chama deve reservar um
+        slot (ver generate_single_video e generate_video_async).
+
+        Args:
+            audio_data: Dict do áudio ({'audio_number': 1, 'audio_path': Path(...), ...})
+            image_path: Imagem escolhida para o segmento (ver select_image)
+
+        Returns:
+            Dict da submissão:
+            {
+                'video_number': 1,
+                'audio_path': Path('audio_1.mp3'),
+                'image_path': Path('image_1.jpg'),
+                'audio_url': 'https://...',
+                'image_url': 'https://...',
+                'request_id': '...'
+            }
+
+        Raises:
+            Exception: Se o upload ou a submissão falharem
+        """
+        video_number = audio_data['audio_number']
+        audio_path = audio_data['audio_path']
+
+        logger.info(f"Gerando vídeo {video_number}: áudio={audio_path.name}, imagem={image_path.name}")
+
+        # Upload de arquivos pelo backend configurado (UPLOAD_BACKEND)
+        # No backend 'public', o UploadCache evita reenviar a mesma imagem a cada segmento e job
+        from wavespeed_uploader import upload_for_wavespeed
+
+        audio_url = upload_for_wavespeed(audio_path)
+        image_url = upload_for_wavespeed(image_path)
+
+        request_id = self.client.submit_task(
+            audio_url=audio_url,
+            image_url=image_url,
+            resolution=Config.DEFAULT_RESOLUTION
+        )
+
+        return {
+            'video_number': video_number,
+            'audio_path': audio_path,
+            'image_path': image_path,
+            'audio_url': audio_url,
+            'image_url': image_url,
+            'request_id': request_id
+        }
+
+    def download_video(self, submission: Dict, result: dict, video_dir: Path) -> Dict:
+        """
+        Baixa o vídeo de uma tarefa concluída
+
+        Args:
+            submission: Dict retornado por submit_video
+            result: Dict de resultado retornado pelo polling
+            video_dir: Diretório onde salvar video_N.mp4
+
+        Returns:
+            Dict no mesmo formato dos itens retornados por generate_videos_batch
+        """
+        video_number = submission['video_number']
+        video_url = self.client.get_output_url(result)
+
+        # Baixa vídeo gerado
+        video_path = video_dir / f'video_{video_number}.mp4'
+
+        logger.info(f"Baixando vídeo {video_number} de {video_url}...")
+
+        response = requests.get(video_url, stream=True, timeout=120)
+        response.raise_for_status()
+
+        # Baixa para arquivo temporário e renomeia (nunca sobrescreve um hardlink do cache)
+        tmp_path = video_path.with_suffix('.part')
+        with open(tmp_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=1024*1024):
+                f.write(chunk)
+        os.replace(tmp_path, video_path)
+
+        logger.info(f"Vídeo {video_number} salvo em: {video_path}")
+
+        if self.render_cache is not None:
+            self.render_cache.put(
+                self._render_key(submission['audio_path'], submission['image_path']),
+                video_path
+            )
+
+        return {
+            'video_number': video_number,
+            'audio_path': submission['audio_path'],
+            'image_path': submission['image_path'],
+            'video_path': video_path
+        }
+
+    def generate_single_video(
+        self,
+        audio_data: Dict,
+        image_pool: List[Path],
+        used_images: List[Path],
+        video_dir: Path,
+        on_submitted: Optional[Callable[[Dict], None]] = None
+    ) -> Dict:
+        """
+        Gera o vídeo com lip-sync de um único áudio (upload → submit → poll → download)
+
+        Se o cache de renders já tiver um vídeo para o mesmo áudio, imagem e
+        resolução, ele é copiado para video_dir sem chamar a API.
+
+        Args:
+            audio_data: Dict do áudio ({'audio_number': 1, 'audio_path': Path(...), ...})
+            image_pool: Imagens disponíveis (ver prepare_image_pool)
+            used_images: Imagens já usadas, para evitar repetições consecutivas
+            video_dir: Diretório onde salvar video_N.mp4
+            on_submitted: Chamado com o dict da submissão logo após o submit (ex: checkpoint do request_id)
+
+        Returns:
+            Dict no mesmo formato dos itens retornados por generate_videos_batch
+
+        Raises:
+            Exception: Se alguma etapa falhar
+        """
+        image_path = self.select_image(audio_data, image_pool, used_images)
+
+        cached = self.lookup_render(audio_data, image_path, video_dir)
+        if cached:
+            return cached
+
+        self._inflight_slots.acquire()
+        try:
+            submission = self.submit_video(audio_data, image_path)
+            if on_submitted:
+                on_submitted(submission)
+            result = self.client.poll_result(submission['request_id'])
+        finally:
+            self._inflight_slots.release()
+
+        return self.download_video(submission, result, video_dir)
+
+    def reattach_video(self, submission: Dict, video_dir: Path) -> Dict:
+        """
+        Volta a acompanhar uma tarefa já submetida (ex: job retomado após reiniciar o servidor)
+
+        Args:
+            submission: Dict no formato retornado por submit_video (com o request_id gravado)
+            video_dir: Diretório onde salvar video_N.mp4
+
+        Returns:
+            Dict no mesmo formato dos itens retornados por generate_videos_batch
+
+        Raises:
+            Exception: Se a tarefa tiver falhado, expirado ou não existir mais no WaveSpeed
+        """
+        logger.info(f"🔗 Reanexando vídeo {submission['video_number']} à tarefa {submission['request_id']}")
+
+        self._inflight_slots.acquire()
+        try:
+            result = self.client.poll_result(submission['request_id'])
+        finally:
+            self._inflight_slots.release()
+
+        return self.download_video(submission, result, video_dir)
+
+    def generate_video_async(
+        self,
+        audio_data: Dict,
+        image_pool: List[Path],
+        used_images: List[Path],
+        video_dir: Path,
+        download_executor: Executor,
+        on_submitted: Optional[Callable[[Dict], None]] = None
+    ) -> Future:
+        """
+        Submete um segmento e retorna um Future concluído após o download do vídeo
+
+        O upload e a submissão rodam na thread atual (aguardando um slot da cota
+        WAVESPEED_MAX_INFLIGHT); a espera pelo resultado fica no poller compartilhado
+        e o download roda em download_executor, então nenhuma thread fica parada
+        enquanto o WaveSpeed processa.
+
+        Args:
+            audio_data: Dict do áudio ({'audio_number': 1, 'audio_path': Path(...), ...})
+            image_pool: Imagens disponíveis (ver prepare_image_pool)
+            used_images: Imagens já usadas, para evitar repetições consecutivas
+            video_dir: Diretório onde salvar video_N.mp4
+            download_executor: Executor onde rodar o download
+            on_submitted: Chamado com o dict da submissão logo após o submit (ex: checkpoint do request_id)
+
+        Returns:
+            Future com o dict do vídeo (mesmo formato de generate_single_video)
+
+        Raises:
+            Exception: Se o upload ou a submissão falharem
+        """
+        image_path = self.select_image(audio_data, image_pool, used_images)
+
+        cached = self.lookup_render(audio_data, image_path, video_dir)
+        if cached:
+            done = Future()
+            done.set_result(cached)
+            return done
+
+        self._inflight_slots.acquire()
+        try:
+            submission = self.submit_video(audio_data, image_path)
+            if on_submitted:
+                on_submitted(submission)
+            polled = self.client.poll_result_async(submission['request_id'])
+        except Exception:
+            self._inflight_slots.release()
+            raise
+
+        # Libera o slot assim que o WaveSpeed termina (com sucesso ou não)
+        polled.add_done_callback(lambda _: self._inflight_slots.release())
+
+        logger.info(f"🎬 Vídeo {submission['video_number']} na fila do WaveSpeed ({submission['request_id']})")
+
+        return chain_future(
+            polled,
+            lambda result: self.download_video(submission, result, video_dir),
+            download_executor
+        )
+
     def generate_videos_batch(
         self,
         audios: List[Dict],
         image_paths: List[Path],
         output_dir: Path,
         progress_callback=None,
-        max_workers: int = 3
+        max_workers: int = 3,
+        submit_all: Optional[bool] = None,
+        on_submitted: Optional[Callable[[Dict], None]] = None,
+        on_completed: Optional[Callable[[Dict], None]] = None
     ) -> List[Dict]:
         """
         Gera múltiplos vídeos com lip-sync
@@ -459,6 +803,12 @@ class VideoGenerator:
             output_dir: Diretório para salvar vídeos
             progress_callback: Função de callback para progresso
             max_workers: Número máximo de workers paralelos
+            submit_all: Se True, faz upload e submete todos os segmentos de imediato
+                        (até WAVESPEED_MAX_INFLIGHT na fila) e coleta os resultados
+                        conforme terminam; os workers só fazem upload/submissão e
+                        download (padrão: Config.WAVESPEED_SUBMIT_ALL)
+            on_submitted: Chamado com o dict de cada submissão (ex: checkpoint do request_id)
+            on_completed: Chamado com cada vídeo assim que ele fica pronto (ex: concatenação incremental)
 
         Returns:
             Lista de dicts com informações dos vídeos gerados
@@ -472,93 +822,59 @@ class VideoGenerator:
                 ...
             ]
         """
+        if submit_all is None:
+            submit_all = Config.WAVESPEED_SUBMIT_ALL
+
         logger.info(f"Iniciando geração de {len(audios)} vídeos")
 
         # Cria diretórios
         video_dir = output_dir / 'videos'
         video_dir.mkdir(parents=True, exist_ok=True)
 
-        images_dir = output_dir / 'images'
-        images_dir.mkdir(parents=True, exist_ok=True)
-
-        # Copia imagens para diretório do job
-        image_pool = []
-        for idx, img_path in enumerate(image_paths, start=1):
-            dest = images_dir / f"image_{idx}{Path(img_path).suffix}"
-            if not dest.exists():
-                import shutil
-                shutil.copy2(img_path, dest)
-            image_pool.append(dest)
+        image_pool = self.prepare_image_pool(image_paths, output_dir)
 
         results = []
         used_images = []
 
         def generate_single_video(audio_data: Dict) -> Dict:
             """Gera um único vídeo"""
-            video_number = audio_data['audio_number']
-            audio_path = audio_data['audio_path']
-
-            if not audio_path or not audio_path.exists():
-                raise Exception(f"Áudio não encontrado: {audio_path}")
-
-            # Seleciona imagem aleatória (evita repetições consecutivas)
-            image_path = select_random_image(image_pool, used_images)
-            used_images.append(image_path)
-
             if progress_callback:
-                progress_callback(f"Gerando vídeo {video_number}/{len(audios)} (lip-sync)...")
-
-            logger.info(f"Gerando vídeo {video_number}: áudio={audio_path.name}, imagem={image_path.name}")
+                progress_callback(f"Gerando vídeo {audio_data['audio_number']}/{len(audios)} (lip-sync)...")
 
-            # Upload de arquivos (usando serviços compatíveis com WaveSpeed)
-            from wavespeed_uploader import WaveSpeedCompatibleUploader
-
-            audio_url = WaveSpeedCompatibleUploader.upload_file_wavespeed_compatible(audio_path)
-            image_url = WaveSpeedCompatibleUploader.upload_file_wavespeed_compatible(image_path)
-
-            # Gera vídeo
-            video_url = self.client.process_video(
-                audio_url=audio_url,
-                image_url=image_url,
-                resolution=Config.DEFAULT_RESOLUTION
-            )
-
-            # Baixa vídeo gerado
-            video_path = video_dir / f'video_{video_number}.mp4'
-
-            logger.info(f"Baixando vídeo {video_number} de {video_url}...")
-
-            response = requests.get(video_url, stream=True, timeout=120)
-            response.raise_for_status()
-
-            with open(video_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=1024*1024):
-                    f.write(chunk)
-
-            logger.info(f"Vídeo {video_number} salvo em: {video_path}")
-
-            return {
-                'video_number': video_number,
-                'audio_path': audio_path,
-                'image_path': image_path,
-                'video_path': video_path
-            }
+            return self.generate_single_video(audio_data, image_pool, used_images, video_dir, on_submitted)
 
         # Processa em paralelo (WaveSpeed suporta múltiplas requisições simultâneas)
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-
         logger.info(f"🚀 Enviando {len(audios)} vídeos para a fila do WaveSpeed em paralelo...")
 
+        if submit_all:
+            logger.info(f"Modo submeter-tudo: até {self.max_inflight} tarefas simultâneas na fila do WaveSpeed")
+
         # Notifica que todos os vídeos foram enviados para a fila
         if progress_callback:
             progress_callback(f"🎬 {len(audios)} vídeos na fila do WaveSpeed (processando em paralelo)...")
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submete todos os vídeos para processamento paralelo
-            futures = {
-                executor.submit(generate_single_video, audio_data): audio_data
-                for audio_data in audios
-            }
+        with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+                ThreadPoolExecutor(max_workers=max_workers) as download_executor:
+            if submit_all:
+                # Workers só fazem upload + submissão; a espera fica no poller compartilhado
+                # e o download no download_executor (generate_video_async retorna um Future,
+                # que chain_future desembrulha)
+                futures = {
+                    chain_future(
+                        executor.submit(
+                            self.generate_video_async,
+                            audio_data, image_pool, used_images, video_dir, download_executor, on_submitted
+                        ),
+                        lambda video_future: video_future
+                    ): audio_data
+                    for audio_data in audios
+                }
+            else:
+                # Submete todos os vídeos para processamento paralelo
+                futures = {
+                    executor.submit(generate_single_video, audio_data): audio_data
+                    for audio_data in audios
+                }
 
             # Aguarda conclusão de cada vídeo
             for future in as_completed(futures):
@@ -567,6 +883,9 @@ class VideoGenerator:
                     result = future.result()
                     results.append(result)
 
+                    if on_completed:
+                        on_completed(result)
+
                     # Atualiza progresso com contador
                     completed = len(results)
                     remaining = len(audios) - completed
@@ -0,0 +1,259 @@
+"""
+Poller multiplexado para predições WaveSpeed
+Acompanha todas as tarefas em andamento (de todos os jobs) em um único loop,
+em vez de manter uma thread dormindo em time.sleep por vídeo
+"""
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, InvalidStateError
+from typing import Dict, Optional
+import requests
+from config import Config
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class _TrackedPrediction:
+    """Estado de polling de uma predição em andamento"""
+
+    def __init__(self, client, request_id: str, poll_interval: float, poll_timeout: float, initial_delay: float):
+        self.client = client
+        self.request_id = request_id
+        self.poll_interval = poll_interval
+        self.future = Future()
+        self.started_at = time.time()
+        self.deadline = self.started_at + poll_timeout
+        self.poll_timeout = poll_timeout
+        self.next_poll_at = self.started_at + initial_delay
+        self.poll_count = 0
+        self.connection_errors = 0
+
+
+class WaveSpeedPoller:
+    """
+    Loop único de polling compartilhado por todas as predições WaveSpeed do processo
+
+    Cada request_id registrado com track() recebe um Future que é resolvido com o
+    dict 'data' da API quando a tarefa conclui (ou com uma exceção se falhar/expirar).
+    As consultas de status de cada rodada são feitas por um pool pequeno e fixo,
+    então centenas de predições em voo não custam centenas de threads.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls) -> 'WaveSpeedPoller':
+        """Retorna o poller global do processo (criado sob demanda)"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(
+        self,
+        poll_interval: float = None,
+        poll_timeout: float = None,
+        initial_delay: float = None,
+        max_concurrent_polls: int = None
+    ):
+        """
+        Inicializa o poller
+
+        Args:
+            poll_interval: Intervalo entre polls de uma mesma tarefa (padrão: Config.POLL_INTERVAL)
+            poll_timeout: Timeout total por tarefa (padrão: Config.POLL_TIMEOUT)
+            initial_delay: Espera antes do primeiro poll (padrão: Config.POLL_INITIAL_DELAY)
+            max_concurrent_polls: Consultas de status simultâneas por rodada
+        """
+        self.poll_interval = poll_interval if poll_interval is not None else Config.POLL_INTERVAL
+        self.poll_timeout = poll_timeout if poll_timeout is not None else Config.POLL_TIMEOUT
+        self.initial_delay = initial_delay if initial_delay is not None else Config.POLL_INITIAL_DELAY
+        self.max_concurrent_polls = max_concurrent_polls or Config.POLL_MAX_CONCURRENT
+
+        self._entries: Dict[str, _TrackedPrediction] = {}
+        self._cond = threading.Condition()
+        self._paused_until = 0.0
+        self._stopped = False
+        self._thread = None
+        self._fetch_pool = ThreadPoolExecutor(
+            max_workers=self.max_concurrent_polls,
+            thread_name_prefix='wavespeed-poll'
+        )
+
+    def track(
+        self,
+        client,
+        request_id: str,
+        poll_interval: float = None,
+        poll_timeout: float = None,
+        initial_delay: float = None
+    ) -> Future:
+        """
+        Registra uma predição para acompanhamento
+
+        Args:
+            client: WaveSpeedClient usado para consultar o status (define a API key)
+            request_id: ID da tarefa retornado por submit_task
+            poll_interval: Sobrescreve o intervalo entre polls desta tarefa
+            poll_timeout: Sobrescreve o timeout desta tarefa
+            initial_delay: Sobrescreve a espera antes do primeiro poll
+
+        Returns:
+            Future resolvido com o dict de resultado da API
+        """
+        with self._cond:
+            if self._stopped:
+                raise Exception("WaveSpeedPoller foi encerrado")
+
+            existing = self._entries.get(request_id)
+            if existing is not None:
+                return existing.future
+
+            entry = _TrackedPrediction(
+                client,
+                request_id,
+                poll_interval if poll_interval is not None else self.poll_interval,
+                poll_timeout if poll_timeout is not None else self.poll_timeout,
+                initial_delay if initial_delay is not None else self.initial_delay
+            )
+            self._entries[request_id] = entry
+            self._ensure_thread()
+            self._cond.notify()
+
+        logger.info(f"Tarefa {request_id} registrada no poller ({self.in_flight()} em voo)")
+
+        return entry.future
+
+    def in_flight(self) -> int:
+        """Número de predições ainda em acompanhamento"""
+        with self._cond:
+            return len(self._entries)
+
+    def stop(self):
+        """Encerra o loop; predições pendentes são resolvidas com erro"""
+        with self._cond:
+            self._stopped = True
+            pending = list(self._entries.values())
+            self._entries.clear()
+            self._cond.notify_all()
+
+        for entry in pending:
+            self._resolve(entry, error=Exception("WaveSpeedPoller encerrado antes da conclusão"))
+
+        self._fetch_pool.shutdown(wait=False)
+
+    def _ensure_thread(self):
+        """Inicia o loop de polling se ainda não estiver rodando (chamado com o lock)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='wavespeed-poller', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Loop principal: aguarda a próxima tarefa vencida e consulta todas as vencidas juntas"""
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+
+                now = time.time()
+
+                # Descarta futures cancelados pelo chamador
+                for request_id in [r for r, e in self._entries.items() if e.future.cancelled()]:
+                    del self._entries[request_id]
+
+                if not self._entries:
+                    self._cond.wait()
+                    continue
+
+                wake_at = max(self._paused_until, min(e.next_poll_at for e in self._entries.values()))
+                if wake_at > now:
+                    self._cond.wait(timeout=wake_at - now)
+                    continue
+
+                due = [e for e in self._entries.values() if e.next_poll_at <= now]
+
+            # Consulta as tarefas vencidas em paralelo (pool fixo) e aguarda a rodada
+            list(self._fetch_pool.map(self._poll_once, due))
+
+    def _poll_once(self, entry: _TrackedPrediction):
+        """Consulta o status de uma tarefa e resolve ou reagenda o seu Future"""
+        entry.poll_count += 1
+        now = time.time()
+
+        try:
+            logger.info(f"Poll #{entry.poll_count} para tarefa {entry.request_id}...")
+
+            data = entry.client.fetch_result(entry.request_id)
+            status = data.get("status")
+            entry.connection_errors = 0
+
+            logger.info(f"Status da tarefa {entry.request_id}: {status}")
+
+            if status == "completed":
+                logger.info(f"✅ Tarefa {entry.request_id} concluída com sucesso")
+                self._resolve(entry, result=data)
+                return
+
+            if status == "failed":
+                error_msg = data.get("error", "Erro desconhecido")
+                self._resolve(entry, error=Exception(f"Processamento falhou na API: {error_msg}"))
+                return
+
+            self._reschedule(entry, now + entry.poll_interval)
+
+        except requests.exceptions.ConnectionError as e:
+            entry.connection_errors += 1
+            logger.warning(f"⚠️  Erro de conexão no poll #{entry.poll_count} ({entry.request_id}): {e}")
+
+            if entry.connection_errors >= 5:
+                self._resolve(entry, error=Exception(
+                    f"Muitos erros de conexão ({entry.connection_errors}). "
+                    "A API WaveSpeed pode estar sobrecarregada ou instável."
+                ))
+                return
+
+            self._reschedule(entry, now + 10)
+
+        except requests.HTTPError as e:
+            status_code = e.response.status_code if e.response is not None else 0
+
+            if status_code == 429:
+                # Rate limit vale para todas as tarefas: pausa a rodada inteira
+                logger.warning("Rate limit no polling, pausando o poller por 30s...")
+                with self._cond:
+                    self._paused_until = max(self._paused_until, now + 30)
+                self._reschedule(entry, now + 30)
+            elif status_code >= 500:
+                logger.warning(f"Erro do servidor ({status_code}), tentando {entry.request_id} novamente em 15s...")
+                self._reschedule(entry, now + 15)
+            else:
+                self._resolve(entry, error=e)
+
+        except Exception as e:
+            logger.error(f"Erro inesperado no polling de {entry.request_id}: {type(e).__name__}: {e}")
+            self._resolve(entry, error=e)
+
+    def _reschedule(self, entry: _TrackedPrediction, next_poll_at: float):
+        """Agenda o próximo poll, ou expira a tarefa se o timeout passou"""
+        if time.time() > entry.deadline:
+            self._resolve(entry, error=Exception(f"Timeout após {entry.poll_timeout}s aguardando resultado"))
+            return
+
+        entry.next_poll_at = next_poll_at
+
+    def _resolve(self, entry: _TrackedPrediction, result: Optional[dict] = None, error: Optional[Exception] = None):
+        """Remove a tarefa do acompanhamento e conclui o seu Future"""
+        with self._cond:
+            if self._entries.get(entry.request_id) is entry:
+                del self._entries[entry.request_id]
+
+        try:
+            if error is not None:
+                entry.future.set_exception(error)
+            else:
+                entry.future.set_result(result)
+        except InvalidStateError:
+            # Future já cancelado pelo chamador
+            pass
@@ -4,7 +4,10 @@ Usa 0x0.st como primário e tmpfiles.org como fallback
 """
 import requests
 from pathlib import Path
+from config import Config
 from utils import get_logger
+from upload_cache import UploadCache
+from artifact_server import LocalArtifactUploader
 
 logger = get_logger(__name__)
 
@@ -79,14 +82,23 @@ class WaveSpeedCompatibleUploader:
             raise
 
     @staticmethod
-    def upload_file_wavespeed_compatible(file_path: Path) -> str:
+    def upload_file_wavespeed_compatible(file_path: Path, use_cache: bool = True) -> str:
         """
         Faz upload para serviços compatíveis com WaveSpeed
         Usa 0x0.st como primário e tmpfiles.org como fallback
 
+        Com use_cache=True, um arquivo já enviado (mesmo SHA-256) reaproveita a URL
+        anterior sem nenhuma requisição, enquanto ela não estiver perto de expirar.
+
         Returns:
             URL pública acessível pela WaveSpeed
         """
+        if use_cache:
+            return UploadCache.shared().get_or_upload(
+                file_path,
+                lambda path: WaveSpeedCompatibleUploader.upload_file_wavespeed_compatible(path, use_cache=False)
+            )
+
         logger.info(f"📤 Upload compatível WaveSpeed: {file_path.name}...")
 
         # Serviços compatíveis testados com WaveSpeed
@@ -133,3 +145,31 @@ class WaveSpeedCompatibleUploader:
             f"Falha ao fazer upload de {file_path.name} para serviços compatíveis. "
             f"Todos os serviços falharam:\n{error_details}"
         )
+
+
+# Backends de upload disponíveis (selecionados por Config.UPLOAD_BACKEND)
+UPLOAD_BACKENDS = {
+    'public': WaveSpeedCompatibleUploader.upload_file_wavespeed_compatible,  # 0x0.st / tmpfiles.org
+    'local': LocalArtifactUploader.upload,  # servidor HTTP próprio com URLs assinadas
+}
+
+def upload_for_wavespeed(file_path: Path, backend: str = None) -> str:
+    """
+    Publica um arquivo para a WaveSpeed usando o backend configurado
+
+    Args:
+        file_path: Caminho do arquivo
+        backend: Nome do backend (padrão: Config.UPLOAD_BACKEND)
+
+    Returns:
+        URL pública acessível pela WaveSpeed
+
+    Raises:
+        ValueError: Se o backend não existir
+    """
+    backend = (backend or Config.UPLOAD_BACKEND).lower()
+
+    if backend not in UPLOAD_BACKENDS:
+        raise ValueError(f"Backend de upload inválido: {backend}. Use: {', '.join(UPLOAD_BACKENDS)}")
+
+    return UPLOAD_BACKENDS[backend](file_path)
@@ -4,18 +4,24 @@ Interface web moderna com configuração de API keys integrada
 """
 import os
 import json
+import queue
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-from flask import Flask, request, jsonify, send_from_directory, send_file
+from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import Flask, Response, request, jsonify, send_from_directory, send_file, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
 from werkzeug.utils import secure_filename
 import logging
 
 from config import Config
-from job_manager import JobManager
+from job_manager import JobManager, JobStatus
 from audio_generator import AudioGenerator  
 from utils import get_logger, split_into_paragraphs, create_batches
 from database import db
+from job_events import JobEventBus, TERMINAL_EVENTS
 
 # Configuração de logging
 logger = get_logger(__name__)
@@ -26,9 +32,13 @@ CORS(app)
 
 # Configurações
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
+app.use_x_sendfile = Config.USE_X_SENDFILE  # O proxy reverso envia o arquivo em vez do Python
 UPLOAD_FOLDER = Path('./temp/uploads')
 UPLOAD_FOLDER.mkdir(parents=True, exist_ok=True)
 
+# Jobs rodam fora das threads de requisição; os endpoints só enfileiram
+job_executor = ThreadPoolExecutor(max_workers=Config.MAX_CONCURRENT_JOBS, thread_name_prefix='job-worker')
+
 # ============================================================================
 # ROTAS ESTÁTICAS
 # ============================================================================
@@ -309,9 +319,210 @@ def upload_images():
 # API - GERAÇÃO DE VÍDEOS
 # ============================================================================
 
+def _update_job(job_id: str, updates: Dict, event_type: str = 'progress'):
+    """Atualiza o job no banco e publica o registro atualizado para os streams SSE"""
+    job = db.update_job(job_id, updates)
+    if job:
+        JobEventBus.instance().publish(job_id, dict(job, type=event_type))
+
+def _register_video(video_path: str, job_id: str = None, project_id: str = None, duration: float = 0):
+    """Registra um vídeo gerado no catálogo usado pelo histórico"""
+    try:
+        path = Path(video_path)
+        db.add_video({
+            'path': str(path),
+            'name': path.name,
+            'size': path.stat().st_size,
+            'duration': duration,
+            'job_id': job_id,
+            'project_id': project_id
+        })
+    except Exception as e:
+        logger.warning(f"⚠️ Não foi possível registrar {video_path} no catálogo: {e}")
+
+def _run_single_job(job_mgr: JobManager, job, max_workers: int, project_id: str = None, pipeline: Optional[bool] = None):
+    """
+    Processa um job de vídeo único no worker pool, refletindo o progresso no banco
+
+    O job deve ter sido reservado com JobManager.claim_job; a reserva é liberada ao final.
+    O evento final (completed/failed) só é publicado depois que o banco e o catálogo
+    estão atualizados.
+    """
+    job.defer_terminal_event = True
+
+    try:
+        final_video = job_mgr.process_job(
+            job=job,
+            progress_callback=lambda message, percent: db.update_job(job.job_id, {
+                'status': 'processing',
+                'progress': percent,
+                'message': message
+            }),
+            max_workers_video=max_workers,
+            pipeline=pipeline
+        )
+
+        duration = (job.completed_at - job.created_at).total_seconds()
+
+        _register_video(final_video, job_id=job.job_id, project_id=project_id, duration=duration)
+
+        # Update job as completed
+        _update_job(job.job_id, {
+            'status': 'completed',
+            'progress': 100,
+            'video_path': str(final_video),
+            'duration': duration,
+            'message': 'Vídeo gerado com sucesso'
+        }, event_type='completed')
+
+    except Exception as e:
+        logger.error(f"Erro ao gerar vídeo (job {job.job_id}): {e}")
+        _update_job(job.job_id, {
+            'status': 'failed',
+            'error': str(e),
+            'failed_segments': job.failure_report()
+        }, event_type='failed')
+    finally:
+        JobManager.release_job(job.job_id)
+
+def _run_batch_job(batch_job_id: str, job_mgr: JobManager, scripts: List[Dict], voice_selections: List[str],
+                   image_paths: List[str], batch_image_mode: str, batch_images: Dict, model_id: str, max_workers: int,
+                   project_id: str = None):
+    """
+    Processa um lote de roteiros no worker pool, refletindo o progresso no banco
+
+    Os roteiros rodam em paralelo com o mesmo JobManager, então os limites de
+    concorrência de cada provedor (TTS, cota do WaveSpeed, RPM do Gemini) são
+    divididos entre todos eles.
+    """
+    lock = threading.Lock()
+    script_progress = [0] * len(scripts)
+
+    _update_job(batch_job_id, {'status': 'processing'}, event_type='stage')
+
+    def process_script(idx: int, script_data: Dict) -> Dict:
+        script_text = script_data.get('text', '')
+        script_id = script_data.get('id')
+        voice_name = voice_selections[idx] if idx < len(voice_selections) else voice_selections[0]
+
+        # Determine image paths for this script based on mode
+        if batch_image_mode == 'individual':
+            # Collect images for each batch in this script
+            script_image_paths = []
+            batches = script_data.get('batches', [])
+
+            for batch in batches:
+                batch_number = batch.get('batch_number')
+                batch_key = f"{script_id}_{batch_number}"
+
+                if batch_key in batch_images:
+                    batch_image_path = batch_images[batch_key]
+                    if batch_image_path not in script_image_paths:
+                        script_image_paths.append(batch_image_path)
+
+            # If no specific images found, fallback to default image_paths
+            if not script_image_paths:
+                script_image_paths = image_paths
+        else:
+            # Fixed mode - use the same images for all scripts
+            script_image_paths = image_paths
+
+        # Cria job
+        job, error = job_mgr.create_job(
+            input_text=script_text,
+            voice_name=voice_name,
+            image_paths=script_image_paths,
+            model_id=model_id
+        )
+
+        if error:
+            return {
+                'script_id': script_id,
+                'success': False,
+                'error': error
+            }
+
+        # Progresso do lote = média do progresso dos roteiros
+        def report_progress(message: str, percent: int):
+            with lock:
+                script_progress[idx] = percent
+                overall = int(sum(script_progress) / len(scripts))
+            _update_job(batch_job_id, {
+                'progress': overall,
+                'message': f"Roteiro {script_id}: {message}"
+            })
+
+        # Processa job (reservado, para não ser retomado enquanto roda)
+        JobManager.claim_job(job.job_id)
+        try:
+            final_video = job_mgr.process_job(
+                job=job,
+                progress_callback=report_progress,
+                max_workers_video=max_workers
+            )
+        except Exception as e:
+            return {
+                'script_id': script_id,
+                'job_id': job.job_id,
+                'success': False,
+                'error': str(e),
+                'failed_segments': job.failure_report()
+            }
+        finally:
+            JobManager.release_job(job.job_id)
+
+        duration = (job.completed_at - job.created_at).total_seconds()
+        _register_video(final_video, job_id=batch_job_id, project_id=project_id, duration=duration)
+
+        return {
+            'script_id': script_id,
+            'success': True,
+            'video_path': str(final_video),
+            'duration': duration
+        }
+
+    results = [None] * len(scripts)
+    max_parallel = max(1, min(Config.BATCH_MAX_PARALLEL_SCRIPTS, len(scripts)))
+
+    with ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix='batch-script') as executor:
+        futures = {
+            executor.submit(process_script, idx, script_data): idx
+            for idx, script_data in enumerate(scripts)
+        }
+
+        for future in as_completed(futures):
+            idx = futures[future]
+            try:
+                results[idx] = future.result()
+            except Exception as e:
+                results[idx] = {
+                    'script_id': scripts[idx].get('id'),
+                    'success': False,
+                    'error': str(e)
+                }
+
+    videos_gerados = [r['video_path'] for r in results if r.get('success')]
+
+    # Update batch job as completed
+    if videos_gerados:
+        _update_job(batch_job_id, {
+            'status': 'completed',
+            'video_path': videos_gerados[0] if len(videos_gerados) == 1 else f'{len(videos_gerados)} vídeos',
+            'results': results,
+            'videos_count': len(videos_gerados),
+            'total_scripts': len(scripts)
+        }, event_type='completed')
+    else:
+        _update_job(batch_job_id, {
+            'status': 'failed',
+            'results': results,
+            'videos_count': 0,
+            'total_scripts': len(scripts)
+        }, event_type='failed')
+
 @app.route('/api/generate/single', methods=['POST'])
 def generate_single_video():
-    """Gera um vídeo único"""
+    """Enfileira a geração de um vídeo único e retorna o job_id imediatamente"""
     try:
         data = request.json
         
@@ -321,6 +532,7 @@ def generate_single_video():
         model_id = data.get('model_id', 'eleven_multilingual_v2')
         image_paths = data.get('image_paths', [])
         max_workers = data.get('max_workers', 3)
+        project_id = data.get('project_id')
         
         # Validação
         if not text or not text.strip():
@@ -346,37 +558,28 @@ def generate_single_video():
         if error:
             return jsonify({'success': False, 'error': error}), 400
         
-        # Create database job
-        db_job = db.create_job({
+        # Create database job (mesmo id do Job, consultado em /api/jobs/<id>)
+        db.create_job({
+            'id': job.job_id,
             'type': 'single_video',
+            'status': 'queued',
+            'project_id': project_id,
             'metadata': {'text_preview': text[:100]}
         })
-        db_job_id = db_job['id']
-        
-        try:
-            # Processa job
-            final_video = job_mgr.process_job(
-                job=job,
-                max_workers_video=max_workers
-            )
-            
-            # Update job as completed
-            db.update_job(db_job_id, {
-                'status': 'completed',
-                'video_path': str(final_video)
-            })
-            
-            duration = (job.completed_at - job.created_at).total_seconds()
-            
-            return jsonify({
-                'success': True,
-                'video_path': str(final_video),
-                'job_id': job.job_id,
-                'duration': duration
-            })
-        except Exception as process_error:
-            db.update_job(db_job_id, {'status': 'failed'})
-            raise process_error
+
+        JobManager.claim_job(job.job_id)
+        job_executor.submit(_run_single_job, job_mgr, job, max_workers, project_id)
+
+        response = {
+            'success': True,
+            'job_id': job.job_id,
+            'status': 'queued'
+        }
+        # A playlist de preview só existe quando o vídeo final é montado de forma incremental
+        if JobManager.incremental_enabled():
+            response['preview_url'] = f'/api/jobs/{job.job_id}/preview.m3u8'
+
+        return jsonify(response), 202
         
     except Exception as e:
         logger.error(f"Erro ao gerar vídeo: {e}")
@@ -384,7 +587,7 @@ def generate_single_video():
 
 @app.route('/api/generate/batch', methods=['POST'])
 def generate_batch_videos():
-    """Gera múltiplos vídeos em lote"""
+    """Enfileira a geração de múltiplos vídeos em lote e retorna o job_id imediatamente"""
     try:
         data = request.json
 
@@ -396,6 +599,7 @@ def generate_batch_videos():
         voice_selections = data.get('voice_selections', [])
         batch_image_mode = data.get('batch_image_mode', 'fixed')
         batch_images = data.get('batch_images', {})  # {scriptId_batchNumber: image_path}
+        project_id = data.get('project_id')
 
         # Validação
         if not scripts or len(scripts) == 0:
@@ -404,101 +608,32 @@ def generate_batch_videos():
         if not image_paths or len(image_paths) == 0:
             return jsonify({'success': False, 'error': 'Nenhuma imagem fornecida'}), 400
 
+        if not voice_selections:
+            return jsonify({'success': False, 'error': 'Nenhuma voz selecionada'}), 400
+
         # Cria job manager
         job_mgr = JobManager(audio_provider=provider)
 
-        results = []
-        videos_gerados = []
-
         # Create database job for batch
         batch_job = db.create_job({
             'type': 'batch_videos',
+            'status': 'queued',
+            'project_id': project_id,
             'metadata': {'num_scripts': len(scripts)}
         })
         batch_job_id = batch_job['id']
 
-        for idx, script_data in enumerate(scripts):
-            try:
-                script_text = script_data.get('text', '')
-                script_id = script_data.get('id')
-                voice_name = voice_selections[idx] if idx < len(voice_selections) else voice_selections[0]
-
-                # Determine image paths for this script based on mode
-                if batch_image_mode == 'individual':
-                    # Collect images for each batch in this script
-                    script_image_paths = []
-                    batches = script_data.get('batches', [])
-
-                    for batch in batches:
-                        batch_number = batch.get('batch_number')
-                        batch_key = f"{script_id}_{batch_number}"
-
-                        if batch_key in batch_images:
-                            batch_image_path = batch_images[batch_key]
-                            if batch_image_path not in script_image_paths:
-                                script_image_paths.append(batch_image_path)
-
-                    # If no specific images found, fallback to default image_paths
-                    if not script_image_paths:
-                        script_image_paths = image_paths
-                else:
-                    # Fixed mode - use the same images for all scripts
-                    script_image_paths = image_paths
-
-                # Cria job
-                job, error = job_mgr.create_job(
-                    input_text=script_text,
-                    voice_name=voice_name,
-                    image_paths=script_image_paths,
-                    model_id=model_id
-                )
-
-                if error:
-                    results.append({
-                        'script_id': script_id,
-                        'success': False,
-                        'error': error
-                    })
-                    continue
-
-                # Processa job
-                final_video = job_mgr.process_job(
-                    job=job,
-                    max_workers_video=max_workers
-                )
-
-                duration = (job.completed_at - job.created_at).total_seconds()
-                videos_gerados.append(str(final_video))
-
-                results.append({
-                    'script_id': script_id,
-                    'success': True,
-                    'video_path': str(final_video),
-                    'duration': duration
-                })
-
-            except Exception as e:
-                results.append({
-                    'script_id': script_data.get('id'),
-                    'success': False,
-                    'error': str(e)
-                })
-
-        # Update batch job as completed
-        if videos_gerados:
-            db.update_job(batch_job_id, {
-                'status': 'completed',
-                'video_path': videos_gerados[0] if len(videos_gerados) == 1 else f'{len(videos_gerados)} vídeos'
-            })
-        else:
-            db.update_job(batch_job_id, {'status': 'failed'})
+        job_executor.submit(
+            _run_batch_job, batch_job_id, job_mgr, scripts, voice_selections,
+            image_paths, batch_image_mode, batch_images, model_id, max_workers, project_id
+        )
 
         return jsonify({
             'success': True,
-            'results': results,
-            'videos_count': len(videos_gerados),
+            'job_id': batch_job_id,
+            'status': 'queued',
             'total_scripts': len(scripts)
-        })
+        }), 202
 
     except Exception as e:
         logger.error(f"Erro ao gerar vídeos em lote: {e}")
@@ -508,6 +643,25 @@ def generate_batch_videos():
 # API - DOWNLOAD DE VÍDEO
 # ============================================================================
 
+def _send_video(video_path: Path, **kwargs) -> Response:
+    """
+    Envia um vídeo (stream, download ou preview) exigindo revalidação do cache
+
+    Range (206), ETag/Last-Modified e 304 já vêm do send_file para arquivos em
+    disco; aqui só se força a revalidação a cada acesso, porque um job retomado
+    reescreve o vídeo no mesmo path. Com USE_X_SENDFILE o proxy envia o corpo.
+
+    Args:
+        video_path: Path do vídeo
+        **kwargs: Argumentos extras para send_file (ex: as_attachment, mimetype)
+
+    Returns:
+        Response 200, 206, 304 ou 416
+    """
+    kwargs.setdefault('mimetype', 'video/mp4')
+
+    return send_file(str(video_path), max_age=0, **kwargs)
+
 @app.route('/api/download/<path:filename>', methods=['GET'])
 def download_video(filename):
     """Faz download de vídeo gerado"""
@@ -520,8 +674,11 @@ def download_video(filename):
         if not video_path.exists():
             return jsonify({'success': False, 'error': 'Vídeo não encontrado'}), 404
 
-        return send_file(str(video_path), as_attachment=True, download_name=video_path.name)
+        return _send_video(video_path, as_attachment=True, download_name=video_path.name)
 
+    except HTTPException:
+        # Ex: 416 para um Range fora do arquivo
+        raise
     except Exception as e:
         logger.error(f"Erro ao fazer download: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -538,35 +695,54 @@ def stream_video(filename):
         if not video_path.exists():
             return jsonify({'success': False, 'error': 'Vídeo não encontrado'}), 404
 
-        return send_file(str(video_path), mimetype='video/mp4')
+        return _send_video(video_path)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erro ao fazer stream: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/videos/history', methods=['GET'])
-def get_video_history():
-    """Lista vídeos do histórico (pasta temp/outputs)"""
+def _page_args() -> Dict[str, Any]:
+    """Lê os parâmetros de paginação/filtro comuns (cursor, limit, project_id, since, until)"""
+    return {
+        'cursor': request.args.get('cursor') or None,
+        'limit': max(1, min(int(request.args.get('limit', 50)), 200)),
+        'project_id': request.args.get('project_id') or None,
+        'since': request.args.get('since') or None,  # ISO 8601
+        'until': request.args.get('until') or None   # ISO 8601
+    }
+
+def _seed_video_catalogue():
+    """Na primeira execução com o catálogo vazio, registra os vídeos já existentes em temp/outputs"""
     try:
         output_folder = Path('./temp/outputs')
-        if not output_folder.exists():
-            return jsonify({'success': True, 'videos': []})
-        
-        videos = []
+        if db.count_videos() > 0 or not output_folder.exists():
+            return
+
         for video_file in output_folder.glob('*.mp4'):
             stat = video_file.stat()
-            videos.append({
-                'name': video_file.name,
+            db.add_video({
                 'path': str(video_file),
+                'name': video_file.name,
                 'size': stat.st_size,
-                'created_at': stat.st_mtime
+                'created_at': datetime.fromtimestamp(stat.st_mtime).isoformat()
             })
+    except Exception as e:
+        logger.warning(f"⚠️ Não foi possível importar temp/outputs para o catálogo: {e}")
+
+_seed_video_catalogue()
+
+@app.route('/api/videos/history', methods=['GET'])
+def get_video_history():
+    """Lista vídeos do histórico (catálogo do banco, paginado por cursor)"""
+    try:
+        videos, next_cursor = db.list_videos(**_page_args())
         
-        # Sort by creation time (newest first)
-        videos.sort(key=lambda x: x['created_at'], reverse=True)
-        
-        return jsonify({'success': True, 'videos': videos})
+        return jsonify({'success': True, 'videos': videos, 'next_cursor': next_cursor})
         
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Erro ao listar histórico: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -775,17 +951,19 @@ def get_avatar_image(avatar_id):
 
 @app.route('/api/jobs', methods=['GET'])
 def get_jobs():
-    """Lista jobs (timeline de processamento)"""
+    """Lista jobs (timeline de processamento, paginada por cursor)"""
     try:
-        status = request.args.get('status')  # processing, completed, failed
-        limit = int(request.args.get('limit', 50))
+        status = request.args.get('status') or None  # queued, processing, completed, failed
         
-        jobs = db.get_jobs(status=status, limit=limit)
+        jobs, next_cursor = db.list_jobs(status=status, **_page_args())
         
         return jsonify({
             'success': True,
-            'jobs': jobs
+            'jobs': jobs,
+            'next_cursor': next_cursor
         })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Erro ao listar jobs: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -807,6 +985,130 @@ def get_job_status(job_id):
         logger.error(f"Erro ao obter job: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/jobs/<job_id>/resume', methods=['POST'])
+def resume_job(job_id):
+    """Retoma um job interrompido ou que falhou a partir dos checkpoints de cada segmento"""
+    try:
+        data = request.get_json(silent=True) or {}
+        max_workers = data.get('max_workers', 3)
+
+        # Um job enfileirado ou rodando não pode ser retomado em paralelo (mesmo job_dir)
+        if not JobManager.claim_job(job_id):
+            return jsonify({'success': False, 'error': 'Job já está em execução'}), 409
+
+        try:
+            job = JobManager.load_job(job_id)
+            if job.status == JobStatus.COMPLETED:
+                JobManager.release_job(job_id)
+                return jsonify({'success': False, 'error': 'Job já concluído'}), 409
+
+            job_mgr = JobManager(audio_provider=job.audio_provider)
+
+            db_job = db.get_job(job_id)
+            if db_job:
+                _update_job(job_id, {'status': 'queued', 'error': None, 'message': 'Retomando job...'}, event_type='stage')
+            else:
+                db.create_job({'id': job_id, 'type': 'single_video', 'status': 'queued'})
+            project_id = (db_job or {}).get('project_id')
+
+            # O pipeline consulta os checkpoints de cada segmento
+            job_executor.submit(_run_single_job, job_mgr, job, max_workers, project_id, True)
+        except Exception:
+            JobManager.release_job(job_id)
+            raise
+
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': 'queued',
+            'segments_checkpointed': len(job.segments)
+        }), 202
+    except FileNotFoundError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+    except Exception as e:
+        logger.error(f"Erro ao retomar job: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def _preview_file(job_id: str, filename: str) -> Optional[Path]:
+    """Path de um arquivo do vídeo progressivo do job (None se o job não tiver preview)"""
+    if job_id != secure_filename(job_id):
+        return None
+
+    path = Config.TEMP_FOLDER / f'job_{job_id}' / 'progressive' / filename
+    return path if path.exists() else None
+
+@app.route('/api/jobs/<job_id>/preview.m3u8', methods=['GET'])
+def preview_playlist(job_id):
+    """Playlist HLS do vídeo em andamento (cresce a cada segmento anexado)"""
+    playlist_path = _preview_file(job_id, 'progressive.m3u8')
+    if not playlist_path:
+        return jsonify({'success': False, 'error': 'Preview não disponível'}), 404
+
+    # A playlist é reescrita durante o job: o player precisa sempre da versão atual
+    return send_file(
+        str(playlist_path),
+        mimetype='application/vnd.apple.mpegurl',
+        max_age=0,
+        conditional=False
+    )
+
+@app.route('/api/jobs/<job_id>/progressive.ts', methods=['GET'])
+def preview_stream(job_id):
+    """Arquivo MPEG-TS referenciado pela playlist (lido por EXT-X-BYTERANGE)"""
+    stream_path = _preview_file(job_id, 'progressive.ts')
+    if not stream_path:
+        return jsonify({'success': False, 'error': 'Preview não disponível'}), 404
+
+    # O player lê um segmento por vez com requisições Range
+    return _send_video(stream_path, mimetype='video/mp2t')
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """Stream SSE com o progresso de um job (etapas, segmentos e percentual) em tempo real"""
+    if not db.get_job(job_id):
+        return jsonify({'success': False, 'error': 'Job não encontrado'}), 404
+
+    bus = JobEventBus.instance()
+
+    def format_event(event: Dict) -> str:
+        return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+
+    def generate():
+        # Assina antes de ler o estado atual, para não perder eventos entre as duas coisas
+        subscriber = bus.subscribe(job_id)
+        try:
+            job = db.get_job(job_id)
+            status = job.get('status')
+            snapshot_type = status if status in TERMINAL_EVENTS else 'snapshot'
+            yield format_event(dict(job, type=snapshot_type, job_id=job_id))
+
+            if snapshot_type in TERMINAL_EVENTS:
+                return
+
+            while True:
+                try:
+                    event = subscriber.get(timeout=15)
+                except queue.Empty:
+                    # Mantém a conexão viva através de proxies
+                    yield ": keep-alive\n\n"
+                    continue
+
+                yield format_event(event)
+
+                if event['type'] in TERMINAL_EVENTS:
+                    return
+        finally:
+            bus.unsubscribe(job_id, subscriber)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
 # ============================================================================
 # API - TAGS
 # ============================================================================